@@ -43,6 +43,8 @@ from medu_wrappers import (
     medu_get_gpio_value,
     medu_play_audio,
 )
+from medu_servo import ServoController
+from medu_tool import ToolController
 
 
 # ---------------------------------------------------------------------------
@@ -224,6 +226,26 @@ def test_manage_gripper(manipulator):
     return r1, r2
 
 
+def test_tool_controller(manipulator):
+    """
+    То же, что test_manage_gripper, через ToolController: питание
+    включается само, паузы — по времени установки, повтор не отправляется.
+    """
+    print("\n=== test_tool_controller ===")
+    if manipulator is None:
+        print("Нет манипулятора")
+        return
+
+    tool = ToolController(manipulator)
+    r1 = tool.set(rotation=20, grip=10)
+    r2 = tool.set(rotation=20, grip=10)  # не отправляется
+    r3 = tool.set(grip=0)
+
+    print("results:", r1, r2, r3)
+    print("sent:", tool.sent, "skipped:", tool.skipped, "settle:", tool.settle)
+    return r1, r2, r3
+
+
 # ---------------------------------------------------------------------------
 # Тесты серво-режимов и стриминга
 # ---------------------------------------------------------------------------
@@ -248,13 +270,13 @@ def test_set_servo_modes_shortcuts(manipulator):
         print("Нет манипулятора")
         return
 
+    # Переключение режима — блокирующий запрос: после возврата режим уже
+    # установлен, паузы между переключениями не нужны
     print("set_servo_twist_mode()")
     r1 = medu_set_servo_twist_mode(manipulator)
-    time.sleep(0.2)
 
     print("set_servo_pose_mode()")
     r2 = medu_set_servo_pose_mode(manipulator)
-    time.sleep(0.2)
 
     print("set_servo_joint_jog_mode()")
     r3 = medu_set_servo_joint_jog_mode(manipulator)
@@ -329,6 +351,33 @@ def test_stream_joint_angles_once(manipulator):
     return r
 
 
+def test_servo_controller_stream(manipulator):
+    """
+    Стриминг через ServoController: режим переключается только при смене
+    вида setpoint, повторные точки того же вида идут без переключений.
+    """
+    print("\n=== test_servo_controller_stream ===")
+    if manipulator is None:
+        print("Нет манипулятора")
+        return
+
+    servo = ServoController(manipulator)
+
+    twist = {
+        "linear": {"x": 0.02, "y": 0.0, "z": 0.0},
+        "angular": {"rx": 0.0, "ry": 0.0, "rz": 0.01},
+    }
+    r1 = servo.stream(twist)
+    r2 = servo.stream(twist)
+
+    r3 = servo.stream_pose(0.27, 0.0, 0.15, 0.0, 0.0, 0.0, 1.0)
+    r4 = servo.stream_joints(0.5, 1.0, 0.8, 0.2, 0.1, 0.15)
+
+    print("results:", r1, r2, r3, r4)
+    print("switches:", servo.switch_count, "skipped:", servo.skipped_switches)
+    return r1, r2, r3, r4
+
+
 # ---------------------------------------------------------------------------
 # Тесты программ на роботе
 # ---------------------------------------------------------------------------
@@ -511,6 +560,7 @@ def run_smoke_suite():
     # НАСАДКА И ГРИППЕР
     # test_nozzle_power_on_off(manipulator)
     # test_manage_gripper(manipulator)
+    # test_tool_controller(manipulator)
 
     # СЕРВО-РЕЖИМЫ И СТРИМИНГ
     # test_set_servo_control_type(manipulator)
@@ -518,6 +568,7 @@ def run_smoke_suite():
     # test_stream_cartesian_velocities_once(manipulator)
     # test_stream_coordinates_once(manipulator)
     # test_stream_joint_angles_once(manipulator)
+    # test_servo_controller_stream(manipulator)
 
     # ПРОГРАММЫ НА РОБОТЕ
     # test_run_program(manipulator)
@@ -0,0 +1,205 @@
+# main_smoke_runner.py
+#
+# Параллельный запуск смоук-тестов на железе с отчётом по времени.
+#
+# Тесты берутся из main_medu_manipulator_tests.py (test_*) и
+# main_conveyor_test.py (test*), каждому назначается подсистема
+# (motion / gripper / gpio / conveyor / audio / state).
+# Подсистемы без конфликтов идут параллельно, каждая в своём потоке
+# ("полосе"), внутри полосы — последовательно.
+# Между движущими тестами вместо пауз — ожидание остановки суставов
+# по телеметрии (medu_wait.wait_motion_settled).
+# Сессия у всех полос одна, а потокобезопасность SDK не документирована:
+# вызовы к ней идут по одному (medu_session.LockedSession), параллельно
+# идут только паузы и ожидания внутри тестов.
+#
+# Примеры:
+#   python main_smoke_runner.py --list
+#   python main_smoke_runner.py --subsystems gpio,audio,conveyor
+#   python main_smoke_runner.py --tests test_move_to_angles testText
+#   python main_smoke_runner.py --serial --json report.json
+
+import argparse
+import inspect
+import json
+import threading
+import time
+
+import main_conveyor_test
+import main_medu_manipulator_tests
+from medu_session import LockedSession
+from medu_wait import wait_motion_settled
+
+# Подсистема по имени теста; state — только чтение, ни с чем не конфликтует
+SUBSYSTEMS = {
+    "test_connect": "state",
+    "test_move_to_angles": "motion",
+    "test_move_to_coordinates": "motion",
+    "test_arc_motion": "motion",
+    "test_nozzle_power_on_off": "gripper",
+    "test_manage_gripper": "gripper",
+    "test_tool_controller": "gripper",
+    "test_set_servo_control_type": "motion",
+    "test_set_servo_modes_shortcuts": "motion",
+    "test_stream_cartesian_velocities_once": "motion",
+    "test_stream_coordinates_once": "motion",
+    "test_stream_joint_angles_once": "motion",
+    "test_servo_controller_stream": "motion",
+    "test_run_program": "motion",
+    "test_run_program_json": "motion",
+    "test_run_python_program": "motion",
+    "test_stop_movement": "motion",
+    "test_get_joint_state": "state",
+    "test_get_home_position": "state",
+    "test_get_cartesian_coordinates": "state",
+    "test_write_gpio": "gpio",
+    "test_get_gpio_value": "gpio",
+    "test_play_audio": "audio",
+}
+
+# Подсистемы, которые нельзя гонять одновременно (попадают в одну полосу):
+# гриппер не трогаем, пока рука едет
+CONFLICTS = [("motion", "gripper")]
+
+# Тесты, после которых рука может ещё двигаться (стриминг не блокирует)
+SETTLE_AFTER = {"motion"}
+
+
+def discover():
+    """Список (name, func, subsystem) из обоих тестовых модулей."""
+    found = []
+    for module, prefix in (
+        (main_medu_manipulator_tests, "test_"),
+        (main_conveyor_test, "test"),
+    ):
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if not name.startswith(prefix) or func.__module__ != module.__name__:
+                continue
+            if module is main_conveyor_test:
+                subsystem = "conveyor"
+            else:
+                subsystem = SUBSYSTEMS.get(name, "motion")  # неизвестное — осторожно
+            found.append((name, func, subsystem))
+    # по подсистемам, внутри — порядок как в исходных файлах
+    found.sort(key=lambda item: (item[2], item[1].__code__.co_firstlineno))
+    return found
+
+
+def build_lanes(tests, serial=False):
+    """Разбить тесты на полосы: конфликтующие подсистемы — в одну."""
+    if serial:
+        return {"serial": tests}
+
+    lane_of = {}
+    for a, b in CONFLICTS:
+        lane = lane_of.get(a) or lane_of.get(b) or f"{a}+{b}"
+        lane_of[a] = lane_of[b] = lane
+
+    lanes = {}
+    for test in tests:
+        subsystem = test[2]
+        lanes.setdefault(lane_of.get(subsystem, subsystem), []).append(test)
+    return lanes
+
+
+def run_lane(manipulator, tests, results, lock):
+    for name, func, subsystem in tests:
+        t0 = time.monotonic()
+        status = "ok"
+        try:
+            result = func(manipulator)
+            # Тесты конвейера объявлены "-> None" и ничего не возвращают
+            returns_value = inspect.signature(func).return_annotation is not None
+            if returns_value and (result is None or (isinstance(result, tuple) and None in result)):
+                status = "none"   # обёртка вернула None — см. лог выше
+        except Exception as e:
+            status = f"error: {e}"
+        duration = time.monotonic() - t0
+
+        settle = 0.0
+        if subsystem in SETTLE_AFTER:
+            t1 = time.monotonic()
+            if not wait_motion_settled(manipulator, timeout=10.0):
+                status = status if status != "ok" else "not settled"
+            settle = time.monotonic() - t1
+
+        with lock:
+            results.append(
+                {
+                    "test": name,
+                    "subsystem": subsystem,
+                    "seconds": duration,
+                    "settle_seconds": settle,
+                    "status": status,
+                }
+            )
+
+
+def print_report(results, wall):
+    print("\n" + "=" * 78)
+    print(f"{'тест':<40} {'подсистема':<10} {'время, с':>9} {'ожид., с':>9}  статус")
+    print("-" * 78)
+    for r in sorted(results, key=lambda r: (r["subsystem"], r["test"])):
+        print(
+            f"{r['test']:<40} {r['subsystem']:<10} {r['seconds']:>9.2f} "
+            f"{r['settle_seconds']:>9.2f}  {r['status']}"
+        )
+    total = sum(r["seconds"] + r["settle_seconds"] for r in results)
+    print("-" * 78)
+    print(f"сумма по тестам: {total:.2f} с, реальное время: {wall:.2f} с")
+    failed = [r for r in results if r["status"] != "ok"]
+    print(f"✅ все {len(results)} тестов ok" if not failed else f"❌ не ok: {len(failed)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Параллельный смоук-прогон MEdu")
+    parser.add_argument("--list", action="store_true", help="показать тесты и выйти")
+    parser.add_argument("--subsystems", help="через запятую: motion,gripper,gpio,conveyor,audio,state")
+    parser.add_argument("--tests", nargs="+", help="имена тестов")
+    parser.add_argument("--serial", action="store_true", help="всё в одной полосе (для сравнения)")
+    parser.add_argument("--json", help="сохранить отчёт в JSON")
+    args = parser.parse_args()
+
+    tests = discover()
+    if args.subsystems:
+        wanted = set(args.subsystems.split(","))
+        tests = [t for t in tests if t[2] in wanted]
+    if args.tests:
+        wanted = set(args.tests)
+        tests = [t for t in tests if t[0] in wanted]
+
+    lanes = build_lanes(tests, args.serial)
+
+    if args.list:
+        for lane, lane_tests in lanes.items():
+            print(f"[{lane}]")
+            for name, _, subsystem in lane_tests:
+                print(f"  {name} ({subsystem})")
+        return
+
+    manipulator = main_medu_manipulator_tests.get_manipulator()
+    if manipulator is None:
+        return
+    session = LockedSession(manipulator)
+
+    results = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=run_lane, args=(session, lane_tests, results, lock), name=lane)
+        for lane, lane_tests in lanes.items()
+    ]
+    t0 = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - t0
+
+    print_report(results, wall)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"wall_seconds": wall, "results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# main_startup_benchmark.py
+#
+# Замер времени импорта и старта процесса для модулей библиотеки.
+# Запуск: python main_startup_benchmark.py
+#
+# 1) python -X importtime: накопленное время импорта каждого модуля
+#    сравнивается с бюджетом IMPORT_BUDGET_US (для модулей из HEAVY_DEPS —
+#    сверх времени импорта их тяжёлой зависимости).
+# 2) Модули без связи с роботом не должны тянуть SDK при импорте.
+# 3) Полное время старта "python -c 'import ...'" (медиана из RUNS запусков).
+
+import statistics
+import subprocess
+import sys
+import time
+
+# Бюджет на накопленное время импорта одного модуля, мкс
+IMPORT_BUDGET_US = 30_000
+
+# Модули, которые должны импортироваться без SDK
+MODULES = [
+    "medu_wrappers",
+    "medu_motion_time",
+    "medu_scheduler",
+    "medu_servo",
+    "medu_estop",
+    "medu_hw_errors",
+    "medu_teleop",
+    "medu_pipeline",
+    "medu_tool",
+    "medu_audio",
+    "medu_wait",
+    "medu_daemon",
+    "medu_cli",
+    "medu_recorder",
+    "medu_calibration",
+    "medu_orientation",
+    "medu_smoothing",
+    "medu_lookahead",
+    "medu_collision",
+    "medu_twin",
+    "medu_study",
+    "medu_telemetry_bus",
+    "medu_broker",
+    "medu_fast_stream",
+    "medu_jobs",
+    "medu_poll_governor",
+    "medu_stats",
+    "medu_session",
+]
+
+# Тяжёлые зависимости, нужные модулю по назначению: их время импорта
+# добавляется к бюджету (numpy сам по себе дороже IMPORT_BUDGET_US)
+HEAVY_DEPS = {
+    "medu_hw_errors": "concurrent.futures",
+    "medu_calibration": "numpy",
+    "medu_orientation": "numpy",
+    "medu_smoothing": "numpy",
+    "medu_lookahead": "numpy",
+    "medu_collision": "numpy",
+    "medu_study": "concurrent.futures.process",
+    "medu_telemetry_bus": "multiprocessing.shared_memory",
+}
+
+RUNS = 10
+
+
+def import_time_us(module: str):
+    """Накопленное время импорта модуля по python -X importtime, мкс."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(f"  {module}: ошибка импорта\n{proc.stderr.strip().splitlines()[-1]}")
+        return None
+    for line in proc.stderr.splitlines():
+        # формат: "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    return None
+
+
+def pulls_sdk(module: str):
+    """True/False — загрузился ли SDK при импорте; None — модуль не импортируется."""
+    code = f"import sys, {module}; print(any(m == 'sdk' or m.startswith('sdk.') for m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    return proc.stdout.strip() == "True"
+
+
+def startup_ms(code: str) -> float:
+    samples = []
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], capture_output=True)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    ok = True
+
+    print("→ import time (python -X importtime)")
+    dep_us = {dep: import_time_us(dep) or 0 for dep in set(HEAVY_DEPS.values())}
+    for module in MODULES:
+        us = import_time_us(module)
+        if us is None:
+            ok = False
+            continue
+        dep = HEAVY_DEPS.get(module)
+        budget = IMPORT_BUDGET_US + (dep_us[dep] if dep else 0)
+        status = "OK" if us <= budget else "ПРЕВЫШЕН БЮДЖЕТ"
+        ok = ok and us <= budget
+        note = f"  (бюджет {budget} с {dep})" if dep else ""
+        print(f"  {module:<20} {us:>8} мкс  {status}{note}")
+
+    print("→ импорт без SDK")
+    for module in MODULES:
+        sdk_loaded = pulls_sdk(module)
+        ok = ok and sdk_loaded is False
+        status = "ошибка импорта" if sdk_loaded is None else "тянет SDK!" if sdk_loaded else "OK"
+        print(f"  {module:<20} {status}")
+
+    print(f"→ старт процесса (медиана из {RUNS})")
+    base = startup_ms("pass")
+    full = startup_ms("import " + ", ".join(MODULES))
+    print(f"  пустой python:      {base:8.1f} мс")
+    print(f"  импорт всех модулей: {full:8.1f} мс (+{full - base:.1f} мс)")
+
+    print("✅ Бюджет соблюдён" if ok else "❌ Есть нарушения")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+medu_audio.py — звуковые сигналы, которые не тормозят движение.
+
+medu_play_audio блокирует поток до конца воспроизведения (до 60 с).
+AudioChannel принимает сигналы в очередь и проигрывает их в своём потоке:
+
+- play() только кладёт сигнал в очередь (микросекунды) — его можно
+  вызывать прямо из цикла движения;
+- очередь с приоритетами: сначала более важные сигналы; одинаковый файл,
+  уже ждущий в очереди, не дублируется (приоритет берётся больший);
+  при переполнении выбрасывается наименее важный сигнал;
+- во время работы все сигналы идут только через medu_play_audio_no_wait:
+  блокирующий play_audio занял бы общую сессию на длину файла (до
+  check_timeout) прямо рядом с движением. У no_wait нет ответа, поэтому
+  наличие файла проверяется заранее, до начала движения:
+  preload(files, check=True) — блокирующим воспроизведением, один раз
+  за сессию; отсутствующие файлы потом не отправляются;
+- сигналы не накладываются: следующий запускается через длительность
+  предыдущего (durations) или через default_gap.
+
+    audio = AudioChannel(manipulator, durations={"start.wav": 1.2})
+    audio.start()
+    audio.play("start.wav")
+    audio.play("error.wav", priority=PRIORITY_ALARM)
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+from medu_stats import percentile
+from medu_wrappers import medu_play_audio_no_wait
+
+PRIORITY_INFO = 0
+PRIORITY_STATUS = 5
+PRIORITY_ALARM = 10
+
+
+class AudioChannel:
+    """Очередь звуковых сигналов одного manipulator."""
+
+    def __init__(self, manipulator, durations=None, default_gap=1.0, max_queue=8, check_timeout=10.0):
+        self.manipulator = manipulator
+        self.durations = dict(durations or {})
+        self.default_gap = float(default_gap)
+        self.max_queue = int(max_queue)
+        self.check_timeout = float(check_timeout)
+
+        self.available = {}  # файл -> True/False (проверено в этой сессии)
+        self.played = 0
+        self.merged = 0
+        self.dropped = 0
+        self.skipped_unavailable = 0
+        self.enqueue_us = deque(maxlen=1000)  # сколько стоил play() вызывающему потоку
+
+        self._heap = []  # (-priority, seq, file)
+        self._queued = {}  # файл -> priority
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def invalidate(self):
+        """Новая сессия (переподключение) — проверить файлы заново."""
+        with self._cond:
+            self.available.clear()
+
+    def preload(self, file_names, check=False):
+        """
+        Отметить файлы заранее, до цикла движения.
+        check=False — файлы считаются существующими (список с робота);
+        check=True — проверить сейчас, блокирующим воспроизведением
+        в вызывающем потоке (файлы прозвучат). Возвращает отсутствующие.
+        Непроверенные файлы тоже играются через no_wait, но ошибка
+        "нет файла" тогда не видна.
+        """
+        missing = []
+        for file_name in file_names:
+            if not check:
+                with self._cond:
+                    self.available[file_name] = True
+                continue
+            if self.available.get(file_name) is None:
+                self._check(file_name)
+            if not self.available.get(file_name):
+                missing.append(file_name)
+        return missing
+
+    # --- очередь -------------------------------------------------------------
+
+    def play(self, file_name, priority=PRIORITY_INFO):
+        """
+        Поставить сигнал в очередь. Возвращает False, если файл уже
+        известен как отсутствующий или сигнал выброшен из-за переполнения.
+        """
+        t0 = time.perf_counter()
+        try:
+            with self._cond:
+                if self.available.get(file_name) is False:
+                    self.skipped_unavailable += 1
+                    return False
+
+                queued = self._queued.get(file_name)
+                if queued is not None:
+                    self.merged += 1
+                    if priority > queued:
+                        self._queued[file_name] = priority
+                        heapq.heappush(self._heap, (-priority, next(self._seq), file_name))
+                    return True
+
+                if len(self._queued) >= self.max_queue:
+                    weakest = min(self._queued, key=self._queued.get)
+                    if self._queued[weakest] >= priority:
+                        self.dropped += 1
+                        return False
+                    del self._queued[weakest]  # запись в куче станет "устаревшей"
+                    self.dropped += 1
+
+                self._queued[file_name] = priority
+                heapq.heappush(self._heap, (-priority, next(self._seq), file_name))
+                self._cond.notify()
+                return True
+        finally:
+            self.enqueue_us.append((time.perf_counter() - t0) * 1e6)
+
+    def _pop(self):
+        """Следующий сигнал или None, если канал остановлен."""
+        with self._cond:
+            while True:
+                while self._heap:
+                    neg_priority, _, file_name = heapq.heappop(self._heap)
+                    # пропускаем записи, вытесненные или перезаписанные при слиянии
+                    if self._queued.get(file_name) == -neg_priority:
+                        del self._queued[file_name]
+                        return file_name
+                if not self._running:
+                    return None
+                self._cond.wait()
+
+    def pending(self):
+        with self._cond:
+            return sorted(self._queued, key=lambda f: -self._queued[f])
+
+    # --- поток воспроизведения ---------------------------------------------
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="medu-audio", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, drain=False):
+        """Остановить поток; drain=True — сначала доиграть очередь."""
+        with self._cond:
+            if not drain:
+                self._heap.clear()
+                self._queued.clear()
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _check(self, file_name):
+        """Блокирующее воспроизведение: есть ли файл. Только из preload()."""
+        # SDK напрямую: обёртка возвращает None и при ошибке,
+        # и при "пустом" ответе, а здесь нужно отличить одно от другого
+        try:
+            self.manipulator.play_audio(file_name, timeout_seconds=self.check_timeout, throw_error=True)
+            ok = True
+        except Exception as e:
+            print(f"[AudioChannel] Файл {file_name} недоступен: {e}")
+            ok = False
+        with self._cond:
+            self.available[file_name] = ok
+        return ok
+
+    def _play_one(self, file_name):
+        if self.available.get(file_name) is False:
+            self.skipped_unavailable += 1
+            return False
+        return medu_play_audio_no_wait(self.manipulator, file_name) is not None
+
+    def _run(self):
+        while True:
+            file_name = self._pop()
+            if file_name is None:
+                break
+            t0 = time.monotonic()
+            if not self._play_one(file_name):
+                continue
+            self.played += 1
+            # no_wait вернулся сразу — ждём, пока сигнал доиграет
+            gap = self.durations.get(file_name, self.default_gap) - (time.monotonic() - t0)
+            if gap > 0:
+                time.sleep(gap)
+
+    def report(self):
+        enqueue_us = list(self.enqueue_us)
+        return {
+            "played": self.played,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "skipped_unavailable": self.skipped_unavailable,
+            "unavailable": sorted(f for f, ok in self.available.items() if not ok),
+            "enqueue_p50_us": percentile(enqueue_us, 0.5),
+            "enqueue_max_us": percentile(enqueue_us, 1.0),
+        }
@@ -0,0 +1,292 @@
+"""
+medu_broker.py — единственная управляющая сессия для нескольких клиентов.
+
+medu_connect всегда делает get_control, поэтому второй скрипт отбирает
+управление у первого. Брокер держит сессию сам (как medu_daemon — тот же
+протокол строк JSON по Unix-сокету, тот же DaemonClient) и раскладывает
+вызовы по классам приоритета:
+
+    safety   > motion > io > cosmetic
+    (стоп)     (движение, насадка, программы)
+                        (GPIO, лента, чтение состояния)
+                                  (LED, экран, зуммер, звук)
+
+- safety выполняется сразу в потоке клиента, без очереди и без
+  ожидания текущего движения (как отдельный канал medu_estop); стоп
+  снимает все ждущие движения (они получают ошибку "отменено");
+- motion, io и cosmetic — три полосы, у каждой своя очередь и свой
+  исполнитель: длинная очередь движений не задерживает чтение датчиков,
+  а вызов, дождавшийся своей очереди, проверяется на срок годности;
+- сами вызовы к сессии из полос идут по одному — под блокировкой
+  MeduDaemon: потокобезопасность SDK не документирована. Поэтому чтение
+  во время блокирующего move_to_* ждёт его конца; опрос на ходу —
+  через *_no_wait движения или medu_telemetry_bus;
+- io / cosmetic, простоявшие в очереди дольше max_wait класса, не
+  выполняются (ошибка "устарело") — устаревшее чтение или мигание LED
+  не задерживает свежие запросы.
+
+Класс определяется по имени обёртки (CLASSES) и задаёт полосу. Клиент
+может понизить приоритет своего вызова полем "priority" (вызов встанет
+в своей полосе после обычных), но не повысить:
+
+    -> {"call": "medu_get_joint_state", "priority": "cosmetic"}
+
+Служебный вызов "stats" — задержки в очереди по классам (p50/p95/max, мс).
+
+    python medu_broker.py                 # MEDU_HOST/LOGIN/PASSWORD из окружения
+    with DaemonClient() as c:
+        c.call("medu_move_to_angles", 0.0, -0.35, -0.75)
+        c.call("stats")
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+
+import medu_wrappers
+from medu_daemon import MeduDaemon, to_jsonable, wrapper_function
+from medu_stats import percentile
+
+PRIORITIES = ["safety", "motion", "io", "cosmetic"]
+RANK = {name: i for i, name in enumerate(PRIORITIES)}
+
+# Класс по имени обёртки; чего нет в списке — motion (безопасный вариант:
+# неизвестная команда может двигать робота)
+CLASSES = {
+    "medu_stop_movement": "safety",
+    "medu_write_gpio": "io",
+    "medu_get_gpio_value": "io",
+    "medu_get_joint_state": "io",
+    "medu_get_home_position": "io",
+    "medu_get_cartesian_coordinates": "io",
+    "medu_conveyor_set_speed_motors": "io",
+    "medu_conveyor_set_servo_angle": "io",
+    "medu_conveyor_get_sensors_data": "io",
+    "medu_conveyor_set_led_color": "cosmetic",
+    "medu_conveyor_display_text": "cosmetic",
+    "medu_conveyor_set_buzz_tone": "cosmetic",
+    "medu_play_audio": "cosmetic",
+    "medu_play_audio_no_wait": "cosmetic",
+}
+
+# Вызовы, после которых ждущие движения не выполняются
+STOP_CALLS = {"medu_stop_movement"}
+
+# Сколько вызов класса может ждать в очереди, с (None — сколько угодно)
+DEFAULT_MAX_WAIT = {"motion": None, "io": 5.0, "cosmetic": 2.0}
+
+LANES = ["motion", "io", "cosmetic"]
+
+
+class _Job:
+    __slots__ = ("cls", "lane", "name", "args", "kwargs", "enqueued", "done", "response")
+
+    def __init__(self, cls, lane, name, args, kwargs):
+        self.cls = cls
+        self.lane = lane
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.response = None
+
+    def finish(self, response):
+        self.response = response
+        self.done.set()
+
+
+class _Lane:
+    """Очередь с приоритетом (RANK, порядок поступления) и один исполнитель."""
+
+    def __init__(self, name, execute):
+        self.name = name
+        self._execute = execute
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"medu-broker-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        with self._cond:
+            heapq.heappush(self._heap, (RANK[job.cls], next(self._seq), job))
+            self._cond.notify()
+
+    def cancel(self, predicate):
+        """Убрать из очереди ждущие вызовы, для которых predicate(job); вернуть их."""
+        with self._cond:
+            kept, removed = [], []
+            for entry in self._heap:
+                (removed if predicate(entry[2]) else kept).append(entry)
+            heapq.heapify(kept)
+            self._heap = kept
+        return [entry[2] for entry in removed]
+
+    def depth(self):
+        with self._cond:
+            return len(self._heap)
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap and self._running:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                job = heapq.heappop(self._heap)[2]
+            self._execute(job)
+
+
+class MeduBroker(MeduDaemon):
+    """
+    MeduDaemon с очередями по классам приоритета. Вызовы полос к сессии
+    сериализуются блокировкой демона; мимо неё идёт только safety.
+    """
+
+    def __init__(self, manipulator, socket_path=None, max_wait=None):
+        super().__init__(manipulator, socket_path)
+        self.max_wait = {**DEFAULT_MAX_WAIT, **(max_wait or {})}
+        self._stats_lock = threading.Lock()
+        self._delays = {cls: deque(maxlen=1000) for cls in PRIORITIES}  # мс в очереди
+        self._counts = {cls: {"done": 0, "expired": 0, "cancelled": 0} for cls in PRIORITIES}
+        self._lanes = {}
+        for lane in LANES:
+            self._lanes[lane] = _Lane(lane, self._execute)
+
+    # --- классификация -------------------------------------------------------
+
+    def classify(self, name, requested=None):
+        """(класс приоритета, полоса) для вызова."""
+        lane = CLASSES.get(name, "motion")
+        if requested is None:
+            return lane, lane
+        if requested not in RANK:
+            raise ValueError(f"неизвестный приоритет {requested!r}, ожидается один из {PRIORITIES}")
+        # повысить приоритет нельзя: монитор не должен прерывать движение
+        return (requested if RANK[requested] >= RANK[lane] else lane), lane
+
+    # --- выполнение ----------------------------------------------------------
+
+    def _record(self, cls, delay_s, outcome):
+        with self._stats_lock:
+            self._delays[cls].append(delay_s * 1000.0)
+            self._counts[cls][outcome] += 1
+
+    def _call(self, name, args, kwargs, lock=True):
+        func = wrapper_function(name)
+        if lock:
+            with self._lock:
+                result = func(self.manipulator, *args, **kwargs)
+        else:
+            result = func(self.manipulator, *args, **kwargs)
+        with self._stats_lock:
+            self.calls += 1
+        return {"ok": True, "result": to_jsonable(result)}
+
+    def _execute(self, job):
+        delay = time.monotonic() - job.enqueued
+        limit = self.max_wait.get(job.lane)
+        if limit is not None and delay > limit:
+            self._record(job.cls, delay, "expired")
+            job.finish({"ok": False, "error": f"устарело: {delay:.1f} с в очереди ({job.cls})"})
+            return
+        self._record(job.cls, delay, "done")
+        try:
+            job.finish(self._call(job.name, job.args, job.kwargs))
+        except Exception as e:
+            job.finish({"ok": False, "error": str(e)})
+
+    def dispatch(self, request):
+        name = request.get("call")
+        if name == "stats":
+            return {"ok": True, "result": self.report()}
+        if name in ("ping", "shutdown"):
+            return super().dispatch(request)
+
+        wrapper_function(name)  # проверка имени до постановки в очередь
+        cls, lane = self.classify(name, request.get("priority"))
+        args = request.get("args") or []
+        kwargs = request.get("kwargs") or {}
+
+        if lane == "safety":
+            # сразу, в потоке клиента: не ждём ни очереди, ни текущего движения
+            self._record(cls, 0.0, "done")
+            response = self._call(name, args, kwargs, lock=False)
+            if name in STOP_CALLS:
+                for job in self._lanes["motion"].cancel(lambda job: True):
+                    self._record(job.cls, time.monotonic() - job.enqueued, "cancelled")
+                    job.finish({"ok": False, "error": f"отменено: {name}"})
+            return response
+
+        job = _Job(cls, lane, name, args, kwargs)
+        self._lanes[lane].submit(job)
+        job.done.wait()
+        return job.response
+
+    def serve_forever(self):
+        try:
+            super().serve_forever()
+        finally:
+            for lane in self._lanes.values():
+                lane.stop()
+
+    # --- статистика ----------------------------------------------------------
+
+    def report(self):
+        with self._stats_lock:
+            delays = {cls: list(values) for cls, values in self._delays.items()}
+            counts = {cls: dict(values) for cls, values in self._counts.items()}
+        result = {"uptime_s": time.time() - self.started, "calls": self.calls, "classes": {}}
+        for cls in PRIORITIES:
+            result["classes"][cls] = {
+                **counts[cls],
+                "queued": self._lanes[cls].depth() if cls in self._lanes else 0,
+                "delay_p50_ms": percentile(delays[cls], 0.5),
+                "delay_p95_ms": percentile(delays[cls], 0.95),
+                "delay_max_ms": percentile(delays[cls], 1.0),
+            }
+        return result
+
+
+def serve(host, client_id, login, password, socket_path=None, max_wait=None):
+    """Подключиться к роботу и обслуживать сокет до команды shutdown."""
+    manipulator = medu_wrappers.medu_connect(host, client_id, login, password)
+    if manipulator is None:
+        print("[medu_broker] Не удалось подключиться к MEdu")
+        return 1
+
+    broker = MeduBroker(manipulator, socket_path, max_wait)
+    print(f"[medu_broker] Слушаю {broker.socket_path}")
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            manipulator.disconnect()
+        except Exception as e:
+            print(f"[medu_broker] Ошибка отключения: {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    # Параметры подключения — через окружение, как у medu_daemon
+    raise SystemExit(
+        serve(
+            os.environ.get("MEDU_HOST", ""),
+            os.environ.get("MEDU_CLIENT_ID", "medu-broker"),
+            os.environ.get("MEDU_LOGIN", ""),
+            os.environ.get("MEDU_PASSWORD", ""),
+            os.environ.get("MEDU_SOCKET"),
+        )
+    )
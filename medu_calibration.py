@@ -0,0 +1,277 @@
+"""
+medu_calibration.py — калибровка систем координат (камера, конвейер) -> робот.
+
+Пары точек записываются так: точка известна в системе камеры/конвейера,
+оператор подводит TCP к ней, и текущие координаты берутся из
+medu_get_cartesian_coordinates. По парам считается преобразование:
+- "rigid"  — поворот + сдвиг (Кабш/SVD), если масштаб у систем одинаковый;
+- "affine" — общая аффинная матрица (МНК), если камера даёт перекос/масштаб.
+
+Преобразования хранятся в CalibrationStore (JSON) как матрицы 4x4 и
+применяются к массивам точек целиком (NumPy, без цикла по точкам):
+
+    store = CalibrationStore("calibration.json")
+    pairs = collect_pairs(manipulator, marker_points_camera)
+    store.fit("camera", pairs, kind="rigid")
+    store.save()
+
+    robot_points = store.apply("camera", detections)        # (N, 3)
+    pipeline = make_pick_pipeline(..., to_robot=store.converter("camera"))
+
+Результат подаётся в PickScheduler (points_to_tasks) или в стриминг
+позы (stream_points).
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from medu_servo import stream_paced
+from medu_wrappers import medu_get_cartesian_coordinates
+
+# ---------------------------------------------------------------------------
+# 1. Подгонка преобразований
+# ---------------------------------------------------------------------------
+
+
+def _as_points(points):
+    array = np.asarray(points, dtype=float)
+    if array.ndim == 1:
+        array = array.reshape(1, -1)
+    if array.ndim != 2 or array.shape[1] != 3:
+        raise ValueError(f"ожидается массив точек (N, 3), получено {array.shape}")
+    return array
+
+
+def fit_rigid(src, dst):
+    """
+    Поворот R и сдвиг t, минимизирующие |R @ src + t - dst| (алгоритм Кабша).
+    Нужно >= 3 точек не на одной прямой. Возвращает матрицу 4x4.
+    """
+    src = _as_points(src)
+    dst = _as_points(dst)
+    if len(src) != len(dst) or len(src) < 3:
+        raise ValueError("нужно одинаковое число точек, не меньше 3")
+
+    src_mean = src.mean(axis=0)
+    dst_mean = dst.mean(axis=0)
+    h = (src - src_mean).T @ (dst - dst_mean)
+    u, _, vt = np.linalg.svd(h)
+    d = np.sign(np.linalg.det(vt.T @ u.T))  # защита от отражения
+    rotation = vt.T @ np.diag([1.0, 1.0, d]) @ u.T
+
+    matrix = np.eye(4)
+    matrix[:3, :3] = rotation
+    matrix[:3, 3] = dst_mean - rotation @ src_mean
+    return matrix
+
+
+def fit_affine(src, dst):
+    """
+    Аффинное преобразование dst ≈ A @ src + t методом наименьших квадратов.
+    Нужно >= 4 точек не в одной плоскости. Возвращает матрицу 4x4.
+    """
+    src = _as_points(src)
+    dst = _as_points(dst)
+    if len(src) != len(dst) or len(src) < 4:
+        raise ValueError("нужно одинаковое число точек, не меньше 4")
+
+    homogeneous = np.hstack([src, np.ones((len(src), 1))])
+    solution, _, rank, _ = np.linalg.lstsq(homogeneous, dst, rcond=None)
+    if rank < 4:
+        raise ValueError("точки лежат в одной плоскости — аффинное преобразование не определено")
+
+    matrix = np.eye(4)
+    matrix[:3, :] = solution.T
+    return matrix
+
+
+def apply_matrix(matrix, points):
+    """Применить матрицу 4x4 к массиву точек (N, 3) -> (N, 3)."""
+    points = _as_points(points)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+FITTERS = {"rigid": fit_rigid, "affine": fit_affine}
+
+
+class Transform:
+    """Матрица 4x4 с метаданными калибровки."""
+
+    def __init__(self, matrix, kind="rigid", rms=None, n_points=0, created=None):
+        self.matrix = np.asarray(matrix, dtype=float).reshape(4, 4)
+        self.kind = kind
+        self.rms = rms
+        self.n_points = n_points
+        self.created = created if created is not None else time.time()
+
+    @classmethod
+    def fit(cls, src, dst, kind="rigid"):
+        if kind not in FITTERS:
+            raise ValueError(f"kind должен быть одним из {sorted(FITTERS)}")
+        matrix = FITTERS[kind](src, dst)
+        residual = apply_matrix(matrix, src) - _as_points(dst)
+        rms = float(np.sqrt((residual ** 2).sum(axis=1).mean()))
+        return cls(matrix, kind, rms, len(residual))
+
+    def apply(self, points):
+        return apply_matrix(self.matrix, points)
+
+    def inverse(self):
+        return Transform(np.linalg.inv(self.matrix), self.kind, self.rms, self.n_points, self.created)
+
+    def to_dict(self):
+        return {
+            "matrix": self.matrix.tolist(),
+            "kind": self.kind,
+            "rms": self.rms,
+            "n_points": self.n_points,
+            "created": self.created,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["matrix"], data.get("kind", "rigid"), data.get("rms"), data.get("n_points", 0), data.get("created"))
+
+
+# ---------------------------------------------------------------------------
+# 2. Хранилище калибровок
+# ---------------------------------------------------------------------------
+
+
+class CalibrationStore:
+    """
+    Именованные преобразования "система -> робот" ("camera", "conveyor", ...).
+    Загружаются из JSON один раз и держатся в памяти как массивы NumPy.
+    """
+
+    def __init__(self, path="calibration.json"):
+        self.path = path
+        self.transforms = {}
+        if path and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.transforms = {name: Transform.from_dict(item) for name, item in data.items()}
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({name: t.to_dict() for name, t in self.transforms.items()}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def fit(self, name, pairs, kind="rigid"):
+        """pairs — список (точка в системе name, точка робота). Возвращает Transform."""
+        src = [p[0] for p in pairs]
+        dst = [p[1] for p in pairs]
+        transform = Transform.fit(src, dst, kind)
+        self.transforms[name] = transform
+        return transform
+
+    def get(self, name):
+        if name not in self.transforms:
+            raise KeyError(f"нет калибровки '{name}'")
+        return self.transforms[name]
+
+    def apply(self, name, points):
+        return self.get(name).apply(points)
+
+    def converter(self, name):
+        """
+        Функция points -> список [x, y, z] (обычные float) для стадии
+        to_robot в medu_pipeline.make_pick_pipeline.
+        """
+        transform = self.get(name)
+
+        def to_robot(points):
+            return transform.apply(points).tolist()
+
+        return to_robot
+
+
+# ---------------------------------------------------------------------------
+# 3. Запись пар точек
+# ---------------------------------------------------------------------------
+
+
+def position_from_pose(pose):
+    """
+    Достать [x, y, z] из ответа get_cartesian_coordinates
+    (dict / объект с position / список — зависит от версии SDK).
+    """
+    if pose is None:
+        return None
+    if isinstance(pose, (list, tuple)) and len(pose) >= 3:
+        return [float(v) for v in pose[:3]]
+    if isinstance(pose, dict):
+        if "position" in pose:
+            return position_from_pose(pose["position"])
+        if all(k in pose for k in ("x", "y", "z")):
+            return [float(pose["x"]), float(pose["y"]), float(pose["z"])]
+        return None
+    if hasattr(pose, "position"):
+        return position_from_pose(pose.position)
+    if all(hasattr(pose, k) for k in ("x", "y", "z")):
+        return [float(pose.x), float(pose.y), float(pose.z)]
+    return None
+
+
+def record_pair(manipulator, frame_point, samples=5, interval=0.05):
+    """
+    Пара (frame_point, позиция TCP). Позиция — среднее из samples чтений,
+    чтобы сгладить шум телеметрии. None, если координаты не прочитались.
+    """
+    readings = []
+    for i in range(samples):
+        position = position_from_pose(medu_get_cartesian_coordinates(manipulator))
+        if position is not None:
+            readings.append(position)
+        if i + 1 < samples:
+            time.sleep(interval)
+    if not readings:
+        print("[record_pair] Не удалось прочитать координаты TCP")
+        return None
+    return [float(v) for v in frame_point], np.mean(readings, axis=0).tolist()
+
+
+def collect_pairs(manipulator, frame_points, prompt=input):
+    """
+    Интерактивно записать пары: для каждой точки оператор подводит TCP
+    (пульт/teleop) и нажимает Enter. Возвращает список пар.
+    """
+    pairs = []
+    for i, point in enumerate(frame_points, 1):
+        prompt(f"Точка {i}/{len(frame_points)} {point}: подведите TCP и нажмите Enter ")
+        pair = record_pair(manipulator, point)
+        if pair is not None:
+            pairs.append(pair)
+    return pairs
+
+
+# ---------------------------------------------------------------------------
+# 4. Передача в планировщик и стриминг
+# ---------------------------------------------------------------------------
+
+
+def points_to_tasks(points, place=None, approach_height=0.0, prefix="part"):
+    """Точки робота (N, 3) -> задания PickScheduler (pick = точка + подъём по z)."""
+    picks = _as_points(points) + np.array([0.0, 0.0, approach_height])
+    return [
+        {"id": f"{prefix}-{i}", "pick": pick, "place": list(place) if place is not None else None}
+        for i, pick in enumerate(picks.tolist())
+    ]
+
+
+def stream_points(controller, points, orientation=(0.0, 0.0, 0.0, 1.0), rate_hz=50.0):
+    """
+    Отправить точки (N, 3) как уставки позы через ServoController.stream_pose
+    с частотой rate_hz. Возвращает число отправленных уставок
+    (см. medu_servo.stream_paced).
+    """
+    ox, oy, oz, ow = (float(v) for v in orientation)
+    setpoints = ((x, y, z, ox, oy, oz, ow) for x, y, z in _as_points(points).tolist())
+    return stream_paced(controller.stream_pose, setpoints, rate_hz)
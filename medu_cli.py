@@ -0,0 +1,347 @@
+"""
+medu_cli.py — командная строка для обёрток medu_*.
+
+Примеры (удобно сделать alias medu="python /path/to/medu_cli.py"):
+
+    medu daemon start                    # фоновая сессия на Unix-сокете
+    medu move angles 0.0 -0.35 -0.75 --vf 0.2 --af 0.2
+    medu move coords 0.32 -0.004 0.25 --orientation 0 0 0 1
+    medu arc 0.25 -0.05 0.20 0.25 0.0 0.20 --points 30
+    medu gripper --power on --rotation 20 --grip 10
+    medu gpio write /dev/gpiochip4/e1_pin 1
+    medu conveyor speed 30
+    medu program run edum/default
+    medu state joints
+    medu stop
+    medu daemon stop
+
+Если демон запущен, команда уходит ему по сокету (без connect/get_control).
+Иначе CLI сам подключается, выполняет одну команду и отключается.
+
+Параметры подключения: --host/--client-id/--login/--password или
+переменные окружения MEDU_HOST / MEDU_CLIENT_ID / MEDU_LOGIN / MEDU_PASSWORD.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import medu_wrappers
+from medu_daemon import DaemonClient, default_socket_path, ping, serve
+
+
+# ---------------------------------------------------------------------------
+# 1. Куда отправлять вызовы: демон или прямое подключение
+# ---------------------------------------------------------------------------
+
+class _DirectSession:
+    def __init__(self, args):
+        self.manipulator = medu_wrappers.medu_connect(
+            args.host, args.client_id, args.login, args.password
+        )
+        if self.manipulator is None:
+            raise RuntimeError("не удалось подключиться к MEdu")
+
+    def call(self, name, *call_args, **kwargs):
+        return getattr(medu_wrappers, name)(self.manipulator, *call_args, **kwargs)
+
+    def close(self):
+        try:
+            self.manipulator.disconnect()
+        except Exception as e:
+            print(f"[medu_cli] Ошибка отключения: {e}")
+
+
+def _open_session(args):
+    if not args.no_daemon and os.path.exists(args.socket):
+        try:
+            return DaemonClient(args.socket)
+        except OSError:
+            pass  # сокет остался от упавшего демона
+    return _DirectSession(args)
+
+
+def _print_result(result):
+    if result is None:
+        print("⚠️ Обёртка вернула None (ошибка — см. лог CLI или демона)")
+        return 1
+    if isinstance(result, (dict, list)):
+        print(json.dumps(result, ensure_ascii=False, indent=2, default=repr))
+    else:
+        print(result)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# 2. Подкоманды -> (имя обёртки, args, kwargs)
+# ---------------------------------------------------------------------------
+
+def _calls_for(args):
+    """Список вызовов обёрток для разобранной команды."""
+    cmd = args.command
+
+    if cmd == "move" and args.kind == "angles":
+        return [(
+            "medu_move_to_angles",
+            list(args.joints),
+            {
+                "velocity_factor": args.vf,
+                "acceleration_factor": args.af,
+                "timeout_seconds": args.timeout,
+            },
+        )]
+
+    if cmd == "move" and args.kind == "coords":
+        return [(
+            "medu_move_to_coordinates",
+            list(args.position) + list(args.orientation),
+            {
+                "velocity_scaling_factor": args.vf,
+                "acceleration_scaling_factor": args.af,
+                "timeout_seconds": args.timeout,
+            },
+        )]
+
+    if cmd == "arc":
+        return [(
+            "medu_arc_motion",
+            list(args.target) + list(args.center),
+            {
+                "step": args.step,
+                "count_point_arc": args.points,
+                "max_velocity_scaling_factor": args.vf,
+                "max_acceleration_scaling_factor": args.af,
+                "timeout_seconds": args.timeout,
+            },
+        )]
+
+    if cmd == "gripper":
+        calls = []
+        if args.power is not None:
+            calls.append(("medu_nozzle_power", [args.power == "on"], {}))
+        if args.rotation is not None or args.grip is not None:
+            calls.append(("medu_manage_gripper", [args.rotation, args.grip], {}))
+        return calls
+
+    if cmd == "gpio" and args.action == "write":
+        return [("medu_write_gpio", [args.name, args.value], {"timeout_seconds": args.timeout})]
+    if cmd == "gpio" and args.action == "read":
+        return [("medu_get_gpio_value", [args.name], {"timeout_seconds": args.timeout})]
+
+    if cmd == "conveyor":
+        action = args.action
+        if action == "speed":
+            return [("medu_conveyor_set_speed_motors", [args.value], {})]
+        if action == "servo":
+            return [("medu_conveyor_set_servo_angle", [args.value], {})]
+        if action == "led":
+            return [("medu_conveyor_set_led_color", list(args.rgb), {})]
+        if action == "text":
+            return [("medu_conveyor_display_text", [args.text], {})]
+        if action == "buzz":
+            return [("medu_conveyor_set_buzz_tone", [args.level], {})]
+        if action == "sensors":
+            return [("medu_conveyor_get_sensors_data", [True], {})]
+
+    if cmd == "program":
+        if args.action == "run":
+            return [("medu_run_program", [args.name], {})]
+        if args.action == "json":
+            with open(args.file, "r", encoding="utf-8") as f:
+                program_json = json.load(f)
+            return [("medu_run_program_json", [args.name, program_json], {})]
+        if args.action == "python":
+            with open(args.file, "r", encoding="utf-8") as f:
+                code = f.read()
+            return [("medu_run_python_program", [code], {})]
+
+    if cmd == "state":
+        name = {
+            "joints": "medu_get_joint_state",
+            "home": "medu_get_home_position",
+            "cartesian": "medu_get_cartesian_coordinates",
+        }[args.what]
+        return [(name, [], {})]
+
+    if cmd == "stop":
+        return [("medu_stop_movement", [], {"timeout_seconds": args.timeout})]
+
+    raise ValueError(f"неизвестная команда: {cmd}")
+
+
+# ---------------------------------------------------------------------------
+# 3. Демон
+# ---------------------------------------------------------------------------
+
+def _daemon_command(args):
+    if args.action == "status":
+        rtt = ping(args.socket)
+        if rtt is None:
+            print(f"Демон не запущен ({args.socket})")
+            return 1
+        with DaemonClient(args.socket) as client:
+            info = client.request({"call": "ping"})["result"]
+        print(f"Демон работает: {args.socket}, ping {rtt:.3f} мс, {info}")
+        return 0
+
+    if args.action == "stop":
+        if ping(args.socket) is None:
+            print("Демон не запущен")
+            return 1
+        with DaemonClient(args.socket) as client:
+            client.request({"call": "shutdown"})
+        print("Демон остановлен")
+        return 0
+
+    # start
+    if ping(args.socket) is not None:
+        print(f"Демон уже запущен: {args.socket}")
+        return 0
+
+    if args.foreground:
+        return serve(args.host, args.client_id, args.login, args.password, args.socket)
+
+    env = dict(os.environ)
+    env.update(
+        MEDU_HOST=args.host,
+        MEDU_CLIENT_ID=args.client_id,
+        MEDU_LOGIN=args.login,
+        MEDU_PASSWORD=args.password,
+        MEDU_SOCKET=args.socket,
+    )
+    log = open(args.log, "ab") if args.log else subprocess.DEVNULL
+    subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "medu_daemon.py")],
+        env=env,
+        stdout=log,
+        stderr=log,
+        stdin=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + args.wait
+    while time.monotonic() < deadline:
+        if ping(args.socket) is not None:
+            print(f"✅ Демон запущен: {args.socket}")
+            return 0
+        time.sleep(0.1)
+    print("❌ Демон не ответил (проверь подключение и лог --log)")
+    return 1
+
+
+# ---------------------------------------------------------------------------
+# 4. Разбор аргументов
+# ---------------------------------------------------------------------------
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="medu", description="Управление MEdu через medu_wrappers")
+    parser.add_argument("--host", default=os.environ.get("MEDU_HOST", ""))
+    parser.add_argument("--client-id", default=os.environ.get("MEDU_CLIENT_ID", "medu-cli"))
+    parser.add_argument("--login", default=os.environ.get("MEDU_LOGIN", ""))
+    parser.add_argument("--password", default=os.environ.get("MEDU_PASSWORD", ""))
+    parser.add_argument("--socket", default=default_socket_path())
+    parser.add_argument("--no-daemon", action="store_true", help="не использовать демон")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    daemon = sub.add_parser("daemon", help="фоновая сессия")
+    daemon.add_argument("action", choices=["start", "stop", "status"])
+    daemon.add_argument("--foreground", action="store_true")
+    daemon.add_argument("--log", help="файл для вывода демона")
+    daemon.add_argument("--wait", type=float, default=15.0, help="сколько ждать старта, с")
+
+    move = sub.add_parser("move", help="движение по суставам или координатам")
+    move_sub = move.add_subparsers(dest="kind", required=True)
+    angles = move_sub.add_parser("angles")
+    angles.add_argument("joints", type=float, nargs=3)
+    coords = move_sub.add_parser("coords")
+    coords.add_argument("position", type=float, nargs=3)
+    coords.add_argument("--orientation", type=float, nargs=4, default=[0.0, 0.0, 0.0, 1.0])
+    for p in (angles, coords):
+        p.add_argument("--vf", type=float, default=0.1, help="коэффициент скорости")
+        p.add_argument("--af", type=float, default=0.1, help="коэффициент ускорения")
+        p.add_argument("--timeout", type=float, default=60.0)
+
+    arc = sub.add_parser("arc", help="движение по дуге")
+    arc.add_argument("target", type=float, nargs=3)
+    arc.add_argument("center", type=float, nargs=3)
+    arc.add_argument("--step", type=float, default=0.05)
+    arc.add_argument("--points", type=int, default=50)
+    arc.add_argument("--vf", type=float, default=0.5)
+    arc.add_argument("--af", type=float, default=0.5)
+    arc.add_argument("--timeout", type=float, default=60.0)
+
+    gripper = sub.add_parser("gripper", help="питание насадки и гриппер")
+    gripper.add_argument("--power", choices=["on", "off"])
+    gripper.add_argument("--rotation", type=float)
+    gripper.add_argument("--grip", type=float)
+
+    gpio = sub.add_parser("gpio", help="запись/чтение GPIO")
+    gpio.add_argument("action", choices=["write", "read"])
+    gpio.add_argument("name")
+    gpio.add_argument("value", type=int, nargs="?", choices=[0, 1])
+    gpio.add_argument("--timeout", type=float, default=0.5)
+
+    conveyor = sub.add_parser("conveyor", help="конвейер MGbot")
+    conv_sub = conveyor.add_subparsers(dest="action", required=True)
+    conv_sub.add_parser("speed").add_argument("value", type=int)
+    conv_sub.add_parser("servo").add_argument("value", type=float)
+    conv_sub.add_parser("led").add_argument("rgb", type=int, nargs=3)
+    conv_sub.add_parser("text").add_argument("text")
+    conv_sub.add_parser("buzz").add_argument("level", type=int)
+    conv_sub.add_parser("sensors")
+
+    program = sub.add_parser("program", help="программы на роботе")
+    prog_sub = program.add_subparsers(dest="action", required=True)
+    prog_sub.add_parser("run").add_argument("name")
+    prog_json = prog_sub.add_parser("json")
+    prog_json.add_argument("name")
+    prog_json.add_argument("file")
+    prog_sub.add_parser("python").add_argument("file")
+
+    state = sub.add_parser("state", help="чтение состояния")
+    state.add_argument("what", choices=["joints", "home", "cartesian"])
+
+    stop = sub.add_parser("stop", help="остановить движение")
+    stop.add_argument("--timeout", type=float, default=5.0)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "daemon":
+        return _daemon_command(args)
+
+    if args.command == "gpio" and args.action == "write" and args.value is None:
+        print("❌ gpio write: нужно значение 0 или 1")
+        return 2
+
+    calls = _calls_for(args)
+    if not calls:
+        print("Нечего делать")
+        return 0
+
+    try:
+        session = _open_session(args)
+    except Exception as e:
+        print(f"❌ {e}")
+        return 1
+
+    code = 0
+    try:
+        for name, call_args, kwargs in calls:
+            code = _print_result(session.call(name, *call_args, **kwargs)) or code
+    except Exception as e:
+        print(f"❌ {e}")
+        code = 1
+    finally:
+        session.close()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
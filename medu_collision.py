@@ -0,0 +1,354 @@
+"""
+medu_collision.py — проверка столкновений с неподвижной обстановкой ячейки
+до отправки движения на робот.
+
+Модель ячейки (CellModel) — параллелепипеды по осям (AABB: стол, короб
+конвейера, лотки) и капсулы (отрезок + радиус: стойки, кабель-каналы).
+Инструмент — шар радиуса tool_radius вокруг TCP, плюс запас margin.
+
+Путь дискретизируется с шагом resolution (по умолчанию 5 мм), расстояния
+до всех препятствий считаются для всех точек сразу (NumPy):
+
+    cell = CellModel.load("cell.json")
+    hit = cell.check_move(start, goal)
+    if not hit.ok:
+        print(hit)                       # где и обо что
+
+    guarded_move_to_coordinates(manipulator, cell, x, y, z, 0, 0, 0, 1)
+
+Для стрима CheckedServo проверяет каждую уставку (и отрезок от
+предыдущей) перед ServoController.stream_pose.
+"""
+
+import json
+
+import numpy as np
+
+from medu_calibration import position_from_pose
+from medu_wrappers import medu_arc_motion, medu_get_cartesian_coordinates, medu_move_to_coordinates
+
+DEFAULT_RESOLUTION = 0.005
+
+
+# ---------------------------------------------------------------------------
+# 1. Дискретизация путей
+# ---------------------------------------------------------------------------
+
+
+def sample_segment(a, b, resolution=DEFAULT_RESOLUTION):
+    """Точки отрезка a -> b с шагом не больше resolution, включая концы."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    n = max(1, int(np.ceil(np.linalg.norm(b - a) / resolution)))
+    t = np.linspace(0.0, 1.0, n + 1)[:, None]
+    return a + t * (b - a)
+
+
+def sample_arc(start, target, center, resolution=DEFAULT_RESOLUTION):
+    """
+    Точки дуги от start до target вокруг center (короткая дуга в плоскости
+    трёх точек, как считает medu_motion_time.arc_length).
+    """
+    start = np.asarray(start, dtype=float)
+    target = np.asarray(target, dtype=float)
+    center = np.asarray(center, dtype=float)
+    va = start - center
+    vb = target - center
+    ra = np.linalg.norm(va)
+    rb = np.linalg.norm(vb)
+    if ra < 1e-9 or rb < 1e-9:
+        return sample_segment(start, target, resolution)
+    angle = np.arccos(np.clip(np.dot(va, vb) / (ra * rb), -1.0, 1.0))
+    if angle < 1e-6 or np.pi - angle < 1e-6:
+        return sample_segment(start, target, resolution)
+    n = max(1, int(np.ceil(max(ra, rb) * angle / resolution)))
+    t = np.linspace(0.0, 1.0, n + 1)[:, None]
+    ua = va / ra
+    ub = vb / rb
+    direction = (np.sin((1.0 - t) * angle) * ua + np.sin(t * angle) * ub) / np.sin(angle)
+    radius = ra + t * (rb - ra)  # если start и target на разном расстоянии
+    return center + direction * radius
+
+
+# ---------------------------------------------------------------------------
+# 2. Модель ячейки
+# ---------------------------------------------------------------------------
+
+
+class CollisionResult:
+    """ok, номер первой точки с нарушением, её координаты, препятствие, зазор."""
+
+    def __init__(self, ok, index=None, point=None, obstacle=None, clearance=None, samples=0):
+        self.ok = ok
+        self.index = index
+        self.point = point
+        self.obstacle = obstacle
+        self.clearance = clearance
+        self.samples = samples
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        if self.ok:
+            return f"CollisionResult(ok, samples={self.samples}, min_clearance={self.clearance:.4f})"
+        return (
+            f"CollisionResult(столкновение с '{self.obstacle}' в точке {self.index} "
+            f"{np.round(self.point, 4).tolist()}, зазор {self.clearance:.4f} м)"
+        )
+
+
+class CellModel:
+    """Неподвижные препятствия ячейки и размер инструмента."""
+
+    def __init__(self, tool_radius=0.02, margin=0.005):
+        self.tool_radius = float(tool_radius)
+        self.margin = float(margin)
+        self.names = []
+        self.kinds = []
+        self._box_lo = np.zeros((0, 3))
+        self._box_hi = np.zeros((0, 3))
+        self._cap_a = np.zeros((0, 3))
+        self._cap_b = np.zeros((0, 3))
+        self._cap_r = np.zeros(0)
+
+    # --- препятствия -------------------------------------------------------
+
+    def add_box(self, name, lo, hi):
+        lo, hi = np.minimum(lo, hi), np.maximum(lo, hi)
+        self._box_lo = np.vstack([self._box_lo, lo])
+        self._box_hi = np.vstack([self._box_hi, hi])
+        self.names.insert(len(self._box_lo) - 1, name)
+        self.kinds.insert(len(self._box_lo) - 1, "box")
+        return self
+
+    def add_capsule(self, name, a, b, radius):
+        self._cap_a = np.vstack([self._cap_a, a])
+        self._cap_b = np.vstack([self._cap_b, b])
+        self._cap_r = np.append(self._cap_r, float(radius))
+        self.names.append(name)
+        self.kinds.append("capsule")
+        return self
+
+    # --- расстояния --------------------------------------------------------
+
+    def distances(self, points):
+        """
+        Расстояния от точек (P, 3) до поверхности каждого препятствия:
+        массив (P, число препятствий); внутри препятствия — <= 0.
+        Порядок столбцов — как в self.names (сначала AABB, потом капсулы).
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        columns = []
+        if len(self._box_lo):
+            p = points[:, None, :]
+            outside = np.maximum(np.maximum(self._box_lo - p, p - self._box_hi), 0.0)
+            d_out = np.linalg.norm(outside, axis=2)
+            # внутри коробки — минус расстояние до ближайшей грани
+            d_in = np.minimum(p - self._box_lo, self._box_hi - p).min(axis=2)
+            columns.append(np.where(d_out > 0.0, d_out, -d_in))
+        if len(self._cap_a):
+            ab = self._cap_b - self._cap_a
+            ab_len2 = np.maximum((ab * ab).sum(axis=1), 1e-18)
+            ap = points[:, None, :] - self._cap_a
+            t = np.clip((ap * ab).sum(axis=2) / ab_len2, 0.0, 1.0)
+            closest = self._cap_a + t[:, :, None] * ab
+            columns.append(np.linalg.norm(points[:, None, :] - closest, axis=2) - self._cap_r)
+        if not columns:
+            return np.full((len(points), 0), np.inf)
+        return np.hstack(columns)
+
+    def check_points(self, points):
+        """Проверить точки (P, 3) по порядку; результат — первое нарушение."""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        if not self.names:
+            return CollisionResult(True, clearance=np.inf, samples=len(points))
+        d = self.distances(points)
+        nearest = d.argmin(axis=1)
+        clearance = d[np.arange(len(points)), nearest]
+        bad = np.flatnonzero(clearance < self.tool_radius + self.margin)
+        if len(bad) == 0:
+            return CollisionResult(True, clearance=float(clearance.min()) - self.tool_radius, samples=len(points))
+        i = int(bad[0])
+        return CollisionResult(
+            False,
+            index=i,
+            point=points[i],
+            obstacle=self.names[int(nearest[i])],
+            clearance=float(clearance[i]) - self.tool_radius,
+            samples=len(points),
+        )
+
+    def nearest(self, x, y, z):
+        """
+        (зазор, имя препятствия) для одной точки — без NumPy: на одиночной
+        точке накладные расходы массивов больше самого расчёта.
+        """
+        best = float("inf")
+        best_name = None
+        for i, (lo, hi) in enumerate(zip(self._box_lo.tolist(), self._box_hi.tolist())):
+            dx = max(lo[0] - x, 0.0, x - hi[0])
+            dy = max(lo[1] - y, 0.0, y - hi[1])
+            dz = max(lo[2] - z, 0.0, z - hi[2])
+            d = (dx * dx + dy * dy + dz * dz) ** 0.5
+            if d == 0.0:
+                d = -min(x - lo[0], hi[0] - x, y - lo[1], hi[1] - y, z - lo[2], hi[2] - z)
+            if d < best:
+                best, best_name = d, self.names[i]
+        n_boxes = len(self._box_lo)
+        for i, (a, b, r) in enumerate(zip(self._cap_a.tolist(), self._cap_b.tolist(), self._cap_r.tolist())):
+            abx, aby, abz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+            apx, apy, apz = x - a[0], y - a[1], z - a[2]
+            t = (apx * abx + apy * aby + apz * abz) / max(abx * abx + aby * aby + abz * abz, 1e-18)
+            t = min(1.0, max(0.0, t))
+            cx, cy, cz = apx - t * abx, apy - t * aby, apz - t * abz
+            d = (cx * cx + cy * cy + cz * cz) ** 0.5 - r
+            if d < best:
+                best, best_name = d, self.names[n_boxes + i]
+        return best - self.tool_radius, best_name
+
+    def check_move(self, start, goal, resolution=DEFAULT_RESOLUTION):
+        """Прямолинейное движение TCP (как приближение move_to_coordinates)."""
+        return self.check_points(sample_segment(start, goal, resolution))
+
+    def check_arc(self, start, target, center, resolution=DEFAULT_RESOLUTION):
+        return self.check_points(sample_arc(start, target, center, resolution))
+
+    def check_path(self, points, resolution=DEFAULT_RESOLUTION):
+        """Ломаная / пачка уставок стрима: проверяются и отрезки между точками."""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        if len(points) < 2:
+            return self.check_points(points)
+        dense = [points[:1]]
+        for a, b in zip(points[:-1], points[1:]):
+            dense.append(sample_segment(a, b, resolution)[1:])
+        return self.check_points(np.vstack(dense))
+
+    # --- сохранение --------------------------------------------------------
+
+    def to_dict(self):
+        obstacles = []
+        for i in range(len(self._box_lo)):
+            obstacles.append(
+                {"name": self.names[i], "type": "box", "min": self._box_lo[i].tolist(), "max": self._box_hi[i].tolist()}
+            )
+        for i in range(len(self._cap_a)):
+            obstacles.append(
+                {
+                    "name": self.names[len(self._box_lo) + i],
+                    "type": "capsule",
+                    "a": self._cap_a[i].tolist(),
+                    "b": self._cap_b[i].tolist(),
+                    "radius": float(self._cap_r[i]),
+                }
+            )
+        return {"tool_radius": self.tool_radius, "margin": self.margin, "obstacles": obstacles}
+
+    @classmethod
+    def from_dict(cls, data):
+        cell = cls(data.get("tool_radius", 0.02), data.get("margin", 0.005))
+        for item in data.get("obstacles", []):
+            if item["type"] == "box":
+                cell.add_box(item["name"], item["min"], item["max"])
+            elif item["type"] == "capsule":
+                cell.add_capsule(item["name"], item["a"], item["b"], item["radius"])
+            else:
+                raise ValueError(f"неизвестный тип препятствия: {item['type']!r}")
+        return cell
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# ---------------------------------------------------------------------------
+# 3. Проверка перед отправкой
+# ---------------------------------------------------------------------------
+
+
+def _current_position(manipulator, start):
+    if start is not None:
+        return start
+    return position_from_pose(medu_get_cartesian_coordinates(manipulator))
+
+
+def guarded_move_to_coordinates(manipulator, cell, x, y, z, ox, oy, oz, ow, start=None, **kwargs):
+    """
+    medu_move_to_coordinates, если путь от start (по умолчанию — текущая
+    позиция TCP) свободен. Иначе печатает причину и возвращает None.
+    """
+    start = _current_position(manipulator, start)
+    if start is None:
+        print("[guarded_move_to_coordinates] Нет текущей позиции — движение не отправлено")
+        return None
+    hit = cell.check_move(start, (x, y, z))
+    if not hit.ok:
+        print(f"[guarded_move_to_coordinates] {hit} — движение не отправлено")
+        return None
+    return medu_move_to_coordinates(manipulator, x, y, z, ox, oy, oz, ow, **kwargs)
+
+
+def guarded_arc_motion(manipulator, cell, target, center, start=None, **kwargs):
+    """medu_arc_motion с проверкой дуги (target, center — [x, y, z])."""
+    start = _current_position(manipulator, start)
+    if start is None:
+        print("[guarded_arc_motion] Нет текущей позиции — движение не отправлено")
+        return None
+    hit = cell.check_arc(start, target, center)
+    if not hit.ok:
+        print(f"[guarded_arc_motion] {hit} — движение не отправлено")
+        return None
+    return medu_arc_motion(manipulator, *target, *center, **kwargs)
+
+
+class CheckedServo:
+    """
+    Стрим поз с проверкой: уставка (и отрезок от предыдущей) проверяется
+    до ServoController.stream_pose. При нарушении уставка не отправляется
+    и возвращается False (явная ошибка — stream_paced останавливается);
+    last_hit — причина.
+    """
+
+    def __init__(self, controller, cell, resolution=DEFAULT_RESOLUTION):
+        self.controller = controller
+        self.cell = cell
+        self.resolution = resolution
+        self.previous = None
+        self.rejected = 0
+        self.last_hit = None
+
+    def stream_pose(self, x, y, z, ox, oy, oz, ow):
+        point = (x, y, z)
+        previous = self.previous
+        step2 = (
+            float("inf") if previous is None
+            else (x - previous[0]) ** 2 + (y - previous[1]) ** 2 + (z - previous[2]) ** 2
+        )
+        if previous is None or step2 <= self.resolution * self.resolution:
+            # обычный случай: уставки чаще шага дискретизации — одна точка
+            clearance, name = self.cell.nearest(x, y, z)
+            if clearance < self.cell.margin:
+                hit = CollisionResult(False, 0, point, name, clearance, 1)
+            else:
+                hit = None
+        else:
+            hit = self.cell.check_move(previous, point, self.resolution)
+            hit = None if hit.ok else hit
+        if hit is not None:
+            self.rejected += 1
+            self.last_hit = hit
+            return False
+        self.previous = point
+        return self.controller.stream_pose(x, y, z, ox, oy, oz, ow)
+
+    def check_batch(self, poses):
+        """Проверить пачку поз (N, 3+) целиком до начала стрима."""
+        points = np.asarray(poses, dtype=float)[:, :3]
+        if self.previous is not None:
+            points = np.vstack([self.previous, points])
+        return self.cell.check_path(points, self.resolution)
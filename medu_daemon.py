@@ -0,0 +1,219 @@
+"""
+medu_daemon.py — фоновый процесс, который держит сессию MEdu и принимает
+вызовы обёрток medu_* по локальному Unix-сокету.
+
+Подключение + get_control делаются один раз при старте демона, после чего
+каждый вызов из CLI — это один обмен строками JSON по сокету:
+
+    -> {"call": "medu_move_to_angles", "args": [0.0, -0.35, -0.75], "kwargs": {"velocity_factor": 0.2}}
+    <- {"ok": true, "result": ...}
+    <- {"ok": false, "error": "..."}
+
+Первым аргументом обёртке подставляется manipulator демона. Вызывать можно
+только функции medu_* из medu_wrappers (кроме medu_connect), а также
+служебные "ping" и "shutdown".
+
+Путь сокета: переменная окружения MEDU_SOCKET или /tmp/medu-<uid>.sock.
+Запуск в фоне — medu_cli.py daemon start, в текущем процессе — serve().
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+import medu_wrappers
+
+
+def default_socket_path():
+    return os.environ.get("MEDU_SOCKET") or f"/tmp/medu-{os.getuid()}.sock"
+
+
+def to_jsonable(value, depth=0):
+    """Привести ответ SDK к виду, который можно отдать в JSON."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if depth > 5:
+        return repr(value)
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v, depth + 1) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v, depth + 1) for v in value]
+    if hasattr(value, "__dict__"):
+        return {
+            k: to_jsonable(v, depth + 1)
+            for k, v in vars(value).items()
+            if not k.startswith("_")
+        }
+    return repr(value)
+
+
+def wrapper_function(name):
+    """Найти разрешённую обёртку по имени или бросить ValueError."""
+    if not isinstance(name, str) or not name.startswith("medu_") or name == "medu_connect":
+        raise ValueError(f"вызов {name!r} не разрешён")
+    func = getattr(medu_wrappers, name, None)
+    if not callable(func):
+        raise ValueError(f"нет обёртки {name!r}")
+    return func
+
+
+# ---------------------------------------------------------------------------
+# 1. Сервер
+# ---------------------------------------------------------------------------
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon = self.server.medu_daemon
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = daemon.dispatch(request)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if response.get("shutdown"):
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MeduDaemon:
+    """
+    Держит manipulator и выполняет вызовы из сокета.
+    Вызовы SDK сериализуются блокировкой: сессия одна.
+    """
+
+    def __init__(self, manipulator, socket_path=None):
+        self.manipulator = manipulator
+        self.socket_path = socket_path or default_socket_path()
+        self.started = time.time()
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def dispatch(self, request):
+        name = request.get("call")
+        if name == "ping":
+            return {"ok": True, "result": {"uptime_s": time.time() - self.started, "calls": self.calls}}
+        if name == "shutdown":
+            return {"ok": True, "result": None, "shutdown": True}
+
+        func = wrapper_function(name)
+        args = request.get("args") or []
+        kwargs = request.get("kwargs") or {}
+        with self._lock:
+            result = func(self.manipulator, *args, **kwargs)
+            self.calls += 1
+        return {"ok": True, "result": to_jsonable(result)}
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            # Старый сокет от упавшего демона
+            if ping(self.socket_path) is not None:
+                raise RuntimeError(f"демон уже запущен: {self.socket_path}")
+            os.unlink(self.socket_path)
+
+        self._server = _Server(self.socket_path, _Handler)
+        self._server.medu_daemon = self
+        os.chmod(self.socket_path, 0o600)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def serve(host, client_id, login, password, socket_path=None):
+    """Подключиться к роботу и обслуживать сокет до команды shutdown."""
+    manipulator = medu_wrappers.medu_connect(host, client_id, login, password)
+    if manipulator is None:
+        print("[medu_daemon] Не удалось подключиться к MEdu")
+        return 1
+
+    daemon = MeduDaemon(manipulator, socket_path)
+    print(f"[medu_daemon] Слушаю {daemon.socket_path}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            manipulator.disconnect()
+        except Exception as e:
+            print(f"[medu_daemon] Ошибка отключения: {e}")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# 2. Клиент
+# ---------------------------------------------------------------------------
+
+class DaemonClient:
+    """Постоянное соединение с демоном; call() — один вызов обёртки."""
+
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path or default_socket_path()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(self.socket_path)
+        self._file = self._sock.makefile("rwb")
+
+    def request(self, payload):
+        self._file.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("демон закрыл соединение")
+        return json.loads(line)
+
+    def call(self, name, *args, **kwargs):
+        """Вызвать обёртку на стороне демона. Ошибка протокола -> RuntimeError."""
+        response = self.request({"call": name, "args": list(args), "kwargs": kwargs})
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error"))
+        return response.get("result")
+
+    def close(self):
+        try:
+            self._file.close()
+        finally:
+            self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def ping(socket_path=None, timeout=1.0):
+    """Время обмена с демоном в мс или None, если демон недоступен."""
+    try:
+        with DaemonClient(socket_path, timeout=timeout) as client:
+            t0 = time.perf_counter()
+            client.request({"call": "ping"})
+            return (time.perf_counter() - t0) * 1000.0
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == "__main__":
+    # Запуск из medu_cli.py daemon start: параметры подключения — через окружение,
+    # чтобы пароль не светился в списке процессов
+    raise SystemExit(
+        serve(
+            os.environ.get("MEDU_HOST", ""),
+            os.environ.get("MEDU_CLIENT_ID", "medu-daemon"),
+            os.environ.get("MEDU_LOGIN", ""),
+            os.environ.get("MEDU_PASSWORD", ""),
+            os.environ.get("MEDU_SOCKET"),
+        )
+    )
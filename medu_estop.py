@@ -0,0 +1,207 @@
+"""
+medu_estop.py — быстрый канал аварийной остановки, независимый от основной сессии.
+
+medu_stop_movement идёт через ту же сессию SDK, что и обычные команды,
+и может ждать завершения длинного move_to_angles. EmergencyStop держит
+свою заранее установленную сессию и свой поток, который по сигналу сразу
+вызывает stop_movement_no_wait (или stop_movement, если no_wait нет)
+без проверок параметров.
+
+Сработать можно из:
+- обработчика сигналов ОС (install_signal_handlers);
+- callback'а фронта GPIO (gpio_callback);
+- callback'а аппаратной ошибки (hardware_error_callback).
+
+trigger() только пишет байт в pipe (os.write безопасен в обработчике
+сигнала и не берёт блокировок Python), поток остановки ждёт на os.read.
+"""
+
+import os
+import signal
+import threading
+import time
+
+from medu_stats import percentile
+
+
+class EmergencyStop:
+    """
+    Канал остановки поверх отдельного объекта manipulator
+    (лучше отдельной сессии — см. EmergencyStop.connect).
+
+    grab_control_on_trigger — после первой команды остановки забрать
+    управление (get_control, с подтверждением) и повторить остановку:
+    без управления первая команда могла быть отклонена.
+    """
+
+    def __init__(self, manipulator, timeout_seconds=1.0, grab_control_on_trigger=True):
+        if manipulator is None:
+            raise ValueError("manipulator == None")
+        self.manipulator = manipulator
+        self.timeout_seconds = float(timeout_seconds)
+        self.grab_control_on_trigger = grab_control_on_trigger
+
+        # Методы ищем один раз, чтобы в момент остановки не тратить на это время
+        self._stop_no_wait = getattr(manipulator, "stop_movement_no_wait", None)
+        self._stop = getattr(manipulator, "stop_movement", None)
+        self._get_control = getattr(manipulator, "get_control", None)
+
+        self._read_fd, self._write_fd = os.pipe()
+        self._trigger_times = []  # perf_counter моментов trigger()
+        self._running = False
+        self._thread = None
+        self._previous_handlers = {}
+
+        # Замеры, мс
+        self.trigger_to_send_ms = []
+        self.send_call_ms = []
+        self.reasons = []
+        self.errors = 0
+
+    @classmethod
+    def connect(cls, host, client_id, login, password, **kwargs):
+        """
+        Создать отдельную сессию MEdu (client_id должен отличаться от основного)
+        и канал остановки поверх неё. Управление не захватывается заранее,
+        чтобы не отнимать его у основной сессии.
+        """
+        from sdk.manipulators.medu import MEdu
+
+        manipulator = MEdu(host, client_id, login, password)
+        manipulator.connect()
+        channel = cls(manipulator, **kwargs)
+        channel.start()
+        return channel
+
+    # --- запуск / остановка -----------------------------------------------
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="medu-estop", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._running = False
+        try:
+            os.write(self._write_fd, b"q")
+        except OSError:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.restore_signal_handlers()
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+    # --- триггеры ----------------------------------------------------------
+
+    def trigger(self, reason="manual"):
+        """Запросить остановку. Можно вызывать из обработчика сигнала."""
+        self._trigger_times.append(time.perf_counter())
+        self.reasons.append(reason)
+        os.write(self._write_fd, b"s")
+
+    def gpio_callback(self, *args, **kwargs):
+        """Callback для фронта GPIO (аргументы игнорируются)."""
+        self.trigger("gpio")
+
+    def hardware_error_callback(self, data=None):
+        """Callback для subscribe_hardware_error."""
+        self.trigger("hardware_error")
+
+    def install_signal_handlers(self, signals=(signal.SIGINT, signal.SIGTERM), chain=True):
+        """
+        Остановка по сигналам ОС (только из главного потока).
+        chain=True — после остановки вызвать прежний обработчик
+        (например, KeyboardInterrupt для SIGINT).
+        """
+        for signum in signals:
+            previous = signal.getsignal(signum)
+            self._previous_handlers[signum] = previous
+
+            def handler(sig, frame, previous=previous):
+                self.trigger(f"signal {sig}")
+                if chain and callable(previous):
+                    previous(sig, frame)
+
+            signal.signal(signum, handler)
+
+    def restore_signal_handlers(self):
+        for signum, previous in self._previous_handlers.items():
+            try:
+                signal.signal(signum, previous)
+            except (ValueError, TypeError):
+                pass
+        self._previous_handlers = {}
+
+    # --- поток остановки ---------------------------------------------------
+
+    def _worker(self):
+        while self._running:
+            try:
+                data = os.read(self._read_fd, 64)
+            except OSError:
+                break
+            if not self._running:
+                break
+            if b"s" not in data:
+                continue
+
+            # Несколько триггеров подряд — одна остановка
+            triggers = self._trigger_times
+            self._trigger_times = []
+            send_start = time.perf_counter()
+            self._send_stop()
+            send_end = time.perf_counter()
+
+            if triggers:
+                self.trigger_to_send_ms.append((send_start - triggers[0]) * 1000.0)
+            self.send_call_ms.append((send_end - send_start) * 1000.0)
+
+    def _stop_once(self):
+        if self._stop_no_wait is not None:
+            self._stop_no_wait()
+        else:
+            self._stop(timeout_seconds=self.timeout_seconds)
+
+    def _send_stop(self):
+        try:
+            # Сразу: если управление у этой сессии уже есть, этого достаточно
+            self._stop_once()
+            if self.grab_control_on_trigger and self._get_control is not None:
+                # get_control_no_wait + стоп могли разминуться: стоп дошёл бы
+                # раньше управления и был бы отклонён — ждём подтверждения
+                self._get_control()
+                self._stop_once()
+        except Exception as e:
+            self.errors += 1
+            print(f"[EmergencyStop] Ошибка: {e}")
+
+    # --- замеры ------------------------------------------------------------
+
+    def latency_report(self):
+        """trigger_to_send — от trigger() до начала вызова SDK, send_call — сам вызов."""
+        report = {"stops": len(self.send_call_ms), "errors": self.errors}
+        for name, values in (
+            ("trigger_to_send", self.trigger_to_send_ms),
+            ("send_call", self.send_call_ms),
+        ):
+            report[name] = {
+                "p50_ms": percentile(values, 0.5),
+                "p99_ms": percentile(values, 0.99),
+                "max_ms": max(values) if values else None,
+            }
+        return report
+
+    def benchmark(self, count=100, interval=0.01):
+        """
+        Сработать count раз с паузой interval и вернуть latency_report().
+        На реальном роботе отправляет count команд остановки.
+        """
+        self.start()
+        for _ in range(count):
+            self.trigger("benchmark")
+            time.sleep(interval)
+        time.sleep(max(interval, 0.1))
+        return self.latency_report()
@@ -0,0 +1,350 @@
+"""
+medu_fast_stream.py — дешёвый путь стрима уставок на 100+ Гц.
+
+Каждый medu_stream_coordinates / ServoController.stream_pose на каждом
+такте проверяет все аргументы, определяет режим по виду setpoint,
+импортирует классы SDK и создаёт новые MoveCoordinatesParamsPosition /
+MoveCoordinatesParamsOrientation. FastStreamer делает это один раз:
+
+- режим переключается в begin() (через ServoController, если он есть),
+  дальше на такте проверок режима нет;
+- reuse=True — объекты параметров создаются один раз, и на каждом
+  такте только перезаписываются поля .x/.y/.z/.w. medu_api.md описывает
+  только конструкторы, поэтому по умолчанию reuse=False (новые объекты),
+  а при reuse=True __init__ проверяет, что запись полей читается
+  обратно, иначе возвращается к новым объектам;
+- проверки — только то, что может навредить: диапазон суставов и
+  нулевой кватернион.
+
+Сериализацию в самом SDK (формат сообщения MQTT) мы не контролируем —
+она одинакова для всех путей. Свой участок "провода" — передача уставок
+из другого процесса (зрение, телеоп) владельцу сессии: вместо строки
+JSON демона — кадр фиксированного размера (FRAME: тип + 7 float64),
+упакованный в заранее выделенный буфер; FrameSender / serve_frames —
+Unix-датаграммы, приём в один и тот же буфер (recv_into).
+
+    streamer = FastStreamer(manipulator, controller=servo)
+    streamer.begin("pose")
+    for x, y, z in path:
+        streamer.pose(x, y, z, 0.0, 0.0, 0.0, 1.0)
+
+    python medu_fast_stream.py            # бенчмарк на цифровом двойнике (SDK не нужен)
+    python medu_fast_stream.py --host ... # на роботе: текущая поза и углы, 100 Гц (--rate-hz)
+"""
+
+import argparse
+import json
+import math
+import os
+import socket
+import struct
+import time
+
+from medu_wrappers import medu_stream_coordinates, medu_stream_joint_angles
+
+JOINT_MIN = -3.14
+JOINT_MAX = 3.14
+
+# Кадр уставки: тип (KIND_*) + 7 float64; для суставов последний не используется
+FRAME = struct.Struct("<B7d")
+KIND_POSE = 1
+KIND_JOINTS = 2
+
+
+class FastStreamer:
+    """Стрим поз/суставов одного manipulator без лишней работы на такте."""
+
+    def __init__(self, manipulator, controller=None, reuse=False):
+        from sdk.commands.move_coordinates_command import (
+            MoveCoordinatesParamsOrientation,
+            MoveCoordinatesParamsPosition,
+        )
+
+        self.manipulator = manipulator
+        self.controller = controller
+        self._position_cls = MoveCoordinatesParamsPosition
+        self._orientation_cls = MoveCoordinatesParamsOrientation
+        self._position = MoveCoordinatesParamsPosition(0.0, 0.0, 0.0)
+        self._orientation = MoveCoordinatesParamsOrientation(0.0, 0.0, 0.0, 1.0)
+        self.reuse = reuse and self._fields_writable()
+        self.sent = 0
+        self.errors = 0
+
+    def _fields_writable(self):
+        """
+        Поля .x/.y/.z/.w меняются записью? Если нет (другие имена, slots,
+        свойства только для чтения), переиспользование молча стримило бы
+        позу из __init__ — тогда только новые объекты.
+        """
+        probe = (0.125, -0.25, 0.375, 0.5)
+        try:
+            position, orientation = self._position, self._orientation
+            position.x, position.y, position.z = probe[:3]
+            orientation.x, orientation.y, orientation.z, orientation.w = probe
+            ok = (position.x, position.y, position.z) == probe[:3] and (
+                orientation.x, orientation.y, orientation.z, orientation.w
+            ) == probe
+        except Exception:
+            ok = False
+        if not ok:
+            print("[FastStreamer] Поля параметров SDK не перезаписываются — reuse выключен")
+        return ok
+
+    def begin(self, kind):
+        """
+        Включить режим стрима один раз перед циклом: "pose" или "joints".
+        Без controller режим должен быть уже включён. Возвращает True/False.
+        """
+        if kind not in ("pose", "joints"):
+            print(f"[FastStreamer.begin] Ошибка: kind должен быть 'pose' или 'joints', получено {kind!r}")
+            return False
+        if self.controller is None:
+            return True
+        from sdk.utils.enums import ServoControlType
+
+        mode = ServoControlType.POSE if kind == "pose" else ServoControlType.JOINT_JOG
+        return self.controller.set_mode(mode)
+
+    def pose(self, x, y, z, ox, oy, oz, ow):
+        """
+        Одна уставка позы. Возвращает ответ SDK (обычно None) или False
+        при ошибке — как ServoController, см. medu_servo.stream_paced.
+        """
+        try:
+            norm = math.sqrt(ox * ox + oy * oy + oz * oz + ow * ow)
+            if norm < 1e-6:
+                raise ValueError("кватернион (ox, oy, oz, ow) нулевой")
+            if self.reuse:
+                position, orientation = self._position, self._orientation
+                position.x, position.y, position.z = x, y, z
+                orientation.x, orientation.y, orientation.z, orientation.w = ox / norm, oy / norm, oz / norm, ow / norm
+            else:
+                position = self._position_cls(x, y, z)
+                orientation = self._orientation_cls(ox / norm, oy / norm, oz / norm, ow / norm)
+            result = self.manipulator.stream_coordinates(position, orientation)
+            self.sent += 1
+            return result
+        except Exception as e:
+            self.errors += 1
+            print(f"[FastStreamer.pose] Ошибка: {e}")
+            return False
+
+    def joints(self, q0, q1, q2, v0=0.0, v1=0.0, v2=0.0):
+        """Одна уставка суставов (3 угла + 3 скорости). Ответ SDK или False."""
+        try:
+            if not (JOINT_MIN <= q0 <= JOINT_MAX and JOINT_MIN <= q1 <= JOINT_MAX and JOINT_MIN <= q2 <= JOINT_MAX):
+                raise ValueError(f"углы ({q0}, {q1}, {q2}) вне диапазона [{JOINT_MIN}, {JOINT_MAX}]")
+            result = self.manipulator.stream_joint_angles(q0, q1, q2, v0, v1, v2)
+            self.sent += 1
+            return result
+        except Exception as e:
+            self.errors += 1
+            print(f"[FastStreamer.joints] Ошибка: {e}")
+            return False
+
+    def send_frame(self, buffer):
+        """Выполнить кадр FRAME из буфера (см. serve_frames)."""
+        kind, a, b, c, d, e, f, g = FRAME.unpack_from(buffer)
+        if kind == KIND_POSE:
+            return self.pose(a, b, c, d, e, f, g)
+        if kind == KIND_JOINTS:
+            return self.joints(a, b, c, d, e, f)
+        self.errors += 1
+        print(f"[FastStreamer.send_frame] Ошибка: неизвестный тип кадра {kind}")
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 2. Кадры между процессами
+# ---------------------------------------------------------------------------
+
+
+def default_frame_socket_path():
+    return os.environ.get("MEDU_STREAM_SOCKET") or f"/tmp/medu-stream-{os.getuid()}.sock"
+
+
+class FrameSender:
+    """Клиент: пакует уставку в один и тот же буфер и шлёт датаграммой."""
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or default_frame_socket_path()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._buffer = bytearray(FRAME.size)
+
+    def pose(self, x, y, z, ox, oy, oz, ow):
+        FRAME.pack_into(self._buffer, 0, KIND_POSE, x, y, z, ox, oy, oz, ow)
+        return self._sock.sendto(self._buffer, self.socket_path)
+
+    def joints(self, q0, q1, q2, v0=0.0, v1=0.0, v2=0.0):
+        FRAME.pack_into(self._buffer, 0, KIND_JOINTS, q0, q1, q2, v0, v1, v2, 0.0)
+        return self._sock.sendto(self._buffer, self.socket_path)
+
+    def close(self):
+        self._sock.close()
+
+
+def serve_frames(streamer, socket_path=None, duration_s=None, idle_timeout=0.5):
+    """
+    Принимать кадры и сразу отдавать их streamer (в этом потоке).
+    Работает до duration_s (None — бесконечно). Возвращает число кадров.
+    """
+    socket_path = socket_path or default_frame_socket_path()
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(socket_path)
+    sock.settimeout(idle_timeout)
+    buffer = bytearray(FRAME.size)
+    view = memoryview(buffer)
+    received = 0
+    end = None if duration_s is None else time.monotonic() + duration_s
+    try:
+        while end is None or time.monotonic() < end:
+            try:
+                size = sock.recv_into(view)
+            except socket.timeout:
+                continue
+            if size != FRAME.size:
+                print(f"[serve_frames] Ошибка: кадр {size} байт, ожидается {FRAME.size}")
+                continue
+            streamer.send_frame(buffer)
+            received += 1
+    finally:
+        sock.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+    return received
+
+
+# ---------------------------------------------------------------------------
+# 3. Бенчмарк
+# ---------------------------------------------------------------------------
+
+
+def _cpu_us(fn, count, rate_hz=None):
+    """CPU на вызов fn(i), мкс; rate_hz — с паузами между вызовами (робот)."""
+    t0 = time.process_time()
+    if rate_hz is None:
+        for i in range(count):
+            fn(i)
+    else:
+        from medu_servo import stream_paced
+
+        count = max(1, stream_paced(fn, ((i,) for i in range(count)), rate_hz))
+    return (time.process_time() - t0) / count * 1e6
+
+
+def current_pose(manipulator):
+    """(x, y, z, ox, oy, oz, ow) из get_cartesian_coordinates или None."""
+    from medu_calibration import position_from_pose
+    from medu_wrappers import medu_get_cartesian_coordinates
+
+    pose = medu_get_cartesian_coordinates(manipulator)
+    position = position_from_pose(pose)
+    orientation = pose.get("orientation") if isinstance(pose, dict) else getattr(pose, "orientation", None)
+    if position is None or orientation is None:
+        return None
+    if isinstance(orientation, dict):
+        quat = [orientation.get(k) for k in ("x", "y", "z", "w")]
+    else:
+        quat = [getattr(orientation, k, None) for k in ("x", "y", "z", "w")]
+    if any(v is None for v in quat):
+        return None
+    return tuple(position) + tuple(float(v) for v in quat)
+
+
+def benchmark(
+    manipulator,
+    count=5000,
+    pose=(0.2, 0.0, 0.2, 0.0, 0.0, 0.0, 1.0),
+    joints=(0.0, 0.6, 1.0),
+    jitter_m=0.001,
+    rate_hz=None,
+):
+    """
+    CPU на сообщение (мкс, time.process_time) и байты на сообщение для:
+    обёртки, ServoController, FastStreamer (reuse и без); байты —
+    строка JSON для демона против кадра FRAME. SDK вызывается по-настоящему,
+    так что его собственная сериализация входит во все строки одинаково.
+    jitter_m — шаг по x / по q0, чтобы уставки различались (на роботе — 0).
+    rate_hz — отправлять уставки с этой частотой (stream_paced), а не
+    подряд; на роботе обязательно.
+    """
+    from medu_servo import ServoController
+
+    x, y, z, ox, oy, oz, ow = pose
+    controller = ServoController(manipulator)
+    fast = FastStreamer(manipulator, controller, reuse=True)
+    fresh = FastStreamer(manipulator, controller)
+    fast.begin("pose")
+
+    def jitter(i):
+        return jitter_m * (i % 10)
+
+    rows = {
+        "wrapper": _cpu_us(lambda i: medu_stream_coordinates(manipulator, x + jitter(i), y, z, ox, oy, oz, ow), count, rate_hz),
+        "servo_controller": _cpu_us(lambda i: controller.stream_pose(x + jitter(i), y, z, ox, oy, oz, ow), count, rate_hz),
+        "fast_new_objects": _cpu_us(lambda i: fresh.pose(x + jitter(i), y, z, ox, oy, oz, ow), count, rate_hz),
+        "fast_reuse": _cpu_us(lambda i: fast.pose(x + jitter(i), y, z, ox, oy, oz, ow), count, rate_hz),
+    }
+    fast.begin("joints")
+    q0, q1, q2 = joints
+    rows["wrapper_joints"] = _cpu_us(
+        lambda i: medu_stream_joint_angles(manipulator, q0 + jitter(i), q1, q2, 0.0, 0.0, 0.0), count, rate_hz
+    )
+    rows["fast_joints"] = _cpu_us(lambda i: fast.joints(q0 + jitter(i), q1, q2), count, rate_hz)
+
+    request = {"call": "medu_stream_coordinates", "args": [x, y, z, ox, oy, oz, ow], "kwargs": {}}
+    json_bytes = len(json.dumps(request, ensure_ascii=False).encode("utf-8")) + 1
+    buffer = bytearray(FRAME.size)
+    pack_us = _cpu_us(lambda i: FRAME.pack_into(buffer, 0, KIND_POSE, x + jitter(i), y, z, ox, oy, oz, ow), count)
+    json_us = _cpu_us(lambda i: json.dumps(request).encode("utf-8"), count)
+    return {
+        "cpu_us_per_message": rows,
+        "ipc_bytes_per_message": {"daemon_json": json_bytes, "frame": FRAME.size},
+        "ipc_encode_us": {"daemon_json": json_us, "frame": pack_us},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк путей стрима уставок")
+    parser.add_argument("--host", help="робот; без него — цифровой двойник (medu_twin)")
+    parser.add_argument("--client-id", default=os.environ.get("MEDU_CLIENT_ID", "medu-fast-stream"))
+    parser.add_argument("--login", default=os.environ.get("MEDU_LOGIN", ""))
+    parser.add_argument("--password", default=os.environ.get("MEDU_PASSWORD", ""))
+    parser.add_argument("--count", type=int, default=None, help="уставок каждого вида (двойник 5000, робот 500)")
+    parser.add_argument("--rate-hz", type=float, default=100.0, help="частота уставок на роботе")
+    args = parser.parse_args()
+
+    if args.host:
+        from medu_wait import joint_values
+        from medu_wrappers import medu_connect, medu_get_joint_state
+
+        manipulator = medu_connect(args.host, args.client_id, args.login, args.password)
+        if manipulator is None:
+            return
+        # на роботе стримим только текущую позу и текущие углы — рука стоит
+        pose = current_pose(manipulator)
+        joints = joint_values(medu_get_joint_state(manipulator))
+        if pose is None or joints is None or len(joints) != 3:
+            print(f"Не удалось прочитать текущую позу/углы ({joints!r}) — бенчмарк на роботе не запускаю")
+            return
+        result = benchmark(manipulator, args.count or 500, pose, joints, jitter_m=0.0, rate_hz=args.rate_hz)
+    else:
+        from medu_twin import StandInSDK, TwinMEdu
+
+        standin = StandInSDK()
+        standin.install()  # без SDK — его классы параметров из заменителя
+        try:
+            result = benchmark(TwinMEdu(), args.count or 5000)
+        finally:
+            standin.uninstall()
+
+    for section, values in result.items():
+        print(section)
+        for name, value in values.items():
+            print(f"  {name:<20} {value:>10.2f}" if isinstance(value, float) else f"  {name:<20} {value:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+medu_hw_errors.py — центр рассылки аппаратных ошибок MEdu.
+
+Без подписки аппаратная ошибка видна только как упавший блокирующий вызов
+после таймаута. HardwareErrorHub подписывается один раз на сессию
+(medu_subscribe_hardware_error) и в потоке SDK делает только быстрые вещи:
+- дёргает EmergencyStop (если передан);
+- завершает отслеживаемые "движения" (submit_motion) исключением
+  HardwareError — ожидающий код просыпается сразу, а не по таймауту;
+- кладёт событие в ограниченные очереди слушателей (put_nowait, при
+  переполнении выбрасывается самое старое событие).
+
+Каждый слушатель работает в своём потоке, поэтому медленный слушатель
+не тормозит ни SDK, ни остальных слушателей.
+
+Ошибки сохраняются в history вместе со снимком телеметрии
+(telemetry_snapshot(), например lambda: medu_get_joint_state(m))
+и, при желании, дописываются в JSONL-файл.
+"""
+
+import collections
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from medu_wrappers import (
+    medu_subscribe_hardware_error,
+    medu_unsubscribe_hardware_error,
+)
+
+
+class HardwareError(Exception):
+    """Аппаратная ошибка робота; data — словарь из SDK."""
+
+    def __init__(self, data):
+        super().__init__(f"аппаратная ошибка: {data}")
+        self.data = data
+
+
+class _Listener:
+    def __init__(self, callback, queue_size):
+        self.callback = callback
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.thread = None
+
+
+class HardwareErrorHub:
+    """Одна подписка на сессию и рассылка событий многим слушателям."""
+
+    def __init__(
+        self,
+        manipulator,
+        queue_size=100,
+        estop=None,
+        telemetry_snapshot=None,
+        log_path=None,
+        history_size=1000,
+    ):
+        self.manipulator = manipulator
+        self.queue_size = int(queue_size)
+        self.estop = estop
+        self.telemetry_snapshot = telemetry_snapshot
+        self.log_path = log_path
+        self.history = collections.deque(maxlen=history_size)
+
+        self._listeners = []
+        self._listeners_lock = threading.Lock()
+        self._motions = set()
+        self._motions_lock = threading.Lock()
+        self._subscribed = False
+
+        # Запись истории — тоже слушатель: снимок телеметрии блокирующий
+        self.add_listener(self._record, queue_size=history_size)
+
+    # --- подписка ----------------------------------------------------------
+
+    def start(self):
+        """
+        Подписаться на ошибки (повторный вызов ничего не делает).
+        Возвращает True/False; при ошибке подписки хаб остаётся неподписанным.
+        """
+        if self._subscribed:
+            return True
+        if medu_subscribe_hardware_error(self.manipulator, self._on_sdk_error) is None:
+            return False
+        self._subscribed = True
+        return True
+
+    def stop(self):
+        if self._subscribed:
+            medu_unsubscribe_hardware_error(self.manipulator)
+            self._subscribed = False
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+            self._listeners = []
+        for listener in listeners:
+            self._shutdown_listener(listener)
+
+    # --- слушатели ---------------------------------------------------------
+
+    def add_listener(self, callback, queue_size=None):
+        """
+        Добавить слушателя callback(event). event — dict
+        {"data", "t_monotonic", "t_wall"}. Возвращает объект для remove_listener.
+        """
+        listener = _Listener(callback, queue_size or self.queue_size)
+        listener.thread = threading.Thread(
+            target=self._listener_loop,
+            args=(listener,),
+            name="medu-hw-error-listener",
+            daemon=True,
+        )
+        listener.thread.start()
+        with self._listeners_lock:
+            self._listeners.append(listener)
+        return listener
+
+    def remove_listener(self, listener):
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+        self._shutdown_listener(listener)
+
+    def dropped_events(self):
+        with self._listeners_lock:
+            return sum(listener.dropped for listener in self._listeners)
+
+    @staticmethod
+    def _shutdown_listener(listener):
+        try:
+            listener.queue.put_nowait(None)
+        except queue.Full:
+            try:
+                listener.queue.get_nowait()
+            except queue.Empty:
+                pass
+            listener.queue.put_nowait(None)
+        listener.thread.join(timeout=1.0)
+
+    @staticmethod
+    def _listener_loop(listener):
+        while True:
+            event = listener.queue.get()
+            if event is None:
+                return
+            try:
+                listener.callback(event)
+            except Exception as e:
+                print(f"[HardwareErrorHub] Ошибка слушателя: {e}")
+
+    # --- движения ----------------------------------------------------------
+
+    def submit_motion(self, fn, *args, **kwargs):
+        """
+        Запустить блокирующую обёртку (например, medu_move_to_angles)
+        в отдельном потоке и вернуть Future. При аппаратной ошибке Future
+        сразу завершается исключением HardwareError, не дожидаясь таймаута.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        with self._motions_lock:
+            self._motions.add(future)
+
+        def run():
+            try:
+                result = fn(*args, **kwargs)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                with self._motions_lock:
+                    self._motions.discard(future)
+
+        threading.Thread(target=run, name="medu-motion", daemon=True).start()
+        return future
+
+    def _abort_motions(self, data):
+        with self._motions_lock:
+            motions = list(self._motions)
+            self._motions.clear()
+        for future in motions:
+            if not future.done():
+                try:
+                    future.set_exception(HardwareError(data))
+                except Exception:
+                    # Future успел завершиться в другом потоке
+                    pass
+
+    # --- поток SDK ---------------------------------------------------------
+
+    def _on_sdk_error(self, data):
+        event = {"data": data, "t_monotonic": time.monotonic(), "t_wall": time.time()}
+
+        if self.estop is not None:
+            self.estop.trigger("hardware_error")
+        self._abort_motions(data)
+
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener.queue.put_nowait(event)
+            except queue.Full:
+                # Выбрасываем самое старое событие, новое важнее
+                try:
+                    listener.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                listener.dropped += 1
+                try:
+                    listener.queue.put_nowait(event)
+                except queue.Full:
+                    pass
+
+    # --- история -----------------------------------------------------------
+
+    def _record(self, event):
+        record = dict(event)
+        if self.telemetry_snapshot is not None:
+            try:
+                record["telemetry"] = self.telemetry_snapshot()
+            except Exception as e:
+                record["telemetry"] = None
+                print(f"[HardwareErrorHub] Ошибка снимка телеметрии: {e}")
+        self.history.append(record)
+
+        if self.log_path is not None:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False, default=repr) + "\n")
+            except OSError as e:
+                print(f"[HardwareErrorHub] Ошибка записи лога: {e}")
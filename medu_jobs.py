@@ -0,0 +1,652 @@
+"""
+medu_jobs.py — задания ячейки в файле (JSON / YAML) вместо скрипта.
+
+Задание — список шагов, каждый шаг — один ключ с параметрами:
+
+    name: pick_demo
+    defaults: {velocity: 0.2, acceleration: 0.2}
+    batch_programs: true
+    steps:
+      - angles: [0.0, -0.35, -0.75]
+      - coordinates: {position: [0.25, -0.10, 0.10], velocity: 0.5}
+      - arc: {target: [0.20, 0.10, 0.10], center: [0.20, 0.0, 0.10]}
+      - path: {points: [[0.25, 0.0, 0.1], [0.25, 0.1, 0.1], [0.2, 0.1, 0.1]], max_deviation: 0.005}
+      - nozzle: true
+      - gripper: {rotation: 45, grip: 0}
+      - gpio: {LAMP: 1, GATE: 0}
+      - wait_gpio: {name: DOOR, value: 1, timeout: 10}
+      - conveyor: {speed: 40, led: [0, 255, 0], text: "RUN"}
+      - wait_sensor: {distance_below: 100, timeout: 20}
+      - sleep: 0.5
+
+Загрузка (load_job) проверяет файл целиком (все ошибки сразу, с номером
+шага) и компилирует его в план — список операций:
+
+- "move"     — одно движение (шаг в формате medu_motion_time.execute_step);
+- "program"  — при batch_programs подряд идущие angles склеиваются в одну
+               программу run_program_json (формат из medu_api.md, 10.2):
+               один запрос вместо N, время точек — по MotionTimeModel;
+- "stream"   — path: подход к первой точке + уставки LookaheadPlanner,
+               посчитанные при компиляции (стримятся через FastStreamer);
+- "io"       — подряд идущие gpio с разными пинами или подряд идущие
+               conveyor — одной операцией, без ожиданий между командами;
+               пин, заданный повторно, и смена gpio <-> лента начинают
+               новую операцию — порядок шагов сохраняется. Команды идут
+               по одной: сессия одна, а потокобезопасность SDK не
+               документирована (как в medu_broker);
+- "nozzle", "gripper", "wait_gpio", "wait_sensor", "sleep" — как есть.
+
+План сохраняется в кэш по sha256 содержимого файла (+ PLAN_VERSION):
+повторный запуск того же файла читает готовый JSON-план и не разбирает
+YAML и не проверяет шаги заново.
+
+    plan = load_job("jobs/pick_demo.yaml")
+    report = run_job(manipulator, plan)
+
+    python medu_jobs.py medu_job_example.json --dry-run   # то же, что main_medu_example.py
+    python medu_jobs.py medu_job_cell_example.json --dry-run   # насадка, GPIO, лента, ожидания
+    python medu_jobs.py jobs/pick_demo.yaml --host 192.168.0.183
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from medu_motion_time import MotionTimeModel, execute_step
+from medu_servo import ServoController, stream_paced
+from medu_wait import wait_sensor, wait_until
+from medu_wrappers import (
+    medu_conveyor_display_text,
+    medu_conveyor_set_buzz_tone,
+    medu_conveyor_set_led_color,
+    medu_conveyor_set_servo_angle,
+    medu_conveyor_set_speed_motors,
+    medu_get_gpio_value,
+    medu_manage_gripper,
+    medu_nozzle_power,
+    medu_run_program_json,
+    medu_write_gpio,
+)
+
+# Меняется при любом изменении формата плана — старый кэш не подойдёт
+PLAN_VERSION = 3
+
+JOINT_LIMIT = 3.14
+COORD_LIMIT = 1.0
+STEP_KINDS = (
+    "angles", "coordinates", "arc", "path", "nozzle", "gripper",
+    "gpio", "wait_gpio", "conveyor", "wait_sensor", "sleep",
+)
+CONVEYOR_KEYS = ("speed", "servo", "led", "text", "buzz")
+
+
+def default_cache_dir():
+    return os.environ.get("MEDU_JOB_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "medu_jobs")
+
+
+# ---------------------------------------------------------------------------
+# 1. Разбор и проверка
+# ---------------------------------------------------------------------------
+
+
+def parse_job(text, file_name=""):
+    """Текст файла -> dict. YAML — только если установлен PyYAML."""
+    if file_name.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("для YAML-заданий нужен PyYAML (pip install pyyaml) — или сохраните задание в JSON")
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+class _Checker:
+    """Собирает ошибки всех шагов, чтобы показать их разом."""
+
+    def __init__(self):
+        self.errors = []
+        self.where = ""
+
+    def fail(self, message):
+        self.errors.append(f"{self.where}: {message}" if self.where else message)
+
+    def number(self, value, name, lo=None, hi=None):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            self.fail(f"{name} должен быть числом, получено {value!r}")
+            return None
+        if (lo is not None and value < lo) or (hi is not None and value > hi):
+            self.fail(f"{name} = {value} вне диапазона [{lo}, {hi}]")
+            return None
+        return float(value)
+
+    def integer(self, value, name, lo, hi):
+        if isinstance(value, bool) or not isinstance(value, int):
+            self.fail(f"{name} должен быть целым, получено {value!r}")
+            return None
+        if not lo <= value <= hi:
+            self.fail(f"{name} = {value} вне диапазона [{lo}, {hi}]")
+            return None
+        return value
+
+    def vector(self, value, name, size, limit):
+        if not isinstance(value, (list, tuple)) or len(value) != size:
+            self.fail(f"{name} должен быть списком из {size} чисел")
+            return None
+        out = [self.number(v, f"{name}[{i}]", -limit, limit) for i, v in enumerate(value)]
+        return None if None in out else out
+
+    def quaternion(self, value, name="orientation"):
+        if value is None:
+            return [0.0, 0.0, 0.0, 1.0]
+        q = self.vector(value, name, 4, 1.0e6)
+        if q is None:
+            return None
+        norm = sum(v * v for v in q) ** 0.5
+        if norm < 1e-6:
+            self.fail(f"{name} — нулевой кватернион")
+            return None
+        return [v / norm for v in q]
+
+    def mapping(self, value, name, allowed):
+        if not isinstance(value, dict):
+            self.fail(f"{name}: ожидается словарь")
+            return {}
+        extra = sorted(set(value) - set(allowed))
+        if extra:
+            self.fail(f"{name}: неизвестные поля {extra}")
+        return value
+
+
+def _factors(check, params, defaults):
+    velocity = check.number(params.get("velocity", defaults.get("velocity", 0.1)), "velocity", 0.0, 1.0)
+    acceleration = check.number(params.get("acceleration", defaults.get("acceleration", 0.1)), "acceleration", 0.0, 1.0)
+    return velocity, acceleration
+
+
+def validate_job(job):
+    """
+    Проверить задание. Возвращает список нормализованных шагов
+    [(kind, params)] или бросает ValueError со всеми ошибками.
+    """
+    check = _Checker()
+    if not isinstance(job, dict):
+        raise ValueError("задание должно быть словарём с полем steps")
+    check.mapping(job, "задание", ("name", "defaults", "batch_programs", "steps"))
+    defaults = check.mapping(job.get("defaults", {}), "defaults", ("velocity", "acceleration", "timeout"))
+    steps = job.get("steps")
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("steps должен быть непустым списком")
+
+    normalized = []
+    for index, step in enumerate(steps):
+        check.where = f"шаг {index + 1}"
+        if not isinstance(step, dict) or len(step) != 1:
+            check.fail(f"шаг — словарь с одним ключом из {list(STEP_KINDS)}, получено {step!r}")
+            continue
+        (kind, params), = step.items()
+        if kind not in STEP_KINDS:
+            check.fail(f"неизвестный шаг {kind!r}")
+            continue
+        result = _validate_step(check, kind, params, defaults)
+        if result is not None:
+            normalized.append((kind, result))
+
+    if check.errors:
+        raise ValueError("ошибки в задании:\n  " + "\n  ".join(check.errors))
+    return normalized
+
+
+def _validate_step(check, kind, params, defaults):
+    timeout = defaults.get("timeout", 60.0)
+
+    if kind == "angles":
+        if isinstance(params, list):
+            params = {"joints": params}
+        params = check.mapping(params, kind, ("joints", "velocity", "acceleration", "timeout"))
+        joints = check.vector(params.get("joints"), "joints", 3, JOINT_LIMIT)
+        velocity, acceleration = _factors(check, params, defaults)
+        return {
+            "type": "angles",
+            "joints": joints,
+            "velocity_factor": velocity,
+            "acceleration_factor": acceleration,
+            "timeout_seconds": check.number(params.get("timeout", timeout), "timeout", 0.0),
+        }
+
+    if kind == "coordinates":
+        if isinstance(params, list):
+            params = {"position": params}
+        params = check.mapping(params, kind, ("position", "orientation", "velocity", "acceleration", "timeout"))
+        velocity, acceleration = _factors(check, params, defaults)
+        return {
+            "type": "coordinates",
+            "position": check.vector(params.get("position"), "position", 3, COORD_LIMIT),
+            "orientation": check.quaternion(params.get("orientation")),
+            "velocity_scaling_factor": velocity,
+            "acceleration_scaling_factor": acceleration,
+            "timeout_seconds": check.number(params.get("timeout", timeout), "timeout", 0.0),
+        }
+
+    if kind == "arc":
+        params = check.mapping(params, kind, ("target", "center", "orientation", "velocity", "acceleration", "timeout"))
+        velocity, acceleration = _factors(check, params, defaults)
+        return {
+            "type": "arc",
+            "target": check.vector(params.get("target"), "target", 3, COORD_LIMIT),
+            "center": check.vector(params.get("center"), "center", 3, COORD_LIMIT),
+            "orientation": check.quaternion(params.get("orientation")),
+            "max_velocity_scaling_factor": velocity,
+            "max_acceleration_scaling_factor": acceleration,
+            "timeout_seconds": check.number(params.get("timeout", timeout), "timeout", 0.0),
+        }
+
+    if kind == "path":
+        params = check.mapping(
+            params, kind, ("points", "orientation", "velocity", "acceleration", "max_deviation", "rate_hz")
+        )
+        points = params.get("points")
+        if not isinstance(points, list) or len(points) < 2:
+            check.fail("points: нужно не меньше 2 точек")
+            return None
+        points = [check.vector(p, f"points[{i}]", 3, COORD_LIMIT) for i, p in enumerate(points)]
+        velocity, acceleration = _factors(check, params, defaults)
+        return {
+            "points": points,
+            "orientation": check.quaternion(params.get("orientation")),
+            "velocity": velocity,
+            "acceleration": acceleration,
+            "max_deviation": check.number(params.get("max_deviation", 0.005), "max_deviation", 0.0, 0.1),
+            "rate_hz": check.number(params.get("rate_hz", 50.0), "rate_hz", 1.0, 500.0),
+        }
+
+    if kind == "nozzle":
+        if not isinstance(params, bool):
+            check.fail(f"nozzle: ожидается true/false, получено {params!r}")
+            return None
+        return params
+
+    if kind == "gripper":
+        params = check.mapping(params, kind, ("rotation", "grip"))
+        if not params:
+            check.fail("gripper: нужен rotation и/или grip")
+        return {
+            "rotation": None if params.get("rotation") is None else check.number(params["rotation"], "rotation"),
+            "grip": None if params.get("grip") is None else check.number(params["grip"], "grip"),
+        }
+
+    if kind == "gpio":
+        if not isinstance(params, dict) or not params:
+            check.fail("gpio: ожидается словарь {пин: 0/1}")
+            return None
+        for name, value in params.items():
+            if not isinstance(name, str) or not name.strip():
+                check.fail(f"gpio: имя пина {name!r}")
+            if value not in (0, 1) or isinstance(value, bool):
+                check.fail(f"gpio {name}: значение должно быть 0 или 1")
+        return dict(params)
+
+    if kind == "wait_gpio":
+        params = check.mapping(params, kind, ("name", "value", "timeout", "interval"))
+        if not isinstance(params.get("name"), str):
+            check.fail("wait_gpio: нужно имя пина name")
+        if params.get("value") not in (0, 1) or isinstance(params.get("value"), bool):
+            check.fail("wait_gpio: value должно быть 0 или 1")
+        return {
+            "name": params.get("name"),
+            "value": params.get("value"),
+            "timeout": check.number(params.get("timeout", 10.0), "timeout", 0.0),
+            "interval": check.number(params.get("interval", 0.05), "interval", 0.001),
+        }
+
+    if kind == "conveyor":
+        params = check.mapping(params, kind, CONVEYOR_KEYS)
+        if not params:
+            check.fail(f"conveyor: нужен хотя бы один из {list(CONVEYOR_KEYS)}")
+        out = {}
+        if "speed" in params:
+            out["speed"] = check.integer(params["speed"], "speed", 0, 100)
+        if "servo" in params:
+            out["servo"] = check.number(params["servo"], "servo")
+        if "led" in params:
+            led = params["led"]
+            if not isinstance(led, list) or len(led) != 3:
+                check.fail("led: нужен список [r, g, b]")
+            else:
+                out["led"] = [check.integer(v, f"led[{i}]", 0, 255) for i, v in enumerate(led)]
+        if "text" in params:
+            if not isinstance(params["text"], str):
+                check.fail("text должен быть строкой")
+            out["text"] = params["text"]
+        if "buzz" in params:
+            out["buzz"] = check.integer(params["buzz"], "buzz", 1, 15)
+        return out
+
+    if kind == "wait_sensor":
+        params = check.mapping(params, kind, ("distance_below", "distance_above", "timeout", "interval"))
+        if "distance_below" not in params and "distance_above" not in params:
+            check.fail("wait_sensor: нужен distance_below или distance_above")
+        return {
+            "distance_below": None if "distance_below" not in params else check.number(params["distance_below"], "distance_below"),
+            "distance_above": None if "distance_above" not in params else check.number(params["distance_above"], "distance_above"),
+            "timeout": check.number(params.get("timeout", 10.0), "timeout", 0.0),
+            "interval": check.number(params.get("interval", 0.05), "interval", 0.001),
+        }
+
+    # sleep
+    return check.number(params, "sleep", 0.0)
+
+
+# ---------------------------------------------------------------------------
+# 2. Компиляция в план
+# ---------------------------------------------------------------------------
+
+
+def _program_json(moves, model, start_joints):
+    """
+    Подряд идущие angles -> программа run_program_json (Move / Simple).
+    start_joints — углы перед первой точкой (время точки считается от них).
+    """
+    points = []
+    previous = start_joints
+    for move in moves:
+        duration_ms = model.joint_motion_ms(previous, move["joints"], move["velocity_factor"], move["acceleration_factor"])
+        points.append({"Point": {"positions": list(move["joints"]), "time": round(duration_ms / 1000.0, 3)}})
+        previous = move["joints"]
+    return {"Root": [{"Move": {"content": points, "type": "Simple"}}]}
+
+
+def _stream_setpoints(params, model):
+    """path -> уставки LookaheadPlanner (NumPy нужен только при компиляции)."""
+    from medu_lookahead import LookaheadPlanner
+
+    planner = LookaheadPlanner(
+        model,
+        params["velocity"],
+        params["acceleration"],
+        params["max_deviation"],
+        params["rate_hz"],
+        window=len(params["points"]),
+    )
+    for point in params["points"][1:]:
+        planner.add(point)
+    path = planner.plan(params["points"][0])
+    return [[round(v, 6) for v in p] for p in path.positions.tolist()], path.blended_ms
+
+
+def compile_job(job, name="", model=None):
+    """Проверенное задание -> план (dict, сериализуемый в JSON)."""
+    model = model if model is not None else MotionTimeModel()
+    steps = validate_job(job)
+    batch = bool(job.get("batch_programs", False))
+
+    ops = []
+    last_joints = None
+    pending_moves = []
+    # группа для "io": либо gpio-шаги с разными пинами, либо шаги
+    # ленты подряд — иначе пропал бы импульс (LAMP 1 -> 0) или порядок
+    # между GPIO и лентой
+    pending_io = {"gpio": {}, "conveyor": []}
+
+    def flush_moves():
+        nonlocal last_joints
+        if pending_moves and last_joints is None:
+            # откуда стартует программа, неизвестно — первое движение обычным
+            # move_to_angles, дальше время точек считается от его цели
+            first = pending_moves.pop(0)
+            ops.append({"op": "move", "step": first})
+            last_joints = first["joints"]
+        if len(pending_moves) >= 2:
+            ops.append({"op": "program", "name": f"{name or 'job'}_{len(ops)}",
+                        "program": _program_json(pending_moves, model, last_joints),
+                        "count": len(pending_moves)})
+        else:
+            ops.extend({"op": "move", "step": m} for m in pending_moves)
+        if pending_moves:
+            last_joints = pending_moves[-1]["joints"]
+        pending_moves.clear()
+
+    def flush_io():
+        if pending_io["gpio"] or pending_io["conveyor"]:
+            ops.append({"op": "io", "gpio": dict(pending_io["gpio"]), "conveyor": list(pending_io["conveyor"])})
+        pending_io["gpio"] = {}
+        pending_io["conveyor"] = []
+
+    for kind, params in steps:
+        if kind == "angles" and batch:
+            flush_io()
+            pending_moves.append(params)
+            continue
+        flush_moves()
+        if kind == "gpio":
+            if pending_io["conveyor"] or set(params) & set(pending_io["gpio"]):
+                flush_io()
+            pending_io["gpio"].update(params)
+            continue
+        if kind == "conveyor":
+            if pending_io["gpio"]:
+                flush_io()
+            pending_io["conveyor"].extend([key, value] for key, value in params.items())
+            continue
+        flush_io()
+
+        if kind in ("angles", "coordinates", "arc"):
+            ops.append({"op": "move", "step": params})
+            last_joints = params["joints"] if kind == "angles" else None
+        elif kind == "path":
+            setpoints, blended_ms = _stream_setpoints(params, model)
+            approach = {
+                "type": "coordinates",
+                "position": params["points"][0],
+                "orientation": params["orientation"],
+                "velocity_scaling_factor": params["velocity"],
+                "acceleration_scaling_factor": params["acceleration"],
+                "timeout_seconds": 30.0,
+            }
+            ops.append({"op": "move", "step": approach})
+            ops.append({"op": "stream", "setpoints": setpoints, "orientation": params["orientation"],
+                        "rate_hz": params["rate_hz"], "predicted_ms": blended_ms})
+            last_joints = None
+        else:
+            ops.append({"op": kind, "params": params})
+    flush_moves()
+    flush_io()
+
+    return {"version": PLAN_VERSION, "name": job.get("name") or name, "ops": ops}
+
+
+# ---------------------------------------------------------------------------
+# 3. Загрузка с кэшем
+# ---------------------------------------------------------------------------
+
+
+def job_hash(raw):
+    return hashlib.sha256(raw + f"\nplan-version:{PLAN_VERSION}".encode("utf-8")).hexdigest()
+
+
+def load_job(path, cache_dir=None, use_cache=True):
+    """
+    План задания из файла. Если план с тем же sha256 уже в кэше — читается
+    он (без разбора и проверки), иначе файл проверяется, компилируется и
+    план кладётся в кэш. Ошибки проверки — ValueError.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = job_hash(raw)
+    cache_dir = cache_dir or default_cache_dir()
+    cached = os.path.join(cache_dir, f"{digest}.json")
+
+    if use_cache and os.path.exists(cached):
+        try:
+            with open(cached, "r", encoding="utf-8") as f:
+                plan = json.load(f)
+            if plan.get("version") == PLAN_VERSION:
+                plan["cached"] = True
+                return plan
+        except (OSError, ValueError) as e:
+            print(f"[load_job] Кэш {cached} не читается, компилирую заново: {e}")
+
+    job = parse_job(raw.decode("utf-8"), path)
+    plan = compile_job(job, os.path.splitext(os.path.basename(path))[0])
+    plan["sha256"] = digest
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = cached + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(plan, f, ensure_ascii=False)
+        os.replace(tmp, cached)
+    plan["cached"] = False
+    return plan
+
+
+# ---------------------------------------------------------------------------
+# 4. Выполнение
+# ---------------------------------------------------------------------------
+
+
+def _run_conveyor(manipulator, actions):
+    """Команды ленты по порядку; False на первой ошибке."""
+    setters = {
+        "speed": lambda v: medu_conveyor_set_speed_motors(manipulator, v),
+        "servo": lambda v: medu_conveyor_set_servo_angle(manipulator, v),
+        "led": lambda v: medu_conveyor_set_led_color(manipulator, *v),
+        "text": lambda v: medu_conveyor_display_text(manipulator, v),
+        "buzz": lambda v: medu_conveyor_set_buzz_tone(manipulator, v),
+    }
+    for key, value in actions:
+        if setters[key](value) is None:
+            return False
+    return True
+
+
+def _run_io(manipulator, op):
+    """GPIO-пины, затем команды ленты, по одной; False на первой ошибке."""
+    for name, value in op["gpio"].items():
+        # throw_error: без него SDK может промолчать об ошибке записи
+        if medu_write_gpio(manipulator, name, value, throw_error=True) is None:
+            return False
+    return _run_conveyor(manipulator, op["conveyor"])
+
+
+def _run_stream(manipulator, op, controller):
+    from medu_fast_stream import FastStreamer
+
+    streamer = FastStreamer(manipulator, controller)
+    if not streamer.begin("pose"):
+        return None
+    orientation = tuple(op["orientation"])
+    setpoints = [tuple(point) + orientation for point in op["setpoints"]]
+    return stream_paced(streamer.pose, setpoints, op["rate_hz"]) == len(setpoints)
+
+
+def run_op(manipulator, op, controller=None):
+    """Одна операция плана. None / False — ошибка или таймаут ожидания."""
+    kind = op["op"]
+    if kind == "move":
+        return execute_step(manipulator, op["step"])
+    if kind == "program":
+        return medu_run_program_json(manipulator, op["name"], op["program"])
+    if kind == "stream":
+        return _run_stream(manipulator, op, controller)
+    if kind == "io":
+        return _run_io(manipulator, op)
+    params = op["params"]
+    if kind == "nozzle":
+        return medu_nozzle_power(manipulator, params)
+    if kind == "gripper":
+        return medu_manage_gripper(manipulator, rotation=params["rotation"], gripper=params["grip"])
+    if kind == "wait_gpio":
+        return wait_until(
+            lambda: medu_get_gpio_value(manipulator, params["name"]) == params["value"],
+            timeout=params["timeout"],
+            interval=params["interval"],
+        )
+    if kind == "wait_sensor":
+        below, above = params["distance_below"], params["distance_above"]
+
+        def ready(data):
+            distance = data.get("DistanceSensor")
+            if distance is None:
+                return False
+            return (below is None or distance < below) and (above is None or distance > above)
+
+        return wait_sensor(manipulator, ready, timeout=params["timeout"], interval=params["interval"])
+    if kind == "sleep":
+        time.sleep(params)
+        return True
+    raise ValueError(f"неизвестная операция плана: {kind!r}")
+
+
+def run_job(manipulator, plan, controller=None):
+    """
+    Выполнить план по порядку; остановиться на первой ошибке.
+    Возвращает {"done": N, "total": M, "failed_op": индекс или None, "elapsed_s": ...}.
+    controller — общий ServoController; без него создаётся свой
+    (path переключает руку в режим POSE).
+    """
+    t0 = time.monotonic()
+    if controller is None:
+        controller = ServoController(manipulator)
+    ops = plan["ops"]
+    for index, op in enumerate(ops):
+        result = run_op(manipulator, op, controller)
+        if result is None or result is False:
+            print(f"[run_job] Ошибка в операции {index + 1}/{len(ops)} ({op['op']})")
+            return {"done": index, "total": len(ops), "failed_op": index, "elapsed_s": time.monotonic() - t0}
+    return {"done": len(ops), "total": len(ops), "failed_op": None, "elapsed_s": time.monotonic() - t0}
+
+
+def describe(plan):
+    lines = [f"{plan.get('name')}: {len(plan['ops'])} операций" + (" (из кэша)" if plan.get("cached") else "")]
+    for i, op in enumerate(plan["ops"]):
+        if op["op"] == "program":
+            detail = f"{op['count']} движений одной программой"
+        elif op["op"] == "stream":
+            detail = f"{len(op['setpoints'])} уставок, ~{op['predicted_ms']:.0f} мс"
+        elif op["op"] == "io":
+            detail = f"gpio {sorted(op['gpio'])}, лента {[a[0] for a in op['conveyor']]}"
+        elif op["op"] == "move":
+            detail = op["step"]["type"]
+        else:
+            detail = repr(op["params"])
+        lines.append(f"  {i + 1:>3}. {op['op']:<12} {detail}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Загрузка и выполнение заданий MEdu (JSON/YAML)")
+    parser.add_argument("job")
+    parser.add_argument("--dry-run", action="store_true", help="только проверить и показать план")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--host", default=os.environ.get("MEDU_HOST", ""))
+    parser.add_argument("--client-id", default=os.environ.get("MEDU_CLIENT_ID", "medu-jobs"))
+    parser.add_argument("--login", default=os.environ.get("MEDU_LOGIN", ""))
+    parser.add_argument("--password", default=os.environ.get("MEDU_PASSWORD", ""))
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    try:
+        plan = load_job(args.job, args.cache_dir, use_cache=not args.no_cache)
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    print(describe(plan))
+    print(f"Загрузка: {(time.perf_counter() - t0) * 1000:.1f} мс")
+    if args.dry_run:
+        return
+
+    from medu_wrappers import medu_connect
+
+    manipulator = medu_connect(args.host, args.client_id, args.login, args.password)
+    if manipulator is None:
+        raise SystemExit(1)
+    try:
+        print(run_job(manipulator, plan))
+    finally:
+        manipulator.disconnect()
+
+
+if __name__ == "__main__":
+    main()
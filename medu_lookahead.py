@@ -0,0 +1,259 @@
+"""
+medu_lookahead.py — проход через промежуточные точки без остановок.
+
+Каждый medu_move_to_coordinates — отдельное блокирующее задание, и рука
+останавливается в каждой точке. LookaheadPlanner копит следующие
+декартовы цели и строит один сглаженный путь:
+
+1. углы между отрезками скругляются дугами (радиус — по допуску
+   отклонения от точки max_deviation и не больше половины отрезков);
+2. профиль скорости: на дугах скорость ограничена центростремительным
+   ускорением (v <= sqrt(a * R / 2)), дальше прямой и обратный проход
+   с ограничением ускорения — разгон в начале, остановка в последней точке;
+3. путь разбивается по времени с частотой движка и стримится позами
+   через ServoController.stream_pose.
+
+Выигрыш считается против "стоп-и-пошёл" по MotionTimeModel
+(сумма cartesian_move_ms по отрезкам):
+
+    planner = LookaheadPlanner(model, velocity_scaling_factor=0.2)
+    for p in via_points:
+        planner.add(p)
+    path = planner.plan(start_position)
+    print(path.report())
+    planner.execute(servo, path)
+
+Ориентация на всём пути одна (orientation), как у стрима позы.
+Вариант "сгенерировать программу" не делаем: формат программ SDK
+задаёт точки, но не скругления, так что выигрыша бы не было.
+"""
+
+import numpy as np
+
+from medu_motion_time import MotionTimeModel, _factor
+from medu_servo import stream_paced
+
+
+# ---------------------------------------------------------------------------
+# 1. Геометрия: скругление углов
+# ---------------------------------------------------------------------------
+
+
+def blend_corners(points, max_deviation=0.005):
+    """
+    Ломаная points (N, 3) -> список участков:
+        ("line", a, b)
+        ("arc", a, b, center, radius, angle)  — дуга от a до b
+    Дуга касается обоих отрезков и отходит от вершины не дальше
+    max_deviation (м); точки на одной прямой не скругляются.
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) < 2:
+        return []
+
+    seg = np.diff(points, axis=0)
+    lengths = np.linalg.norm(seg, axis=1)
+    keep = lengths > 1e-9  # повторяющиеся точки выкидываем
+    points = np.vstack([points[:1], points[1:][keep]])
+    seg = seg[keep]
+    lengths = lengths[keep]
+    if len(seg) == 0:
+        return []
+    units = seg / lengths[:, None]
+
+    # Все углы сразу: угол поворота phi в каждой внутренней вершине
+    u_in, u_out = units[:-1], units[1:]
+    cos_phi = np.clip((u_in * u_out).sum(axis=1), -1.0, 1.0)
+    phi = np.arccos(cos_phi)
+    half = phi / 2.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # отклонение от вершины: R (1/cos(phi/2) - 1) = max_deviation
+        radius = max_deviation / (1.0 / np.cos(half) - 1.0)
+        tangent = radius * np.tan(half)
+        limit = 0.5 * np.minimum(lengths[:-1], lengths[1:])
+        over = tangent > limit
+        tangent = np.where(over, limit, tangent)
+        radius = np.where(over, tangent / np.tan(half), radius)
+    blended = (phi > 1e-3) & (phi < np.pi - 1e-3)
+
+    parts = []
+    start = points[0]
+    for i in range(len(u_in)):
+        corner = points[i + 1]
+        if not blended[i]:
+            parts.append(("line", start, corner))
+            start = corner
+            continue
+        a = corner - u_in[i] * tangent[i]
+        b = corner + u_out[i] * tangent[i]
+        bisector = u_out[i] - u_in[i]
+        bisector /= np.linalg.norm(bisector)
+        center = corner + bisector * radius[i] / np.cos(half[i])
+        if np.linalg.norm(a - start) > 1e-9:
+            parts.append(("line", start, a))
+        parts.append(("arc", a, b, center, float(radius[i]), float(phi[i])))
+        start = b
+    parts.append(("line", start, points[-1]))
+    return parts
+
+
+def part_length(part):
+    if part[0] == "line":
+        return float(np.linalg.norm(part[2] - part[1]))
+    return part[4] * part[5]
+
+
+def sample_parts(parts, ds=0.001):
+    """
+    Точки пути с шагом ~ds и радиус кривизны в каждой точке (inf на прямых).
+    Возвращает (positions (M, 3), radii (M,), step (M-1,)).
+    """
+    positions = []
+    radii = []
+    for part in parts:
+        n = max(1, int(np.ceil(part_length(part) / ds)))
+        s = np.linspace(0.0, 1.0, n + 1)[1:, None]
+        if part[0] == "line":
+            _, a, b = part
+            positions.append(a + s * (b - a))
+            radii.append(np.full(n, np.inf))
+        else:
+            _, a, b, center, radius, angle = part
+            va, vb = a - center, b - center
+            arc = (np.sin((1.0 - s) * angle) * va + np.sin(s * angle) * vb) / np.sin(angle)
+            positions.append(center + arc)
+            radii.append(np.full(n, radius))
+    first = parts[0][1][None, :]
+    positions = np.vstack([first] + positions)
+    radii = np.concatenate([[np.inf]] + radii)
+    step = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+    return positions, radii, step
+
+
+# ---------------------------------------------------------------------------
+# 2. Профиль скорости
+# ---------------------------------------------------------------------------
+
+
+def feed_profile(radii, step, v_max, a_max):
+    """
+    Скорость в каждой точке: не выше v_max и sqrt(a_max * R / 2), разгон и
+    торможение не быстрее a_max; в первой и последней точке — 0.
+    """
+    # половина a_max — на поворот, половина остаётся на разгон/торможение
+    limit = np.minimum(v_max, np.sqrt(0.5 * a_max * radii))
+    limit[0] = 0.0
+    limit[-1] = 0.0
+    v = limit.copy()
+    for i in range(1, len(v)):  # разгон
+        v[i] = min(v[i], np.sqrt(v[i - 1] ** 2 + 2.0 * a_max * step[i - 1]))
+    for i in range(len(v) - 2, -1, -1):  # торможение
+        v[i] = min(v[i], np.sqrt(v[i + 1] ** 2 + 2.0 * a_max * step[i]))
+    return v
+
+
+def time_parametrize(positions, velocities, step, rate_hz=50.0):
+    """
+    Точки пути + скорости -> уставки через равные промежутки 1/rate_hz.
+    Возвращает (times, positions (K, 3)).
+    """
+    mean_v = 0.5 * (velocities[1:] + velocities[:-1])
+    dt = np.where(mean_v > 1e-9, step / np.maximum(mean_v, 1e-9), 0.0)
+    t = np.concatenate([[0.0], np.cumsum(dt)])
+    ticks = np.arange(0.0, t[-1], 1.0 / rate_hz)
+    ticks = np.append(ticks, t[-1])
+    sampled = np.column_stack([np.interp(ticks, t, positions[:, k]) for k in range(3)])
+    return ticks, sampled
+
+
+# ---------------------------------------------------------------------------
+# 3. Планировщик
+# ---------------------------------------------------------------------------
+
+
+class BlendedPath:
+    """Готовый путь: уставки и сравнение с остановками в каждой точке."""
+
+    def __init__(self, times, positions, via_points, blended_ms, stop_and_go_ms, corners):
+        self.times = times
+        self.positions = positions
+        self.via_points = via_points
+        self.blended_ms = blended_ms
+        self.stop_and_go_ms = stop_and_go_ms
+        self.corners = corners
+
+    def report(self):
+        speedup = self.stop_and_go_ms / self.blended_ms if self.blended_ms > 0 else None
+        return {
+            "via_points": len(self.via_points),
+            "blended_corners": self.corners,
+            "setpoints": len(self.positions),
+            "blended_ms": self.blended_ms,
+            "stop_and_go_ms": self.stop_and_go_ms,
+            "speedup": speedup,
+        }
+
+
+class LookaheadPlanner:
+    """Буфер следующих декартовых целей и построение сглаженного пути."""
+
+    def __init__(
+        self,
+        model=None,
+        velocity_scaling_factor=0.1,
+        acceleration_scaling_factor=0.1,
+        max_deviation=0.005,
+        rate_hz=50.0,
+        window=8,
+    ):
+        self.model = model if model is not None else MotionTimeModel()
+        self.velocity_scaling_factor = velocity_scaling_factor
+        self.acceleration_scaling_factor = acceleration_scaling_factor
+        self.max_deviation = float(max_deviation)
+        self.rate_hz = float(rate_hz)
+        self.window = int(window)
+        self.buffer = []
+
+    def add(self, position):
+        self.buffer.append([float(v) for v in position])
+
+    def plan(self, start_position):
+        """
+        Путь через первые window целей буфера (они из буфера убираются).
+        Заканчивается остановкой в последней из них: дальше планировщик
+        не знает, куда ехать.
+        """
+        targets = self.buffer[: self.window]
+        self.buffer = self.buffer[self.window:]
+        via = np.asarray([list(start_position)] + targets, dtype=float)
+
+        v_max = self.model.cart_v_max * _factor(self.velocity_scaling_factor)
+        a_max = self.model.cart_a_max * _factor(self.acceleration_scaling_factor)
+
+        parts = blend_corners(via, self.max_deviation)
+        if not parts:
+            return BlendedPath(np.zeros(1), via[:1], via, 0.0, 0.0, 0)
+        positions, radii, step = sample_parts(parts)
+        velocities = feed_profile(radii, step, v_max, a_max)
+        times, setpoints = time_parametrize(positions, velocities, step, self.rate_hz)
+
+        stop_and_go = sum(
+            self.model.cartesian_move_ms(
+                via[i], via[i + 1], self.velocity_scaling_factor, self.acceleration_scaling_factor
+            )
+            for i in range(len(via) - 1)
+        )
+        # одна команда вместо N: накладная задержка — один раз
+        blended = self.model.cart_overhead_ms + 1000.0 * float(times[-1])
+        corners = sum(1 for p in parts if p[0] == "arc")
+        return BlendedPath(times, setpoints, via, blended, stop_and_go, corners)
+
+    def execute(self, controller, path, orientation=(0.0, 0.0, 0.0, 1.0)):
+        """
+        Стримить путь позами через ServoController с частотой rate_hz.
+        Возвращает число отправленных уставок; ошибка — исключение или
+        явный False (medu_servo.stream_paced), None от stream_pose — нет.
+        """
+        ox, oy, oz, ow = (float(v) for v in orientation)
+        setpoints = ((x, y, z, ox, oy, oz, ow) for x, y, z in path.positions.tolist())
+        return stream_paced(controller.stream_pose, setpoints, self.rate_hz)
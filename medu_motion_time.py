@@ -0,0 +1,542 @@
+"""
+medu_motion_time.py — оценка времени движений MEdu без робота.
+
+Модель: трапециевидный профиль скорости (разгон — крейсерская скорость —
+торможение). Максимальные скорость и ускорение умножаются на те же
+коэффициенты, которые принимают обёртки (velocity_factor,
+velocity_scaling_factor, max_velocity_scaling_factor и т.д.).
+К каждому движению добавляется постоянная накладная задержка команды.
+
+Шаг задания (job) — обычный dict:
+
+    {"type": "angles", "joints": [0.05, -0.35, -0.75],
+     "velocity_factor": 0.1, "acceleration_factor": 0.1}
+    {"type": "coordinates", "position": [0.32, -0.004, 0.25],
+     "orientation": [0.0, 0.0, 0.0, 1.0],
+     "velocity_scaling_factor": 0.1, "acceleration_scaling_factor": 0.1}
+    {"type": "arc", "target": [0.25, -0.05, 0.20], "center": [0.25, 0.0, 0.20],
+     "max_velocity_scaling_factor": 0.3, "max_acceleration_scaling_factor": 0.3}
+
+Кинематики в SDK нет, поэтому после "angles" декартова позиция неизвестна
+(и наоборот), если в шаге не указана подсказка "position" / "joints".
+Такие движения считаются только по накладной задержке и помечаются
+"exact": False.
+
+Начальные значения параметров — грубые. Их нужно откалибровать
+по записанным прогонам (record_run + calibrate).
+Время везде в миллисекундах.
+"""
+
+import json
+import math
+import time
+
+from medu_wrappers import (
+    medu_move_to_angles,
+    medu_move_to_coordinates,
+    medu_arc_motion,
+)
+
+# ---------------------------------------------------------------------------
+# 1. Трапециевидный профиль
+# ---------------------------------------------------------------------------
+
+# Коэффициент меньше этого значения считаем равным ему (0 дал бы бесконечное время)
+MIN_FACTOR = 0.01
+
+
+def trapezoid_time_s(distance, v_max, a_max):
+    """
+    Время (с) прохода расстояния distance с нулевой начальной и конечной
+    скоростью при ограничениях v_max и a_max.
+    Если крейсерская скорость не достигается — треугольный профиль.
+    """
+    d = abs(float(distance))
+    if d == 0.0:
+        return 0.0
+    if d <= v_max * v_max / a_max:
+        return 2.0 * math.sqrt(d / a_max)
+    return d / v_max + v_max / a_max
+
+
+def _factor(value):
+    return max(float(value), MIN_FACTOR)
+
+
+def _dist3(a, b):
+    return math.sqrt(
+        (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+    )
+
+
+def arc_length(start, target, center):
+    """
+    Длина дуги от start до target вокруг center (радиус берётся по start).
+    """
+    u = [start[i] - center[i] for i in range(3)]
+    v = [target[i] - center[i] for i in range(3)]
+    r_u = math.sqrt(sum(c * c for c in u))
+    r_v = math.sqrt(sum(c * c for c in v))
+    if r_u == 0.0 or r_v == 0.0:
+        return _dist3(start, target)
+    cos_angle = sum(u[i] * v[i] for i in range(3)) / (r_u * r_v)
+    cos_angle = max(-1.0, min(1.0, cos_angle))
+    return r_u * math.acos(cos_angle)
+
+
+# ---------------------------------------------------------------------------
+# 2. Модель времени движения
+# ---------------------------------------------------------------------------
+
+class MotionTimeModel:
+    """
+    Параметры трапециевидной модели для суставов и для декартовых движений.
+
+    joint_v_max / joint_a_max — по одному значению на сустав (рад/с, рад/с²)
+    при коэффициенте 1.0. Суставы синхронизированы: время движения равно
+    времени самого медленного сустава.
+    cart_v_max / cart_a_max — для move_to_coordinates и arc_motion (м/с, м/с²).
+    overhead_ms — задержка на отправку команды и подтверждение.
+    """
+
+    def __init__(
+        self,
+        joint_v_max=(1.0, 1.0, 1.0),
+        joint_a_max=(2.0, 2.0, 2.0),
+        cart_v_max=0.25,
+        cart_a_max=0.5,
+        overhead_ms=150.0,
+    ):
+        self.joint_v_max = [float(v) for v in joint_v_max]
+        self.joint_a_max = [float(a) for a in joint_a_max]
+        self.cart_v_max = float(cart_v_max)
+        self.cart_a_max = float(cart_a_max)
+        self.overhead_ms = float(overhead_ms)
+        # Накладная задержка для декартовых движений калибруется отдельно
+        self.cart_overhead_ms = float(overhead_ms)
+
+    # --- отдельные движения ------------------------------------------------
+
+    def joint_motion_ms(self, start, goal, velocity_factor=0.1, acceleration_factor=0.1):
+        """Чистое время движения по суставам (без накладной задержки)."""
+        vf = _factor(velocity_factor)
+        af = _factor(acceleration_factor)
+        worst = 0.0
+        for i in range(min(len(start), len(goal), len(self.joint_v_max))):
+            t = trapezoid_time_s(
+                goal[i] - start[i],
+                self.joint_v_max[i] * vf,
+                self.joint_a_max[i] * af,
+            )
+            worst = max(worst, t)
+        return worst * 1000.0
+
+    def cartesian_motion_ms(self, distance, velocity_factor=0.1, acceleration_factor=0.1):
+        """Чистое время декартового движения на distance метров."""
+        return 1000.0 * trapezoid_time_s(
+            distance,
+            self.cart_v_max * _factor(velocity_factor),
+            self.cart_a_max * _factor(acceleration_factor),
+        )
+
+    def joint_move_ms(self, start, goal, velocity_factor=0.1, acceleration_factor=0.1):
+        """Полное время medu_move_to_angles от start до goal."""
+        return self.overhead_ms + self.joint_motion_ms(
+            start, goal, velocity_factor, acceleration_factor
+        )
+
+    def cartesian_move_ms(self, start, goal, velocity_factor=0.1, acceleration_factor=0.1):
+        """Полное время medu_move_to_coordinates от точки start до goal."""
+        return self.cart_overhead_ms + self.cartesian_motion_ms(
+            _dist3(start, goal), velocity_factor, acceleration_factor
+        )
+
+    def arc_move_ms(self, start, target, center, velocity_factor=0.5, acceleration_factor=0.5):
+        """Полное время medu_arc_motion от start до target вокруг center."""
+        return self.cart_overhead_ms + self.cartesian_motion_ms(
+            arc_length(start, target, center), velocity_factor, acceleration_factor
+        )
+
+    # --- шаги задания ------------------------------------------------------
+
+    def predict_step(self, step, joints=None, position=None):
+        """
+        Предсказать время одного шага.
+        joints / position — состояние перед шагом (None — неизвестно).
+        Возвращает (time_ms, exact, joints_after, position_after).
+        """
+        kind = step.get("type")
+
+        if kind == "angles":
+            goal = [float(v) for v in step["joints"]]
+            exact = joints is not None
+            motion = 0.0
+            if exact:
+                motion = self.joint_motion_ms(
+                    joints,
+                    goal,
+                    step.get("velocity_factor", 0.1),
+                    step.get("acceleration_factor", 0.1),
+                )
+            return self.overhead_ms + motion, exact, goal, step.get("position")
+
+        if kind == "coordinates":
+            goal = [float(v) for v in step["position"]]
+            exact = position is not None
+            motion = 0.0
+            if exact:
+                motion = self.cartesian_motion_ms(
+                    _dist3(position, goal),
+                    step.get("velocity_scaling_factor", 0.1),
+                    step.get("acceleration_scaling_factor", 0.1),
+                )
+            return self.cart_overhead_ms + motion, exact, step.get("joints"), goal
+
+        if kind == "arc":
+            goal = [float(v) for v in step["target"]]
+            exact = position is not None
+            motion = 0.0
+            if exact:
+                motion = self.cartesian_motion_ms(
+                    arc_length(position, goal, step["center"]),
+                    step.get("max_velocity_scaling_factor", 0.5),
+                    step.get("max_acceleration_scaling_factor", 0.5),
+                )
+            return self.cart_overhead_ms + motion, exact, step.get("joints"), goal
+
+        raise ValueError(f"неизвестный тип шага: {kind!r}")
+
+    def predict_job(self, steps, start_joints=None, start_position=None):
+        """
+        Предсказать время каждого шага и всего цикла.
+        Возвращает {"moves": [{"index", "type", "time_ms", "exact"}, ...],
+                    "total_ms": ...}.
+        """
+        joints = start_joints
+        position = start_position
+        moves = []
+        total = 0.0
+        for index, step in enumerate(steps):
+            ms, exact, joints, position = self.predict_step(step, joints, position)
+            moves.append(
+                {"index": index, "type": step.get("type"), "time_ms": ms, "exact": exact}
+            )
+            total += ms
+        return {"moves": moves, "total_ms": total}
+
+    # --- калибровка --------------------------------------------------------
+
+    def calibrate(self, samples, iterations=40):
+        """
+        Подогнать параметры под записанные прогоны (см. record_run).
+        Скорости и ускорения масштабируются общим множителем (отдельно для
+        суставов и для декартовых движений), накладная задержка — среднее
+        остатков. Учитываются только шаги с известным начальным состоянием.
+        Возвращает {"joint_rms_ms": ..., "cart_rms_ms": ...}.
+        """
+        joint_samples = []
+        cart_samples = []
+        for sample in samples:
+            step = sample["step"]
+            if step.get("type") == "angles" and sample.get("start_joints") is not None:
+                joint_samples.append(sample)
+            elif step.get("type") in ("coordinates", "arc") and sample.get("start_position") is not None:
+                cart_samples.append(sample)
+
+        result = {"joint_rms_ms": None, "cart_rms_ms": None}
+
+        if joint_samples:
+            base_v = list(self.joint_v_max)
+            base_a = list(self.joint_a_max)
+
+            def joint_motion(sv, sa):
+                self.joint_v_max = [v * sv for v in base_v]
+                self.joint_a_max = [a * sa for a in base_a]
+                return [
+                    self.joint_motion_ms(
+                        s["start_joints"],
+                        s["step"]["joints"],
+                        s["step"].get("velocity_factor", 0.1),
+                        s["step"].get("acceleration_factor", 0.1),
+                    )
+                    for s in joint_samples
+                ]
+
+            sv, sa, overhead, rms = _fit_scales(joint_motion, joint_samples, iterations)
+            self.joint_v_max = [v * sv for v in base_v]
+            self.joint_a_max = [a * sa for a in base_a]
+            self.overhead_ms = overhead
+            result["joint_rms_ms"] = rms
+
+        if cart_samples:
+            base_v = self.cart_v_max
+            base_a = self.cart_a_max
+
+            def cart_motion(sv, sa):
+                self.cart_v_max = base_v * sv
+                self.cart_a_max = base_a * sa
+                out = []
+                for s in cart_samples:
+                    step = s["step"]
+                    if step["type"] == "arc":
+                        out.append(
+                            self.cartesian_motion_ms(
+                                arc_length(s["start_position"], step["target"], step["center"]),
+                                step.get("max_velocity_scaling_factor", 0.5),
+                                step.get("max_acceleration_scaling_factor", 0.5),
+                            )
+                        )
+                    else:
+                        out.append(
+                            self.cartesian_motion_ms(
+                                _dist3(s["start_position"], step["position"]),
+                                step.get("velocity_scaling_factor", 0.1),
+                                step.get("acceleration_scaling_factor", 0.1),
+                            )
+                        )
+                return out
+
+            sv, sa, overhead, rms = _fit_scales(cart_motion, cart_samples, iterations)
+            self.cart_v_max = base_v * sv
+            self.cart_a_max = base_a * sa
+            self.cart_overhead_ms = overhead
+            result["cart_rms_ms"] = rms
+
+        return result
+
+    # --- сохранение --------------------------------------------------------
+
+    def to_dict(self):
+        return {
+            "joint_v_max": list(self.joint_v_max),
+            "joint_a_max": list(self.joint_a_max),
+            "cart_v_max": self.cart_v_max,
+            "cart_a_max": self.cart_a_max,
+            "overhead_ms": self.overhead_ms,
+            "cart_overhead_ms": self.cart_overhead_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        model = cls(
+            joint_v_max=data["joint_v_max"],
+            joint_a_max=data["joint_a_max"],
+            cart_v_max=data["cart_v_max"],
+            cart_a_max=data["cart_a_max"],
+            overhead_ms=data["overhead_ms"],
+        )
+        model.cart_overhead_ms = float(data.get("cart_overhead_ms", model.overhead_ms))
+        return model
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def _fit_scales(motion_fn, samples, iterations):
+    """
+    Подбор множителей скорости/ускорения. Ошибка очень резко зависит от
+    скорости, поэтому используется вложенный золотой поиск в логарифмической
+    шкале: внешний — по ускорению, внутренний — по скорости.
+    motion_fn(sv, sa) -> список чистых времён.
+    Возвращает (sv, sa, overhead_ms, rms_ms).
+    """
+    measured = [float(s["elapsed_ms"]) for s in samples]
+
+    def evaluate(sv, sa):
+        motion = motion_fn(sv, sa)
+        residuals = [m - p for m, p in zip(measured, motion)]
+        overhead = max(0.0, sum(residuals) / len(residuals))
+        sse = sum((r - overhead) ** 2 for r in residuals)
+        return overhead, math.sqrt(sse / len(residuals))
+
+    def best_sv(sa):
+        sv = _golden_log_min(lambda v: evaluate(v, sa)[1], 0.05, 20.0, iterations)
+        return sv, evaluate(sv, sa)
+
+    # Внешняя функция не всегда унимодальна: сначала грубая сетка,
+    # затем золотой поиск между соседями лучшего узла
+    grid = [0.05 * (400.0 ** (k / 24.0)) for k in range(25)]
+    errors = [best_sv(a)[1][1] for a in grid]
+    k = errors.index(min(errors))
+    lo = grid[max(k - 1, 0)]
+    hi = grid[min(k + 1, len(grid) - 1)]
+    sa = _golden_log_min(lambda a: best_sv(a)[1][1], lo, hi, iterations)
+    sv, (overhead, rms) = best_sv(sa)
+    return sv, sa, overhead, rms
+
+
+def _golden_log_min(fn, lo, hi, iterations):
+    """Минимум fn(x) на [lo, hi] золотым сечением по log(x)."""
+    ratio = (math.sqrt(5.0) - 1.0) / 2.0
+    a, b = math.log(lo), math.log(hi)
+    c = b - ratio * (b - a)
+    d = a + ratio * (b - a)
+    fc, fd = fn(math.exp(c)), fn(math.exp(d))
+    for _ in range(iterations):
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - ratio * (b - a)
+            fc = fn(math.exp(c))
+        else:
+            a, c, fc = c, d, fd
+            d = a + ratio * (b - a)
+            fd = fn(math.exp(d))
+    return math.exp((a + b) / 2.0)
+
+
+# ---------------------------------------------------------------------------
+# 3. Запись прогонов на роботе (для калибровки)
+# ---------------------------------------------------------------------------
+
+def execute_step(manipulator, step):
+    """
+    Выполнить шаг задания через обёртки medu_*.
+    Возвращает результат обёртки (None при ошибке).
+    """
+    kind = step.get("type")
+
+    if kind == "angles":
+        j = step["joints"]
+        return medu_move_to_angles(
+            manipulator,
+            j[0],
+            j[1],
+            j[2],
+            velocity_factor=step.get("velocity_factor", 0.1),
+            acceleration_factor=step.get("acceleration_factor", 0.1),
+            timeout_seconds=step.get("timeout_seconds", 60.0),
+        )
+
+    if kind == "coordinates":
+        x, y, z = step["position"]
+        ox, oy, oz, ow = step.get("orientation", (0.0, 0.0, 0.0, 1.0))
+        return medu_move_to_coordinates(
+            manipulator,
+            x, y, z,
+            ox, oy, oz, ow,
+            velocity_scaling_factor=step.get("velocity_scaling_factor", 0.1),
+            acceleration_scaling_factor=step.get("acceleration_scaling_factor", 0.1),
+            planner_type=step.get("planner_type"),
+            timeout_seconds=step.get("timeout_seconds", 30.0),
+        )
+
+    if kind == "arc":
+        tx, ty, tz = step["target"]
+        cx, cy, cz = step["center"]
+        ox, oy, oz, ow = step.get("orientation", (0.0, 0.0, 0.0, 1.0))
+        return medu_arc_motion(
+            manipulator,
+            tx, ty, tz,
+            cx, cy, cz,
+            step=step.get("step", 0.05),
+            count_point_arc=step.get("count_point_arc", 50),
+            max_velocity_scaling_factor=step.get("max_velocity_scaling_factor", 0.5),
+            max_acceleration_scaling_factor=step.get("max_acceleration_scaling_factor", 0.5),
+            timeout_seconds=step.get("timeout_seconds", 60.0),
+            ox=ox, oy=oy, oz=oz, ow=ow,
+        )
+
+    raise ValueError(f"неизвестный тип шага: {kind!r}")
+
+
+def record_run(manipulator, steps, start_joints=None, start_position=None):
+    """
+    Выполнить шаги на роботе и замерить время каждого (time.monotonic).
+    Возвращает список образцов для MotionTimeModel.calibrate:
+    {"step", "start_joints", "start_position", "elapsed_ms", "ok"}.
+    """
+    joints = start_joints
+    position = start_position
+    samples = []
+    for step in steps:
+        t0 = time.monotonic()
+        result = execute_step(manipulator, step)
+        elapsed_ms = (time.monotonic() - t0) * 1000.0
+        ok = result is not None
+        if ok:
+            samples.append(
+                {
+                    "step": step,
+                    "start_joints": joints,
+                    "start_position": position,
+                    "elapsed_ms": elapsed_ms,
+                    "ok": ok,
+                }
+            )
+        if step.get("type") == "angles":
+            joints, position = list(step["joints"]), step.get("position")
+        else:
+            joints = step.get("joints")
+            position = list(step["position"] if step.get("type") == "coordinates" else step["target"])
+        if not ok:
+            print(f"[record_run] Шаг не выполнен, прогон остановлен: {step}")
+            break
+    return samples
+
+
+# ---------------------------------------------------------------------------
+# 4. Сравнение порядков обхода
+# ---------------------------------------------------------------------------
+
+def cartesian_time_matrix(model, points, velocity_factor=0.1, acceleration_factor=0.1):
+    """
+    Матрица времён (мс) перемещения move_to_coordinates между всеми парами точек.
+    Считается один раз, после чего оценка любого порядка — O(n) сложений.
+    """
+    n = len(points)
+    matrix = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                matrix[i][j] = model.cartesian_move_ms(
+                    points[i], points[j], velocity_factor, acceleration_factor
+                )
+    return matrix
+
+
+def joint_time_matrix(model, joint_targets, velocity_factor=0.1, acceleration_factor=0.1):
+    """То же для move_to_angles между наборами углов суставов."""
+    n = len(joint_targets)
+    matrix = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                matrix[i][j] = model.joint_move_ms(
+                    joint_targets[i], joint_targets[j], velocity_factor, acceleration_factor
+                )
+    return matrix
+
+
+def ordering_time_ms(matrix, order, start_costs=None):
+    """
+    Время обхода точек в порядке order.
+    start_costs[i] — время от начального положения до точки i (необязательно).
+    """
+    if not order:
+        return 0.0
+    total = start_costs[order[0]] if start_costs is not None else 0.0
+    prev = order[0]
+    for idx in order[1:]:
+        total += matrix[prev][idx]
+        prev = idx
+    return total
+
+
+def best_ordering(matrix, orderings, start_costs=None):
+    """
+    Выбрать самый быстрый порядок из кандидатов.
+    Возвращает (order, time_ms) или (None, None) для пустого списка.
+    """
+    best_order = None
+    best_ms = None
+    for order in orderings:
+        ms = ordering_time_ms(matrix, order, start_costs)
+        if best_ms is None or ms < best_ms:
+            best_order, best_ms = order, ms
+    return best_order, best_ms
@@ -0,0 +1,162 @@
+"""
+medu_orientation.py — ориентации (кватернионы) для движения и стриминга.
+
+Кватернион везде в порядке SDK: (x, y, z, w) — как ox, oy, oz, ow
+в medu_move_to_coordinates / medu_stream_coordinates / medu_arc_motion.
+Все функции работают с массивами NumPy формы (4,) или (N, 4) и
+считают сразу весь массив, без цикла по точкам.
+
+    q = euler_to_quat(0.0, np.pi, 0.0)                 # схват вниз
+    qs = slerp(q_from, q_to, 50)                       # (50, 4)
+    poses = pose_path(p_from, q_from, p_to, q_to, 50)  # (50, 7): x y z ox oy oz ow
+    stream_poses(controller, poses, rate_hz=50)
+
+Углы Эйлера — roll, pitch, yaw (рад), поворот R = Rz(yaw) @ Ry(pitch) @ Rx(roll).
+"""
+
+import numpy as np
+
+from medu_servo import stream_paced
+
+IDENTITY = np.array([0.0, 0.0, 0.0, 1.0])
+
+
+def normalize(q):
+    """
+    Привести кватернион(ы) к единичной длине. q и -q — одна ориентация:
+    одиночный кватернион (и первый в последовательности) приводится
+    к w >= 0, а знак каждого следующего в (N, 4) выбирается по
+    предыдущему (скалярное произведение >= 0) — так соседние точки
+    не "перескакивают", даже когда путь проходит через w = 0.
+    """
+    q = np.asarray(q, dtype=float)
+    norm = np.linalg.norm(q, axis=-1, keepdims=True)
+    if np.any(norm < 1e-9):
+        raise ValueError("нулевой кватернион")
+    q = q / norm
+    if q.ndim != 2:
+        return np.where(q[..., 3:4] < 0.0, -q, q)
+    steps = np.where(np.einsum("ij,ij->i", q[1:], q[:-1]) < 0.0, -1.0, 1.0)
+    first = -1.0 if len(q) and q[0, 3] < 0.0 else 1.0
+    signs = np.cumprod(np.concatenate([[first], steps]))
+    return q * signs[:, None]
+
+
+def euler_to_quat(roll, pitch, yaw):
+    """Углы Эйлера (скаляры или массивы одной длины) -> кватернионы (..., 4)."""
+    hr = np.asarray(roll, dtype=float) / 2.0
+    hp = np.asarray(pitch, dtype=float) / 2.0
+    hy = np.asarray(yaw, dtype=float) / 2.0
+    cr, sr = np.cos(hr), np.sin(hr)
+    cp, sp = np.cos(hp), np.sin(hp)
+    cy, sy = np.cos(hy), np.sin(hy)
+    q = np.stack(
+        [
+            sr * cp * cy - cr * sp * sy,
+            cr * sp * cy + sr * cp * sy,
+            cr * cp * sy - sr * sp * cy,
+            cr * cp * cy + sr * sp * sy,
+        ],
+        axis=-1,
+    )
+    return normalize(q)
+
+
+def quat_to_euler(q):
+    """Кватернионы (..., 4) -> массив (..., 3): roll, pitch, yaw."""
+    q = normalize(q)
+    x, y, z, w = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    roll = np.arctan2(2.0 * (w * x + y * z), 1.0 - 2.0 * (x * x + y * y))
+    pitch = np.arcsin(np.clip(2.0 * (w * y - z * x), -1.0, 1.0))
+    yaw = np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+    return np.stack([roll, pitch, yaw], axis=-1)
+
+
+def multiply(a, b):
+    """Произведение Гамильтона a * b (сначала поворот b, затем a)."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    ax, ay, az, aw = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    bx, by, bz, bw = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+    return np.stack(
+        [
+            aw * bx + ax * bw + ay * bz - az * by,
+            aw * by - ax * bz + ay * bw + az * bx,
+            aw * bz + ax * by - ay * bx + az * bw,
+            aw * bw - ax * bx - ay * by - az * bz,
+        ],
+        axis=-1,
+    )
+
+
+def conjugate(q):
+    q = np.asarray(q, dtype=float)
+    return q * np.array([-1.0, -1.0, -1.0, 1.0])
+
+
+def rotate(q, v):
+    """Повернуть вектор(ы) v (..., 3) кватернионом(ами) q (..., 4)."""
+    q = np.asarray(q, dtype=float)
+    v = np.asarray(v, dtype=float)
+    u = q[..., :3]
+    w = q[..., 3:4]
+    t = 2.0 * np.cross(u, v)
+    return v + w * t + np.cross(u, t)
+
+
+def slerp(q0, q1, n):
+    """n ориентаций от q0 до q1 включительно (сферическая интерполяция), (n, 4)."""
+    q0 = normalize(q0)
+    q1 = normalize(q1)
+    dot = float(np.dot(q0, q1))
+    if dot < 0.0:  # кратчайший путь
+        q1 = -q1
+        dot = -dot
+    t = np.linspace(0.0, 1.0, int(n))[:, None]
+    if dot > 0.9995:
+        # почти совпадают — линейная интерполяция устойчивее
+        return normalize(q0 + t * (q1 - q0))
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    q = (np.sin((1.0 - t) * theta) * q0 + np.sin(t * theta) * q1) / sin_theta
+    return normalize(q)
+
+
+def flange_pose(positions, orientations, tool_offset=(0.0, 0.0, 0.0), tool_orientation=IDENTITY):
+    """
+    Позы фланца по нужным позам инструмента (TCP) с учётом насадки.
+
+    tool_offset — смещение TCP относительно фланца (в системе фланца, м),
+    tool_orientation — поворот инструмента относительно фланца.
+    positions (N, 3), orientations (N, 4) -> (positions, orientations) фланца.
+    """
+    tool_q = normalize(tool_orientation)
+    flange_q = normalize(multiply(orientations, conjugate(tool_q)))
+    flange_p = np.asarray(positions, dtype=float) - rotate(flange_q, np.asarray(tool_offset, dtype=float))
+    return flange_p, flange_q
+
+
+def pose_path(p0, q0, p1, q1, n):
+    """
+    n поз (n, 7) от (p0, q0) до (p1, q1): позиция — по прямой,
+    ориентация — slerp. Кватернионы уже нормированы.
+    """
+    t = np.linspace(0.0, 1.0, int(n))[:, None]
+    p0 = np.asarray(p0, dtype=float)
+    p1 = np.asarray(p1, dtype=float)
+    positions = p0 + t * (p1 - p0)
+    return np.hstack([positions, slerp(q0, q1, n)])
+
+
+def as_wrapper_args(q):
+    """Кватернион -> (ox, oy, oz, ow) обычными float — для обёрток medu_*."""
+    ox, oy, oz, ow = normalize(q).tolist()
+    return ox, oy, oz, ow
+
+
+def stream_poses(controller, poses, rate_hz=50.0):
+    """
+    Отправить позы (N, 7) через ServoController.stream_pose с частотой rate_hz.
+    Возвращает число отправленных уставок (см. medu_servo.stream_paced).
+    """
+    return stream_paced(controller.stream_pose, np.asarray(poses, dtype=float).tolist(), rate_hz)
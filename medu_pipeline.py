@@ -0,0 +1,359 @@
+"""
+medu_pipeline.py — конвейер стадий "камера -> детекция -> план -> движение".
+
+Каждая стадия работает в своём потоке. Стадии связаны ограниченными
+очередями с одной из политик:
+- "block"       — обратное давление: производитель ждёт места в очереди
+                  (для планирования/исполнения — ничего не теряем);
+- "drop_oldest" — при переполнении выбрасывается самый старый элемент
+                  (для кадров — устаревший кадр не нужен).
+
+Функция стадии получает элемент и возвращает:
+- None — ничего не передавать дальше;
+- иначе — результат идёт в следующую стадию (fan_out=True — каждый
+  элемент возвращённого списка отдельно).
+
+По каждой стадии считаются обработанные/выброшенные элементы,
+пропускная способность и время обработки, по всему конвейеру — задержка
+от источника до конца (report()).
+
+make_pick_pipeline() собирает типовой конвейер: источник кадров ->
+детекция (подключаемая функция) -> перевод в координаты робота ->
+PickScheduler -> execute_plan (medu_move_to_coordinates). Камера не
+обязательна: synthetic_frames() выдаёт искусственные кадры.
+"""
+
+import collections
+import random
+import threading
+import time
+
+from medu_scheduler import PickScheduler, execute_plan
+from medu_stats import percentile
+
+_STOP = object()
+
+
+class BoundedQueue:
+    """Очередь с ограничением размера и политикой переполнения."""
+
+    def __init__(self, maxsize=4, policy="block"):
+        if policy not in ("block", "drop_oldest"):
+            raise ValueError("policy должен быть 'block' или 'drop_oldest'")
+        if maxsize <= 0:
+            raise ValueError("maxsize должен быть > 0")
+        self.maxsize = int(maxsize)
+        self.policy = policy
+        self.dropped = 0
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+
+    def put(self, item, force=False):
+        """force=True — положить даже при переполнении (служебные сигналы)."""
+        with self._cond:
+            if not force:
+                if self.policy == "block":
+                    while len(self._items) >= self.maxsize:
+                        self._cond.wait()
+                elif len(self._items) >= self.maxsize:
+                    self._items.popleft()
+                    self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self):
+        with self._cond:
+            while not self._items:
+                self._cond.wait()
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class Stage:
+    """Поток, который берёт элементы из input_queue и отдаёт в output_queue."""
+
+    def __init__(self, name, func, input_queue, output_queue=None, fan_out=False):
+        self.name = name
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.fan_out = fan_out
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started = None
+        self.finished = None
+        self.end_to_end_ms = []  # только для последней стадии
+        self._thread = None
+
+    def start(self):
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _emit(self, created, value):
+        if self.output_queue is not None:
+            self.output_queue.put((created, value))
+        else:
+            self.end_to_end_ms.append((time.monotonic() - created) * 1000.0)
+
+    def _run(self):
+        try:
+            while True:
+                envelope = self.input_queue.get()
+                if envelope is _STOP:
+                    break
+                created, item = envelope
+                t0 = time.monotonic()
+                try:
+                    result = self.func(item)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[Stage {self.name}] Ошибка: {e}")
+                    result = None
+                self.busy_seconds += time.monotonic() - t0
+                self.processed += 1
+                if result is None:
+                    continue
+                try:
+                    for value in (result if self.fan_out else (result,)):
+                        self._emit(created, value)
+                except Exception as e:
+                    # например, fan_out и результат не список
+                    self.errors += 1
+                    print(f"[Stage {self.name}] Ошибка передачи результата: {e}")
+        finally:
+            # _STOP уходит дальше при любом выходе, иначе join() ждёт вечно
+            self.finished = time.monotonic()
+            if self.output_queue is not None:
+                self.output_queue.put(_STOP, force=True)
+
+    def stats(self):
+        end = self.finished or time.monotonic()
+        elapsed = max(end - (self.started or end), 1e-9)
+        stats = {
+            "stage": self.name,
+            "processed": self.processed,
+            "dropped_in": self.input_queue.dropped,
+            "errors": self.errors,
+            "throughput_per_s": self.processed / elapsed,
+            "mean_busy_ms": 1000.0 * self.busy_seconds / self.processed if self.processed else None,
+            "utilization": self.busy_seconds / elapsed,
+        }
+        if self.output_queue is None and self.end_to_end_ms:
+            stats["end_to_end_p50_ms"] = percentile(self.end_to_end_ms, 0.5)
+            stats["end_to_end_max_ms"] = percentile(self.end_to_end_ms, 1.0)
+        return stats
+
+
+class Pipeline:
+    """Источник + цепочка стадий."""
+
+    def __init__(self, source, rate_hz=None, queue_size=4, policy="block"):
+        """
+        source() -> элемент или None (источник исчерпан).
+        rate_hz — ограничить частоту источника (например, FPS камеры).
+        """
+        self.source = source
+        self.period = 1.0 / rate_hz if rate_hz else 0.0
+        self.default_queue_size = queue_size
+        self.stages = []
+        self._head = BoundedQueue(queue_size, policy)
+        self._tail = self._head
+        self._source_thread = None
+        self._running = False
+        self.produced = 0
+
+    def add_stage(self, name, func, queue_size=None, policy="block", fan_out=False):
+        """
+        Добавить стадию. queue_size/policy относятся к очереди на выходе
+        этой стадии (входу следующей); у последней стадии выхода нет.
+        """
+        stage = Stage(name, func, self._tail, fan_out=fan_out)
+        if self.stages:
+            self.stages[-1].output_queue = self._tail
+        self.stages.append(stage)
+        self._tail = BoundedQueue(queue_size or self.default_queue_size, policy)
+        return self
+
+    def set_source_policy(self, policy, queue_size=None):
+        """Политика очереди между источником и первой стадией."""
+        self._head.policy = policy
+        if queue_size:
+            self._head.maxsize = int(queue_size)
+        return self
+
+    def start(self):
+        if not self.stages:
+            raise ValueError("в конвейере нет стадий")
+        self._running = True
+        for stage in self.stages:
+            stage.start()
+        self._source_thread = threading.Thread(target=self._produce, name="stage-source", daemon=True)
+        self._source_thread.start()
+        return self
+
+    def _produce(self):
+        next_time = time.monotonic()
+        while self._running:
+            try:
+                item = self.source()
+            except Exception as e:
+                print(f"[Pipeline] Ошибка источника: {e}")
+                item = None
+            if item is None:
+                break
+            self._head.put((time.monotonic(), item))
+            self.produced += 1
+            if self.period:
+                next_time += self.period
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_time = time.monotonic()
+        self._head.put(_STOP, force=True)
+
+    def stop(self):
+        """Остановить источник; стадии доработают то, что уже в очередях."""
+        self._running = False
+
+    def join(self, timeout=None):
+        if self._source_thread is not None:
+            self._source_thread.join(timeout)
+        for stage in self.stages:
+            stage.join(timeout)
+
+    def report(self):
+        return {"produced": self.produced, "stages": [s.stats() for s in self.stages]}
+
+
+# ---------------------------------------------------------------------------
+# Типовой конвейер pick-and-place
+# ---------------------------------------------------------------------------
+
+def synthetic_frames(count=100, max_objects=3, area=((0.2, 0.35), (-0.15, 0.15)), z=0.05, seed=None):
+    """
+    Источник искусственных "кадров": {"frame_id", "objects": [[x, y, z], ...]}
+    в координатах камеры (здесь совпадают с метрами на столе).
+    """
+    rng = random.Random(seed)
+    state = {"frame_id": 0}
+
+    def source():
+        if state["frame_id"] >= count:
+            return None
+        state["frame_id"] += 1
+        objects = [
+            [rng.uniform(*area[0]), rng.uniform(*area[1]), z]
+            for _ in range(rng.randint(0, max_objects))
+        ]
+        return {"frame_id": state["frame_id"], "objects": objects}
+
+    return source
+
+
+def _near(point, others, tolerance):
+    return any(
+        (point[0] - o[0]) ** 2 + (point[1] - o[1]) ** 2 + (point[2] - o[2]) ** 2 <= tolerance * tolerance
+        for o in others
+    )
+
+
+def make_pick_pipeline(
+    manipulator,
+    source,
+    detect,
+    place_position,
+    to_robot=None,
+    scheduler=None,
+    rate_hz=None,
+    approach_height=0.05,
+    on_pick=None,
+    on_place=None,
+    match_tolerance=0.01,
+    picked_memory_s=3.0,
+):
+    """
+    Собрать конвейер: source -> detect -> to_robot -> plan -> execute.
+
+    detect(frame) -> список точек в кадре камеры (или None);
+    to_robot(points) -> список точек в координатах робота
+                       (например, CalibrationStore-преобразование);
+    place_position — куда класть детали [x, y, z].
+    Кадры, которые не успели обработать, выбрасываются (drop_oldest),
+    задания на движение — никогда (block).
+
+    Одна деталь видна на многих кадрах подряд, поэтому стадия plan
+    добавляет в scheduler только новые точки: ближе match_tolerance (м)
+    к ожидающему или выполняемому заданию или к детали, взятой за
+    последние picked_memory_s секунд, — та же деталь. Невыполненные задания
+    остаются в scheduler; execute берёт по одному, каждый раз
+    перепланируя с тёплым стартом.
+    """
+    scheduler = scheduler if scheduler is not None else PickScheduler()
+    lock = threading.Lock()  # scheduler и picked — из потоков plan и execute
+    picked = collections.deque()  # (monotonic, pick) взятых деталей
+    active = []  # pick задания, которое сейчас выполняется
+
+    def transform(points):
+        if not points:
+            return None
+        return to_robot(points) if to_robot is not None else points
+
+    def plan(points):
+        with lock:
+            now = time.monotonic()
+            while picked and now - picked[0][0] > picked_memory_s:
+                picked.popleft()
+            known = [t["pick"] for t in scheduler.tasks] + active + [p for _, p in picked]
+            added = 0
+            for point in points:
+                pick = [float(point[0]), float(point[1]), float(point[2]) + approach_height]
+                if _near(pick, known, match_tolerance):
+                    continue
+                scheduler.add({"pick": pick, "place": list(place_position)})
+                known.append(pick)
+                added += 1
+            if not added:
+                return None
+            # после каждой детали рука стоит над местом укладки
+            return scheduler.plan(start_position=list(place_position))
+
+    def execute(_ordered):
+        done = []
+        while True:
+            with lock:
+                # за время движения могли прийти новые детали — порядок заново
+                ordered = scheduler.plan(start_position=list(place_position))
+                if not ordered:
+                    break
+                task = ordered[0]
+                scheduler.remove(task["id"])
+                active[:] = [task["pick"]]
+            result = execute_plan(manipulator, [task], on_pick=on_pick, on_place=on_place)
+            with lock:
+                active.clear()
+                if result:
+                    picked.append((time.monotonic(), task["pick"]))
+            if not result:
+                # деталь не взята — её увидят на следующих кадрах
+                break
+            done.extend(result)
+        return done or None
+
+    pipeline = Pipeline(source, rate_hz=rate_hz, queue_size=2, policy="drop_oldest")
+    pipeline.add_stage("detect", detect, queue_size=2, policy="drop_oldest")
+    pipeline.add_stage("transform", transform, queue_size=4, policy="block")
+    pipeline.add_stage("plan", plan, queue_size=2, policy="block")
+    pipeline.add_stage("execute", execute)
+    return pipeline
@@ -0,0 +1,331 @@
+"""
+medu_poll_governor.py — один опросчик состояния с адаптивной частотой.
+
+Скрипты и люди опрашивают medu_get_joint_state / medu_get_gpio_value /
+medu_conveyor_get_sensors_data кто во что горазд. PollGovernor опрашивает
+сам, а читатели берут последнее значение из кэша (get / wait_for /
+subscribe) — к роботу они не ходят.
+
+Частота у каждого сигнала своя:
+- значение изменилось -> интервал сбрасывается до min_interval
+  (рука едет, лента везёт — ждём следующего события быстро);
+- не изменилось -> интервал растёт в backoff раз до max_interval;
+- expect(name, seconds) — "скоро будет событие" (запустили движение,
+  включили ленту): сигнал сразу опрашивается и держится на
+  min_interval заданное время, даже если значение пока не меняется;
+- active=callable — пока возвращает True, сигнал тоже держится на
+  min_interval (например, "лента включена").
+
+Все опросы идут через общий TokenBucket (rate_limit запросов в секунду,
+burst — запас на всплеск), так что нагрузка на MQTT ограничена при
+любом числе сигналов и читателей. Когда жетонов мало, первым
+опрашивается сигнал, чей срок подошёл раньше, — а у "горячих"
+сигналов он подходит раньше всех.
+
+    governor = default_governor(manipulator, gpio_pins=["DOOR"], rate_limit=20)
+    governor.start()
+    medu_move_to_angles(...)              # или из другого потока
+    governor.expect("joints", 5.0)
+    governor.wait_for("sensors", lambda d: d["DistanceSensor"] < 100, timeout=10)
+    print(governor.report())
+"""
+
+import heapq
+import threading
+import time
+
+from medu_wait import joint_values
+from medu_wrappers import medu_conveyor_get_sensors_data, medu_get_gpio_value, medu_get_joint_state
+
+
+class TokenBucket:
+    """Не больше rate запросов в секунду в среднем, всплеск до burst."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate / 4.0))
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_s = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def try_acquire(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    def delay(self):
+        """Сколько ждать до следующего жетона, с (0 — есть сейчас)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Взять жетон, подождав, если нужно."""
+        while not self.try_acquire():
+            wait = max(self.delay(), 0.001)
+            self.waited_s += wait
+            time.sleep(wait)
+
+
+class Signal:
+    """Один опрашиваемый сигнал и его расписание."""
+
+    def __init__(self, name, read, min_interval=0.05, max_interval=2.0, backoff=2.0, changed=None, active=None):
+        self.name = name
+        self.read = read
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max_interval)
+        self.backoff = float(backoff)
+        self.changed = changed or (lambda old, new: old != new)
+        self.active = active
+
+        self.interval = self.min_interval
+        self.value = None
+        self.stamp = None  # monotonic последнего успешного чтения
+        self.hot_until = 0.0
+        self.polls = 0
+        self.changes = 0
+        self.errors = 0
+
+    def is_hot(self, now):
+        if now < self.hot_until:
+            return True
+        if self.active is not None:
+            try:
+                return bool(self.active())
+            except Exception as e:
+                print(f"[Signal {self.name}] Ошибка active(): {e}")
+        return False
+
+    def update(self, value, now):
+        """Новое значение -> (изменилось ли, следующий интервал)."""
+        self.polls += 1
+        if value is None:
+            # обёртка вернула None — ошибка; не спешим повторять
+            self.errors += 1
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+            return False
+        changed = self.value is None or self.changed(self.value, value)
+        self.value = value
+        self.stamp = now
+        if changed:
+            self.changes += 1
+        if changed or self.is_hot(now):
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return changed
+
+
+class PollGovernor:
+    """Планировщик опросов: один поток, общий лимит запросов в секунду."""
+
+    def __init__(self, rate_limit=20.0, burst=None):
+        self.bucket = TokenBucket(rate_limit, burst)
+        self.signals = {}
+        self._subscribers = {}
+        self._heap = []  # (срок, номер, имя)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.started = None
+
+    # --- сигналы -------------------------------------------------------------
+
+    def add(self, name, read, **options):
+        """Зарегистрировать сигнал: read() -> значение или None (ошибка)."""
+        with self._cond:
+            self.signals[name] = Signal(name, read, **options)
+            self._schedule(name, time.monotonic())
+        return self.signals[name]
+
+    def _schedule(self, name, due):
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, name))
+        self._cond.notify()
+
+    def expect(self, name=None, seconds=5.0):
+        """Ждём событие: опросить сейчас и держать min_interval seconds секунд."""
+        now = time.monotonic()
+        with self._cond:
+            for signal in ([self.signals[name]] if name else self.signals.values()):
+                signal.hot_until = max(signal.hot_until, now + seconds)
+                signal.interval = signal.min_interval
+                self._schedule(signal.name, now)
+
+    def subscribe(self, name, callback):
+        """callback(name, value) при каждом изменении (из потока опроса)."""
+        with self._cond:
+            self._subscribers.setdefault(name, []).append(callback)
+
+    # --- чтение из кэша ------------------------------------------------------
+
+    def get(self, name):
+        """(значение, возраст в секундах) — без запроса к роботу."""
+        signal = self.signals[name]
+        with self._cond:
+            if signal.stamp is None:
+                return None, float("inf")
+            return signal.value, time.monotonic() - signal.stamp
+
+    def wait_for(self, name, predicate, timeout=5.0, expect=True, max_age=None):
+        """
+        Ждать, пока predicate(значение) станет True. expect=True — заодно
+        перевести сигнал в быстрый опрос на время ожидания.
+        Проверяются только значения, прочитанные после вызова, — иначе
+        "дверь открыта" из кэша сработало бы, когда её уже закрыли.
+        max_age — принять и значение из кэша не старше max_age секунд.
+        """
+        start = time.monotonic()
+        if expect:
+            self.expect(name, timeout)
+        deadline = start + timeout
+        oldest = start if max_age is None else start - max_age
+        signal = self.signals[name]
+        with self._cond:
+            while True:
+                if signal.value is not None and signal.stamp >= oldest:
+                    try:
+                        if predicate(signal.value):
+                            return True
+                    except Exception as e:
+                        print(f"[PollGovernor.wait_for] Ошибка условия: {e}")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+    # --- поток опроса --------------------------------------------------------
+
+    def start(self):
+        self._running = True
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="medu-poll-governor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _next_due(self):
+        """Имя сигнала, чей срок подошёл, или None после stop()."""
+        with self._cond:
+            while self._running:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, name = self._heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)  # expect() может поставить срок раньше
+                    continue
+                heapq.heappop(self._heap)
+                # у сигнала могли остаться устаревшие сроки (после expect) — берём один
+                self._heap = [entry for entry in self._heap if entry[2] != name]
+                heapq.heapify(self._heap)
+                return name
+            return None
+
+    def _run(self):
+        while True:
+            name = self._next_due()
+            if name is None:
+                return
+            self.bucket.acquire()
+            signal = self.signals[name]
+            try:
+                value = signal.read()
+            except Exception as e:
+                print(f"[PollGovernor] Ошибка чтения {name}: {e}")
+                value = None
+            now = time.monotonic()
+            with self._cond:
+                changed = signal.update(value, now)
+                self._schedule(name, now + signal.interval)
+                self._cond.notify_all()
+                callbacks = list(self._subscribers.get(name, ())) if changed else []
+            for callback in callbacks:
+                try:
+                    callback(name, value)
+                except Exception as e:
+                    print(f"[PollGovernor] Ошибка подписчика {name}: {e}")
+
+    def report(self):
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        with self._cond:
+            signals = {
+                name: {
+                    "polls": s.polls,
+                    "changes": s.changes,
+                    "errors": s.errors,
+                    "interval_s": s.interval,
+                }
+                for name, s in self.signals.items()
+            }
+        total = sum(s["polls"] for s in signals.values())
+        return {
+            "requests": total,
+            "requests_per_s": total / elapsed if elapsed > 0 else None,
+            "rate_limit": self.bucket.rate,
+            "throttled_s": self.bucket.waited_s,
+            "signals": signals,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Сигналы MEdu
+# ---------------------------------------------------------------------------
+
+
+def joints_changed(tolerance=0.002):
+    """Сравнение углов с допуском (шум телеметрии — не движение)."""
+    def changed(old, new):
+        a, b = joint_values(old), joint_values(new)
+        if not a or not b or len(a) != len(b):
+            return True
+        return max(abs(x - y) for x, y in zip(a, b)) > tolerance
+
+    return changed
+
+
+def default_governor(manipulator, gpio_pins=(), rate_limit=20.0, belt_running=None):
+    """
+    Губернатор со стандартными сигналами: "joints", "sensors", "gpio:<пин>".
+    belt_running — callable "лента включена" (держит датчики на быстром опросе).
+    """
+    governor = PollGovernor(rate_limit)
+    governor.add(
+        "joints",
+        lambda: medu_get_joint_state(manipulator),
+        min_interval=0.05,
+        max_interval=2.0,
+        changed=joints_changed(),
+    )
+    governor.add(
+        "sensors",
+        lambda: medu_conveyor_get_sensors_data(manipulator, as_json=True),
+        min_interval=0.05,
+        max_interval=1.0,
+        active=belt_running,
+    )
+    for pin in gpio_pins:
+        governor.add(
+            f"gpio:{pin}",
+            lambda pin=pin: medu_get_gpio_value(manipulator, pin),
+            min_interval=0.05,
+            max_interval=1.0,
+        )
+    return governor
@@ -0,0 +1,315 @@
+"""
+medu_recorder.py — запись и воспроизведение сессий вызовов medu_*.
+
+Запись (по желанию, включается явно):
+
+    recorder = CallRecorder("session.jsonl")
+    recorder.install()          # подменить medu_* во всех загруженных модулях
+    ...                         # обычная работа
+    recorder.uninstall()
+
+Каждая строка лога — JSON:
+    {"call": "medu_move_to_angles", "args": [...], "kwargs": {...},
+     "result": ..., "t_start": 1.234, "duration_ms": 812.5, "replayable": true}
+t_start — секунды от начала записи по time.monotonic. manipulator в args
+не пишется. "replayable": false — аргументы не сериализуются в JSON
+(например, ServoControlType), такой вызов при воспроизведении пропускается.
+
+Воспроизведение:
+
+    report = replay(load_log("session.jsonl"), speed=0)   # без пауз
+    save_report(report, "build_a.json")
+
+speed=1 — в исходном темпе, speed=10 — в 10 раз быстрее, 0 — без пауз.
+Без manipulator используется ReplayMEdu — подставной объект, который
+отдаёт записанные ответы SDK мгновенно, поэтому замер показывает
+накладные расходы именно слоя обёрток.
+
+Сравнение двух сборок:
+
+    python medu_recorder.py replay session.jsonl --out build_a.json
+    (переключиться на другую сборку)
+    python medu_recorder.py replay session.jsonl --out build_b.json
+    python medu_recorder.py compare build_a.json build_b.json
+"""
+
+import argparse
+import functools
+import json
+import statistics
+import sys
+import threading
+import time
+
+import medu_wrappers
+from medu_daemon import to_jsonable
+from medu_stats import percentile
+
+
+# ---------------------------------------------------------------------------
+# 1. Запись
+# ---------------------------------------------------------------------------
+
+def _recordable_names():
+    return [
+        name
+        for name in dir(medu_wrappers)
+        if name.startswith("medu_") and name != "medu_connect" and callable(getattr(medu_wrappers, name))
+    ]
+
+
+class CallRecorder:
+    """Пишет каждый вызов medu_* (кроме medu_connect) в JSONL-файл."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+        self._patched = []  # (module, name, original)
+        self.count = 0
+
+    def wrap(self, func, name=None):
+        name = name or func.__name__
+
+        @functools.wraps(func)
+        def recorded(manipulator, *args, **kwargs):
+            t_start = time.monotonic()
+            result = func(manipulator, *args, **kwargs)
+            t_end = time.monotonic()
+            self._write(name, args, kwargs, result, t_start, t_end)
+            return result
+
+        recorded.__medu_recorded__ = func
+        return recorded
+
+    def _write(self, name, args, kwargs, result, t_start, t_end):
+        try:
+            json.dumps([args, kwargs])
+            replayable = True
+        except (TypeError, ValueError):
+            replayable = False
+        record = {
+            "call": name,
+            "args": to_jsonable(list(args)),
+            "kwargs": to_jsonable(kwargs),
+            "result": to_jsonable(result),
+            "t_start": t_start - self._t0,
+            "duration_ms": (t_end - t_start) * 1000.0,
+            "replayable": replayable,
+        }
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self.count += 1
+
+    def install(self, modules=None):
+        """
+        Подменить обёртки на записывающие. Без modules — во всех загруженных
+        модулях, где есть ссылка на исходную функцию (from medu_wrappers import ...).
+        """
+        originals = {getattr(medu_wrappers, name): name for name in _recordable_names()}
+        wrapped = {func: self.wrap(func, name) for func, name in originals.items()}
+
+        if modules is None:
+            modules = [m for m in list(sys.modules.values()) if m is not None]
+        if medu_wrappers not in modules:
+            modules = [medu_wrappers] + list(modules)
+
+        for module in modules:
+            namespace = getattr(module, "__dict__", None)
+            if not isinstance(namespace, dict):
+                continue
+            for attr, value in list(namespace.items()):
+                try:
+                    replacement = wrapped.get(value)
+                except TypeError:
+                    continue  # нехэшируемое значение
+                if replacement is not None:
+                    setattr(module, attr, replacement)
+                    self._patched.append((module, attr, value))
+
+    def uninstall(self):
+        for module, attr, original in reversed(self._patched):
+            setattr(module, attr, original)
+        self._patched = []
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        self.uninstall()
+        self._file.close()
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# 2. Воспроизведение
+# ---------------------------------------------------------------------------
+
+def load_log(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class _ReplayConveyor:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def __getattr__(self, name):
+        return self._owner._respond
+
+
+class ReplayMEdu:
+    """
+    Подставной MEdu: любой метод (и методы mgbot_conveyer) сразу
+    возвращает next_result — записанный ответ текущего вызова.
+    """
+
+    def __init__(self):
+        self.next_result = None
+        self.mgbot_conveyer = _ReplayConveyor(self)
+
+    def _respond(self, *args, **kwargs):
+        return self.next_result
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self._respond
+
+    def disconnect(self):
+        pass
+
+
+def replay(records, manipulator=None, speed=0.0):
+    """
+    Прогнать записанные вызовы через текущие medu_wrappers.
+    Возвращает список {"call", "latency_ms", "recorded_ms"}.
+    """
+    fake = manipulator is None
+    target = ReplayMEdu() if fake else manipulator
+    report = []
+    t0 = time.monotonic()
+
+    for record in records:
+        if not record.get("replayable", True):
+            continue
+        func = getattr(medu_wrappers, record["call"], None)
+        if func is None:
+            print(f"[replay] Нет обёртки {record['call']} — пропуск")
+            continue
+
+        if speed and speed > 0:
+            delay = record["t_start"] / speed - (time.monotonic() - t0)
+            if delay > 0:
+                time.sleep(delay)
+
+        if fake:
+            target.next_result = record.get("result")
+
+        t_start = time.perf_counter()
+        func(target, *record.get("args", []), **record.get("kwargs", {}))
+        latency_ms = (time.perf_counter() - t_start) * 1000.0
+
+        report.append(
+            {
+                "call": record["call"],
+                "latency_ms": latency_ms,
+                "recorded_ms": record.get("duration_ms"),
+            }
+        )
+    return report
+
+
+# ---------------------------------------------------------------------------
+# 3. Отчёты и сравнение
+# ---------------------------------------------------------------------------
+
+def summarize(report):
+    """Статистика по имени вызова: count, mean_ms, p50_ms, p95_ms."""
+    by_call = {}
+    for item in report:
+        by_call.setdefault(item["call"], []).append(item["latency_ms"])
+    summary = {}
+    for name, values in sorted(by_call.items()):
+        summary[name] = {
+            "count": len(values),
+            "mean_ms": statistics.fmean(values),
+            "p50_ms": percentile(values, 0.5),
+            "p95_ms": percentile(values, 0.95),
+        }
+    return summary
+
+
+def save_report(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"report": report, "summary": summarize(report)}, f, indent=2)
+
+
+def compare(summary_a, summary_b):
+    """
+    Разница p50 между двумя сборками по каждому вызову.
+    Возвращает список строк таблицы (call, p50_a, p50_b, delta_ms, ratio).
+    """
+    rows = []
+    for name in sorted(set(summary_a) | set(summary_b)):
+        a = summary_a.get(name, {}).get("p50_ms")
+        b = summary_b.get(name, {}).get("p50_ms")
+        delta = b - a if a is not None and b is not None else None
+        ratio = b / a if a and b is not None else None
+        rows.append((name, a, b, delta, ratio))
+    return rows
+
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Воспроизведение и сравнение сессий medu_*")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rep = sub.add_parser("replay", help="прогнать лог на ReplayMEdu")
+    rep.add_argument("log")
+    rep.add_argument("--speed", type=float, default=0.0, help="0 — без пауз, 1 — исходный темп")
+    rep.add_argument("--out", help="куда сохранить отчёт (JSON)")
+
+    cmp_ = sub.add_parser("compare", help="сравнить два отчёта")
+    cmp_.add_argument("a")
+    cmp_.add_argument("b")
+    cmp_.add_argument("--threshold", type=float, default=1.2, help="порог регрессии (отношение p50)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "replay":
+        report = replay(load_log(args.log), speed=args.speed)
+        if args.out:
+            save_report(report, args.out)
+        for name, s in summarize(report).items():
+            print(f"{name:<36} n={s['count']:<5} p50={s['p50_ms']:.4f} мс  p95={s['p95_ms']:.4f} мс")
+        return 0
+
+    with open(args.a, "r", encoding="utf-8") as f:
+        summary_a = json.load(f)["summary"]
+    with open(args.b, "r", encoding="utf-8") as f:
+        summary_b = json.load(f)["summary"]
+
+    regressions = 0
+    print(f"{'call':<36} {'p50 A, мс':>10} {'p50 B, мс':>10} {'Δ, мс':>10} {'B/A':>6}")
+    for name, a, b, delta, ratio in compare(summary_a, summary_b):
+        flag = ""
+        if ratio is not None and ratio > args.threshold:
+            flag = "  ← регрессия"
+            regressions += 1
+        print(f"{name:<36} {_fmt(a, '10.4f')} {_fmt(b, '10.4f')} {_fmt(delta, '+10.4f')} {_fmt(ratio, '6.2f')}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
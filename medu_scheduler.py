@@ -0,0 +1,324 @@
+"""
+medu_scheduler.py — выбор порядка выполнения заданий pick-and-place.
+
+Задание — dict:
+
+    {"id": "part-1",
+     "pick": [0.30, -0.05, 0.12],           # откуда взять
+     "place": [0.20, 0.15, 0.10],           # куда положить (None — только pick)
+     "pick_orientation": [0, 0, 0, 1],      # необязательно
+     "place_orientation": [0, 0, 0, 1]}     # необязательно
+
+Стоимость перехода между заданиями i -> j — предсказанное время
+move_to_coordinates от точки place_i до pick_j (medu_motion_time).
+Порядок ищется эвристикой: ближайший сосед + 2-opt + перенос одного
+задания (or-opt), с ограничением по времени (по умолчанию 8 мс, считая
+от входа в plan()), поэтому перепланирование при появлении новых деталей
+укладывается в 10 мс. PickScheduler хранит матрицу между вызовами plan():
+add() / remove() досчитывают только строку и столбец своего задания.
+
+Готовый план выполняется через обёртку medu_move_to_coordinates.
+"""
+
+import itertools
+import time
+
+from medu_motion_time import MotionTimeModel
+from medu_wrappers import medu_move_to_coordinates
+
+# ---------------------------------------------------------------------------
+# 1. Матрица стоимостей
+# ---------------------------------------------------------------------------
+
+
+def _end_point(task):
+    return task["place"] if task.get("place") is not None else task["pick"]
+
+
+def build_costs(
+    model,
+    tasks,
+    start_position=None,
+    velocity_scaling_factor=0.1,
+    acceleration_scaling_factor=0.1,
+):
+    """
+    Посчитать стоимости (мс) для эвристики.
+    Возвращает (cost, start_costs):
+      cost[i][j]     — переход от конца задания i к началу задания j;
+      start_costs[j] — от start_position до начала задания j
+                       (нули, если стартовая позиция неизвестна).
+    Время pick -> place внутри задания от порядка не зависит и не учитывается.
+    """
+    n = len(tasks)
+    ends = [_end_point(t) for t in tasks]
+    picks = [t["pick"] for t in tasks]
+    vf = velocity_scaling_factor
+    af = acceleration_scaling_factor
+
+    cost = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        row = cost[i]
+        for j in range(n):
+            if i != j:
+                row[j] = model.cartesian_move_ms(ends[i], picks[j], vf, af)
+
+    if start_position is None:
+        start_costs = [0.0] * n
+    else:
+        start_costs = [model.cartesian_move_ms(start_position, p, vf, af) for p in picks]
+
+    return cost, start_costs
+
+
+def route_cost(cost, start_costs, order):
+    """Суммарная стоимость переходов для порядка order."""
+    if not order:
+        return 0.0
+    total = start_costs[order[0]]
+    for a, b in zip(order, order[1:]):
+        total += cost[a][b]
+    return total
+
+
+# ---------------------------------------------------------------------------
+# 2. Эвристика: ближайший сосед + 2-opt + or-opt
+# ---------------------------------------------------------------------------
+
+
+def nearest_neighbor_order(cost, start_costs):
+    """Жадный порядок: каждый раз идём к ближайшему незанятому заданию."""
+    n = len(start_costs)
+    if n == 0:
+        return []
+    remaining = set(range(n))
+    current = min(remaining, key=lambda j: start_costs[j])
+    order = [current]
+    remaining.remove(current)
+    while remaining:
+        row = cost[current]
+        current = min(remaining, key=lambda j: row[j])
+        order.append(current)
+        remaining.remove(current)
+    return order
+
+
+def insert_cheapest(cost, start_costs, order, new_items):
+    """Вставить новые задания в существующий порядок в самые дешёвые места."""
+    order = list(order)
+    for item in new_items:
+        best_pos = 0
+        best_delta = None
+        for pos in range(len(order) + 1):
+            prev = order[pos - 1] if pos > 0 else None
+            nxt = order[pos] if pos < len(order) else None
+            delta = start_costs[item] if prev is None else cost[prev][item]
+            if nxt is not None:
+                delta += cost[item][nxt]
+                delta -= start_costs[nxt] if prev is None else cost[prev][nxt]
+            if best_delta is None or delta < best_delta:
+                best_pos, best_delta = pos, delta
+        order.insert(best_pos, item)
+    return order
+
+
+def improve_order(cost, start_costs, order, deadline):
+    """
+    Локальное улучшение до отсутствия выигрыша или до deadline
+    (time.perf_counter). Переходы несимметричны, поэтому для 2-opt
+    развёрнутый отрезок пересчитывается целиком.
+    """
+    order = list(order)
+    n = len(order)
+    if n < 3:
+        return order
+
+    best = route_cost(cost, start_costs, order)
+    improved = True
+    while improved:
+        improved = False
+
+        # 2-opt: разворот отрезка order[i..k]
+        for i in range(n - 1):
+            for k in range(i + 1, n):
+                if time.perf_counter() > deadline:
+                    return order
+                candidate = order[:i] + order[i:k + 1][::-1] + order[k + 1:]
+                c = route_cost(cost, start_costs, candidate)
+                if c < best - 1e-9:
+                    order, best = candidate, c
+                    improved = True
+
+        # or-opt: перенос одного задания в другое место
+        for i in range(n):
+            item = order[i]
+            rest = order[:i] + order[i + 1:]
+            for pos in range(n):
+                if pos == i:
+                    continue
+                if time.perf_counter() > deadline:
+                    return order
+                candidate = rest[:pos] + [item] + rest[pos:]
+                c = route_cost(cost, start_costs, candidate)
+                if c < best - 1e-9:
+                    order, best = candidate, c
+                    improved = True
+                    break
+
+    return order
+
+
+def solve_order(cost, start_costs, initial=None, time_budget_ms=8.0, deadline=None):
+    """
+    Найти почти оптимальный порядок заданий.
+    initial — предыдущий порядок (тёплый старт); задания, которых в нём нет,
+    вставляются в самые дешёвые места. deadline (time.perf_counter), если
+    задан, заменяет time_budget_ms — бюджет отсчитан раньше, у вызывающего.
+    """
+    if deadline is None:
+        deadline = time.perf_counter() + time_budget_ms / 1000.0
+    n = len(start_costs)
+    if initial:
+        known = [i for i in initial if 0 <= i < n]
+        seen = set(known)
+        missing = [i for i in range(n) if i not in seen]
+        order = insert_cheapest(cost, start_costs, known, missing)
+    else:
+        order = nearest_neighbor_order(cost, start_costs)
+    return improve_order(cost, start_costs, order, deadline)
+
+
+# ---------------------------------------------------------------------------
+# 3. Планировщик с перепланированием
+# ---------------------------------------------------------------------------
+
+
+class PickScheduler:
+    """
+    Набор ожидающих заданий и их текущий порядок.
+    add() / remove() меняют набор и матрицу стоимостей (только строку и
+    столбец своего задания), plan() перепланирует с тёплым стартом.
+    """
+
+    def __init__(
+        self,
+        model=None,
+        velocity_scaling_factor=0.1,
+        acceleration_scaling_factor=0.1,
+        time_budget_ms=8.0,
+    ):
+        self.model = model if model is not None else MotionTimeModel()
+        self.velocity_scaling_factor = velocity_scaling_factor
+        self.acceleration_scaling_factor = acceleration_scaling_factor
+        self.time_budget_ms = time_budget_ms
+        self.tasks = []
+        self.last_plan_ms = 0.0
+        self._order_ids = []
+        self._ids = itertools.count(1)
+        self._cost = []  # _cost[i][j] — как в build_costs, для self.tasks
+        self._cost_factors = (velocity_scaling_factor, acceleration_scaling_factor)
+
+    def _move_ms(self, a, b):
+        return self.model.cartesian_move_ms(a, b, self.velocity_scaling_factor, self.acceleration_scaling_factor)
+
+    def add(self, task):
+        """Добавить копию задания (id выдаётся, если его нет). Возвращает id."""
+        if "pick" not in task:
+            raise ValueError("в задании нет ключа 'pick'")
+        task = dict(task)
+        taken = {t["id"] for t in self.tasks}
+        if "id" not in task:
+            # свой id вызывающего может совпасть с "task-N" — такие пропускаем
+            task["id"] = next(tid for tid in (f"task-{n}" for n in self._ids) if tid not in taken)
+        elif task["id"] in taken:
+            raise ValueError(f"задание с id {task['id']!r} уже есть")
+
+        end, pick = _end_point(task), task["pick"]
+        for other, row in zip(self.tasks, self._cost):
+            row.append(self._move_ms(_end_point(other), pick))
+        self._cost.append([self._move_ms(end, other["pick"]) for other in self.tasks] + [0.0])
+        self.tasks.append(task)
+        return task["id"]
+
+    def remove(self, task_id):
+        for index, task in enumerate(self.tasks):
+            if task["id"] == task_id:
+                del self.tasks[index]
+                del self._cost[index]
+                for row in self._cost:
+                    del row[index]
+                return
+
+    def _refresh_costs(self):
+        """Коэффициенты скорости поменяли снаружи — матрицу считаем заново."""
+        factors = (self.velocity_scaling_factor, self.acceleration_scaling_factor)
+        if factors != self._cost_factors:
+            self._cost, _ = build_costs(self.model, self.tasks, None, *factors)
+            self._cost_factors = factors
+
+    def plan(self, start_position=None):
+        """
+        Перепланировать порядок. Возвращает список заданий в новом порядке.
+        Бюджет time_budget_ms отсчитывается от входа сюда; время расчёта
+        сохраняется в last_plan_ms.
+        """
+        t0 = time.perf_counter()
+        deadline = t0 + self.time_budget_ms / 1000.0
+        self._refresh_costs()
+        if start_position is None:
+            start_costs = [0.0] * len(self.tasks)
+        else:
+            start_costs = [self._move_ms(start_position, t["pick"]) for t in self.tasks]
+        index_by_id = {t["id"]: i for i, t in enumerate(self.tasks)}
+        initial = [index_by_id[i] for i in self._order_ids if i in index_by_id]
+        order = solve_order(self._cost, start_costs, initial, deadline=deadline)
+        plan = [self.tasks[i] for i in order]
+        self._order_ids = [t["id"] for t in plan]
+        self.last_plan_ms = (time.perf_counter() - t0) * 1000.0
+        return plan
+
+
+# ---------------------------------------------------------------------------
+# 4. Выполнение плана через обёртки
+# ---------------------------------------------------------------------------
+
+
+def execute_plan(
+    manipulator,
+    plan,
+    on_pick=None,
+    on_place=None,
+    velocity_scaling_factor=0.1,
+    acceleration_scaling_factor=0.1,
+    planner_type=None,
+    timeout_seconds=30.0,
+):
+    """
+    Выполнить план: для каждого задания move_to_coordinates в pick,
+    вызов on_pick(manipulator, task), затем в place и on_place(...).
+    Останавливается на первой ошибке обёртки.
+    Возвращает список id выполненных заданий.
+    """
+    done = []
+    for task in plan:
+        for key, callback in (("pick", on_pick), ("place", on_place)):
+            point = task.get(key)
+            if point is None:
+                continue
+            ox, oy, oz, ow = task.get(f"{key}_orientation") or (0.0, 0.0, 0.0, 1.0)
+            result = medu_move_to_coordinates(
+                manipulator,
+                point[0], point[1], point[2],
+                ox, oy, oz, ow,
+                velocity_scaling_factor=velocity_scaling_factor,
+                acceleration_scaling_factor=acceleration_scaling_factor,
+                planner_type=planner_type,
+                timeout_seconds=timeout_seconds,
+            )
+            if result is None:
+                print(f"[execute_plan] Ошибка на задании {task.get('id')} ({key})")
+                return done
+            if callback is not None:
+                callback(manipulator, task)
+        done.append(task.get("id"))
+    return done
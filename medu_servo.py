@@ -0,0 +1,209 @@
+"""
+medu_servo.py — серво-контроллер, который помнит активный ServoControlType.
+
+Переключение режима — блокирующий запрос к роботу. ServoController
+переключает режим только если он действительно меняется, а единая точка
+входа stream(setpoint) сама выбирает режим и нужную функцию medu_stream_*.
+
+Виды setpoint для stream():
+- TWIST:     {"linear": {"x", "y", "z"}, "angular": {"rx", "ry", "rz"}}
+- POSE:      {"x", "y", "z", "ox", "oy", "oz", "ow"} или 7 чисел
+- JOINT_JOG: {"povorot_osnovaniya", ..., "v_strely"} или 6 чисел
+             (3 угла + 3 скорости)
+
+Если режим мог смениться в обход контроллера (другой скрипт, M Control,
+обычное move_to_*), вызови invalidate() — следующий stream переключит
+режим заново.
+
+stream_paced(send, setpoints, rate_hz) — общий цикл отправки уставок
+с фиксированной частотой (пути, фильтры, look-ahead).
+"""
+
+import threading
+import time
+
+from medu_wrappers import (
+    medu_stream_cartesian_velocities,
+    medu_stream_coordinates,
+    medu_stream_joint_angles,
+)
+
+JOINT_KEYS = (
+    "povorot_osnovaniya",
+    "privod_plecha",
+    "privod_strely",
+    "v_osnovaniya",
+    "v_plecha",
+    "v_strely",
+)
+POSE_KEYS = ("x", "y", "z", "ox", "oy", "oz", "ow")
+
+
+def detect_servo_type(setpoint):
+    """
+    Определить нужный режим по виду setpoint.
+    Бросает ValueError, если вид не распознан.
+    """
+    from sdk.utils.enums import ServoControlType
+
+    if isinstance(setpoint, dict):
+        if "linear" in setpoint and "angular" in setpoint:
+            return ServoControlType.TWIST
+        if all(key in setpoint for key in POSE_KEYS):
+            return ServoControlType.POSE
+        if all(key in setpoint for key in JOINT_KEYS):
+            return ServoControlType.JOINT_JOG
+    elif isinstance(setpoint, (list, tuple)):
+        if len(setpoint) == 7:
+            return ServoControlType.POSE
+        if len(setpoint) == 6:
+            return ServoControlType.JOINT_JOG
+    raise ValueError(f"не удалось определить режим для setpoint: {setpoint!r}")
+
+
+class ServoController:
+    """
+    Обёртка над одним manipulator для стриминга.
+    Все вызовы сериализуются внутренней блокировкой, поэтому смена режима
+    и следующая за ней команда стрима не перемешиваются между потоками.
+    """
+
+    def __init__(self, manipulator):
+        self.manipulator = manipulator
+        self.mode = None  # None — режим неизвестен
+        self.switch_count = 0
+        self.skipped_switches = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Забыть текущий режим (следующий stream переключит заново)."""
+        with self._lock:
+            self.mode = None
+
+    def set_mode(self, servo_type):
+        """
+        Переключить режим, если он отличается от текущего.
+        Возвращает True, если нужный режим активен.
+        """
+        with self._lock:
+            return self._ensure_mode(servo_type)
+
+    def _ensure_mode(self, servo_type):
+        if self.mode == servo_type:
+            self.skipped_switches += 1
+            return True
+        try:
+            if self.manipulator is None:
+                raise ValueError("manipulator == None")
+
+            from sdk.utils.enums import ServoControlType
+
+            if not isinstance(servo_type, ServoControlType):
+                raise TypeError("servo_type должен быть экземпляром ServoControlType")
+
+            # Вызов SDK напрямую: обёртка возвращает None и при ошибке,
+            # и при "пустом" ответе, а здесь нужно знать, что переключение прошло
+            self.manipulator.set_servo_control_type(servo_type)
+            self.mode = servo_type
+            self.switch_count += 1
+            return True
+
+        except Exception as e:
+            self.mode = None
+            print(f"[ServoController.set_mode] Ошибка: {e}")
+            return False
+
+    # --- стриминг ----------------------------------------------------------
+
+    def stream(self, setpoint):
+        """
+        Отправить одну точку стрима, при необходимости переключив режим.
+        Возвращает результат medu_stream_* (у stream_* SDK ответа нет —
+        обычно None) или False, если setpoint не распознан или режим
+        не включился.
+        """
+        try:
+            servo_type = detect_servo_type(setpoint)
+        except Exception as e:
+            print(f"[ServoController.stream] Ошибка: {e}")
+            return False
+
+        from sdk.utils.enums import ServoControlType
+
+        with self._lock:
+            if not self._ensure_mode(servo_type):
+                return False
+
+            if servo_type == ServoControlType.TWIST:
+                return medu_stream_cartesian_velocities(
+                    self.manipulator, setpoint["linear"], setpoint["angular"]
+                )
+
+            if servo_type == ServoControlType.POSE:
+                if isinstance(setpoint, dict):
+                    values = [setpoint[key] for key in POSE_KEYS]
+                else:
+                    values = list(setpoint)
+                return medu_stream_coordinates(self.manipulator, *values)
+
+            if isinstance(setpoint, dict):
+                values = [setpoint[key] for key in JOINT_KEYS]
+            else:
+                values = list(setpoint)
+            return medu_stream_joint_angles(self.manipulator, *values)
+
+    def stream_twist(self, linear_vel, angular_vel):
+        return self.stream({"linear": linear_vel, "angular": angular_vel})
+
+    def stream_pose(self, x, y, z, ox, oy, oz, ow):
+        return self.stream((x, y, z, ox, oy, oz, ow))
+
+    def stream_joints(
+        self,
+        povorot_osnovaniya,
+        privod_plecha,
+        privod_strely,
+        v_osnovaniya=0.0,
+        v_plecha=0.0,
+        v_strely=0.0,
+    ):
+        return self.stream(
+            (
+                povorot_osnovaniya,
+                privod_plecha,
+                privod_strely,
+                v_osnovaniya,
+                v_plecha,
+                v_strely,
+            )
+        )
+
+
+def stream_paced(send, setpoints, rate_hz):
+    """
+    Вызывать send(*setpoint) для каждой уставки с частотой rate_hz
+    (опоздание не накапливается). setpoint None — такт без отправки.
+
+    Ответ stream_* SDK не документирован и может быть None и при успехе,
+    поэтому ошибка — только исключение или явный False от send; на ней
+    цикл останавливается. Возвращает число отправленных уставок.
+    """
+    period = 1.0 / rate_hz
+    sent = 0
+    next_time = time.monotonic()
+    for setpoint in setpoints:
+        if setpoint is not None:
+            try:
+                result = send(*setpoint)
+            except Exception as e:
+                print(f"[stream_paced] Ошибка на уставке {sent}: {e}")
+                break
+            if result is False:
+                print(f"[stream_paced] Ошибка на уставке {sent}")
+                break
+            sent += 1
+        next_time += period
+        delay = next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    return sent
@@ -0,0 +1,36 @@
+"""
+medu_session.py — одна сессия MEdu на несколько потоков.
+
+Потокобезопасность SDK не документирована. LockedSession подставляется
+вместо manipulator и выполняет каждый вызов его методов (и методов
+mgbot_conveyer) под одной блокировкой — вызовы из разных потоков идут
+к сессии по одному, как в medu_daemon / medu_broker. Блокирующий
+move_to_* держит блокировку до конца движения: остальные потоки ждут.
+
+    session = LockedSession(manipulator)
+    threading.Thread(target=medu_write_gpio, args=(session, "LAMP", 1)).start()
+    medu_conveyor_set_speed_motors(session, 40)
+"""
+
+import threading
+
+
+class LockedSession:
+    """manipulator, все вызовы которого идут по одному (общая RLock)."""
+
+    def __init__(self, manipulator, lock=None):
+        self._target = manipulator
+        self.lock = lock if lock is not None else threading.RLock()
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if callable(value):
+            def call(*args, **kwargs):
+                with self.lock:
+                    return value(*args, **kwargs)
+
+            return call
+        if name.startswith("_") or isinstance(value, (int, float, str, bytes, bool, type(None), tuple, list, dict)):
+            return value
+        # вложенный объект SDK (mgbot_conveyer) — под той же блокировкой
+        return LockedSession(value, self.lock)
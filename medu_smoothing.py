@@ -0,0 +1,333 @@
+"""
+medu_smoothing.py — сглаживание уставок перед medu_stream_*.
+
+Онлайн (каждый вызов — O(1), обычные float, без NumPy):
+- OneEuroFilter — адаптивный фильтр шума: при медленном движении сильно
+  сглаживает дрожание, при быстром — почти не добавляет запаздывания;
+- JerkLimiter — следит за целью с ограничением скорости, ускорения и
+  рывка (S-образный профиль), выдаёт и позицию, и скорость;
+- SetpointFilter — цепочка для одного потока уставок: последнее значение
+  удерживается и выдаётся с частотой движка (ресэмплинг), проходит
+  OneEuroFilter -> JerkLimiter, суставы обрезаются до [-3.14, 3.14].
+
+Офлайн (NumPy, весь путь сразу):
+- resample — равномерная сетка времени с частотой движка;
+- smooth_path — сглаживание окном Гаусса;
+- derivatives / slowdown_factor — насколько растянуть путь по времени,
+  чтобы скорость, ускорение и рывок уложились в пределы;
+- prepare_path — всё вместе + обрезка суставов.
+
+    flt = SetpointFilter(kind="joints", rate_hz=50)
+    flt.update([0.1, -0.3, -0.7])      # когда пришла новая уставка
+    servo.stream_joints(*flt.sample()) # на каждом такте движка
+"""
+
+import math
+import time
+
+import numpy as np
+
+from medu_servo import stream_paced
+
+# Пределы суставов — те же, что проверяет medu_move_to_angles
+JOINT_MIN = -3.14
+JOINT_MAX = 3.14
+
+DEFAULT_RATE_HZ = 50.0
+
+
+def clamp_joints(values):
+    """Обрезать углы до [JOINT_MIN, JOINT_MAX] (список или массив)."""
+    if isinstance(values, np.ndarray):
+        return np.clip(values, JOINT_MIN, JOINT_MAX)
+    return [min(JOINT_MAX, max(JOINT_MIN, float(v))) for v in values]
+
+
+# ---------------------------------------------------------------------------
+# 1. Онлайн-фильтры
+# ---------------------------------------------------------------------------
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez и др.) для вектора значений.
+    min_cutoff — частота среза в покое, Гц (меньше — сильнее сглаживание);
+    beta — насколько срез растёт со скоростью (больше — меньше запаздывание).
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.5, d_cutoff=1.0):
+        self.min_cutoff = float(min_cutoff)
+        self.beta = float(beta)
+        self.d_cutoff = float(d_cutoff)
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+
+    def __call__(self, values, dt):
+        if self._x is None or dt <= 0.0:
+            self._x = [float(v) for v in values]
+            self._dx = [0.0] * len(self._x)
+            return list(self._x)
+
+        a_d = _alpha(self.d_cutoff, dt)
+        out = []
+        for i, v in enumerate(values):
+            dx = (float(v) - self._x[i]) / dt
+            self._dx[i] += a_d * (dx - self._dx[i])
+            cutoff = self.min_cutoff + self.beta * abs(self._dx[i])
+            self._x[i] += _alpha(cutoff, dt) * (float(v) - self._x[i])
+            out.append(self._x[i])
+        return out
+
+
+class JerkLimiter:
+    """
+    Следование за целью с ограничениями |v| <= v_max, |a| <= a_max,
+    |j| <= j_max по каждой координате. Скорость к цели выбирается так,
+    чтобы успеть затормозить с учётом времени нарастания торможения,
+    поэтому к цели подходит плавно, без скачков скорости и без перелёта.
+    """
+
+    # Запас времени торможения в долях ramp: ускорение отстаёт от нужного
+    # на время нарастания, и с запасом 1.0 цель перелетает примерно на 1 %
+    BRAKE_LAG = 3.5
+
+    def __init__(self, v_max=1.0, a_max=2.0, j_max=20.0):
+        self.v_max = float(v_max)
+        self.a_max = float(a_max)
+        self.j_max = float(j_max)
+        self.reset()
+
+    def reset(self, position=None):
+        self.position = None if position is None else [float(v) for v in position]
+        self.velocity = None if position is None else [0.0] * len(position)
+        self._accel = None if position is None else [0.0] * len(position)
+
+    def __call__(self, target, dt):
+        if self.position is None:
+            self.reset(target)
+            return list(self.position), list(self.velocity)
+
+        da = self.j_max * dt
+        ramp = self.a_max / self.j_max  # время набора/сброса ускорения
+        for i, goal in enumerate(target):
+            error = float(goal) - self.position[i]
+            # скорость, с которой ещё можно остановиться с учётом того, что
+            # торможение выходит на a_max не сразу, а за ramp секунд
+            a_ramp = self.a_max * ramp * self.BRAKE_LAG
+            v_stop = math.sqrt(a_ramp * a_ramp + 2.0 * self.a_max * abs(error)) - a_ramp
+            v_goal = math.copysign(min(self.v_max, v_stop), error)
+            a_goal = (v_goal - self.velocity[i]) / max(dt, ramp)
+            a_goal = max(-self.a_max, min(self.a_max, a_goal))
+            a = self._accel[i]
+            a += max(-da, min(da, a_goal - a))
+            self._accel[i] = a
+            v = max(-self.v_max, min(self.v_max, self.velocity[i] + a * dt))
+            position = self.position[i] + v * dt
+            if error and (float(goal) - position) * error <= 0.0:
+                # последний шаг к цели: встаём точно в неё, без перелёта
+                position, v = float(goal), 0.0
+                self._accel[i] = 0.0
+            self.velocity[i] = v
+            self.position[i] = position
+        return list(self.position), list(self.velocity)
+
+
+class SetpointFilter:
+    """
+    Один поток уставок: update() — когда пришла новая (с любой частотой),
+    sample() — на каждом такте движка (rate_hz).
+
+    kind="joints": 3 угла -> (3 угла, 3 скорости) для stream_joints;
+    kind="pose": (x, y, z, ox, oy, oz, ow) — фильтруется позиция,
+    кватернион нормируется и передаётся как есть.
+    """
+
+    def __init__(self, kind="joints", rate_hz=DEFAULT_RATE_HZ, one_euro=None, limiter=None):
+        if kind not in ("joints", "pose"):
+            raise ValueError("kind должен быть 'joints' или 'pose'")
+        self.kind = kind
+        self.dt = 1.0 / float(rate_hz)
+        self.one_euro = one_euro if one_euro is not None else OneEuroFilter()
+        if limiter is None:
+            limiter = JerkLimiter(1.0, 2.0, 20.0) if kind == "joints" else JerkLimiter(0.25, 0.5, 5.0)
+        self.limiter = limiter
+        self._target = None
+        self._orientation = (0.0, 0.0, 0.0, 1.0)
+
+    def reset(self, setpoint=None):
+        self.one_euro.reset()
+        self.limiter.reset()
+        self._target = None
+        if setpoint is not None:
+            self.update(setpoint)
+
+    def update(self, setpoint):
+        if self.kind == "joints":
+            self._target = clamp_joints(setpoint[:3])
+            return
+        x, y, z, ox, oy, oz, ow = (float(v) for v in setpoint)
+        norm = math.sqrt(ox * ox + oy * oy + oz * oz + ow * ow)
+        if norm < 1e-9:
+            raise ValueError("нулевой кватернион")
+        self._target = [x, y, z]
+        self._orientation = (ox / norm, oy / norm, oz / norm, ow / norm)
+
+    def sample(self):
+        """Очередная уставка для стрима или None, если целей ещё не было."""
+        if self._target is None:
+            return None
+        filtered = self.one_euro(self._target, self.dt)
+        position, velocity = self.limiter(filtered, self.dt)
+        if self.kind == "joints":
+            position = clamp_joints(position)
+            return tuple(position) + tuple(velocity)
+        return tuple(position) + self._orientation
+
+    def send(self, controller):
+        """sample() и отправка через ServoController. None — нечего/ошибка."""
+        setpoint = self.sample()
+        if setpoint is None:
+            return None
+        if self.kind == "joints":
+            return controller.stream_joints(*setpoint)
+        return controller.stream_pose(*setpoint)
+
+
+# ---------------------------------------------------------------------------
+# 2. Офлайн-обработка путей (NumPy)
+# ---------------------------------------------------------------------------
+
+
+def resample(times, values, rate_hz=DEFAULT_RATE_HZ):
+    """
+    Неравномерные (times, values (N, D)) -> равномерная сетка с шагом
+    1/rate_hz. Линейная интерполяция. Возвращает (new_times, new_values).
+    """
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    dt = 1.0 / float(rate_hz)
+    new_times = np.arange(times[0], times[-1] + 0.5 * dt, dt)
+    index = np.clip(np.searchsorted(times, new_times, side="right") - 1, 0, len(times) - 2)
+    span = times[index + 1] - times[index]
+    w = np.where(span > 0, (new_times - times[index]) / np.where(span > 0, span, 1.0), 0.0)
+    w = np.clip(w, 0.0, 1.0)[:, None]
+    new_values = values[index] * (1.0 - w) + values[index + 1] * w
+    # последний узел сетки может уйти до dt/2 за конец — конец ставим точно
+    new_times[-1] = times[-1]
+    new_values[-1] = values[-1]
+    return new_times, new_values
+
+
+def smooth_path(values, sigma_samples=2.0):
+    """
+    Сглаживание окном Гаусса по времени, values (N,) или (N, D).
+    Концы пути сохраняются точно.
+    """
+    values = np.asarray(values, dtype=float)
+    if sigma_samples <= 0 or len(values) < 3:
+        return values.copy()
+    flat = values.ndim == 1
+    if flat:
+        values = values[:, None]
+    radius = int(math.ceil(3 * sigma_samples))
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma_samples) ** 2)
+    kernel /= kernel.sum()
+    # нечётное отражение относительно концов: у краёв не появляется излома,
+    # но на изогнутом участке конец всё же немного смещается
+    padded = np.pad(values, ((radius, radius), (0, 0)), mode="reflect", reflect_type="odd")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, len(kernel), axis=0)
+    smoothed = windows @ kernel
+    # смещение концов убираем плавной поправкой на длине окна, а не
+    # подстановкой точки — так не появляется скачка скорости
+    n = len(smoothed)
+    span = min(radius, n - 1)
+    fade_start = 0.5 * (1.0 + np.cos(np.pi * np.minimum(np.arange(n) / span, 1.0)))[:, None]
+    fade_end = fade_start[::-1]
+    smoothed += fade_start * (values[0] - smoothed[0]) + fade_end * (values[-1] - smoothed[-1])
+    return smoothed[:, 0] if flat else smoothed
+
+
+def derivatives(values, dt):
+    """Максимумы |v|, |a|, |j| по каждой координате: массив (3, D)."""
+    values = np.asarray(values, dtype=float)
+    v = np.diff(values, axis=0) / dt
+    a = np.diff(v, axis=0) / dt
+    j = np.diff(a, axis=0) / dt
+    return np.array(
+        [
+            np.abs(v).max(axis=0) if len(v) else np.zeros(values.shape[1]),
+            np.abs(a).max(axis=0) if len(a) else np.zeros(values.shape[1]),
+            np.abs(j).max(axis=0) if len(j) else np.zeros(values.shape[1]),
+        ]
+    )
+
+
+def slowdown_factor(values, dt, v_max, a_max, j_max):
+    """
+    Во сколько раз растянуть путь по времени, чтобы уложиться в пределы:
+    скорость падает в k раз, ускорение в k^2, рывок в k^3.
+    """
+    peaks = derivatives(values, dt)
+    return float(
+        max(
+            1.0,
+            (peaks[0] / v_max).max(),
+            np.sqrt(peaks[1] / a_max).max(),
+            np.cbrt(peaks[2] / j_max).max(),
+        )
+    )
+
+
+def prepare_path(times, values, kind="joints", rate_hz=DEFAULT_RATE_HZ, sigma_samples=2.0, limits=None):
+    """
+    Путь для стрима: ресэмплинг -> сглаживание -> растяжение по времени
+    под limits=(v_max, a_max, j_max) -> снова ресэмплинг -> обрезка суставов.
+    Возвращает (times, values) с шагом 1/rate_hz.
+    """
+    times = np.asarray(times, dtype=float)
+    new_times, new_values = resample(times, values, rate_hz)
+    smoothed = smooth_path(new_values, sigma_samples)
+    if limits is not None:
+        k = 1.0
+        # после растяжения путь сглаживается заново и пики немного
+        # меняются — проверяем снова, пока не уложимся (обычно 1-2 раза)
+        for _ in range(8):
+            step = slowdown_factor(smoothed, 1.0 / rate_hz, *limits)
+            if step <= 1.0:
+                break
+            # растягиваем исходный путь и сглаживаем заново, иначе изломы
+            # линейной интерполяции дают скачки ускорения
+            k *= step * 1.001
+            stretched = times[0] + (times - times[0]) * k
+            new_times, new_values = resample(stretched, values, rate_hz)
+            smoothed = smooth_path(new_values, sigma_samples * k)
+    new_values = smoothed
+    if kind == "joints":
+        new_values = clamp_joints(new_values)
+    return new_times, new_values
+
+
+def stream_filtered(controller, setpoint_filter, duration_s, rate_hz=None):
+    """
+    Отправлять уставки setpoint_filter с частотой движка duration_s секунд
+    (пока update() вызывается из другого потока). Возвращает число
+    отправленных уставок (см. medu_servo.stream_paced).
+    """
+    end = time.monotonic() + duration_s
+
+    def ticks():
+        while time.monotonic() < end:
+            yield setpoint_filter.sample()  # None — целей ещё не было
+
+    send = controller.stream_joints if setpoint_filter.kind == "joints" else controller.stream_pose
+    return stream_paced(send, ticks(), 1.0 / setpoint_filter.dt if rate_hz is None else rate_hz)
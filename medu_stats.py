@@ -0,0 +1,17 @@
+"""
+medu_stats.py — общие мелочи для отчётов о задержках.
+
+percentile — без numpy, чтобы им могли пользоваться модули, которые
+импортируются за миллисекунды (medu_estop, medu_teleop, medu_broker).
+"""
+
+
+def percentile(values, q):
+    """
+    Перцентиль q (0..1) по ближайшему рангу; values — любой итерируемый
+    набор чисел (сортируется здесь). None, если значений нет.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
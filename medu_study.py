@@ -0,0 +1,276 @@
+"""
+medu_study.py — перебор параметров задания на цифровом двойнике.
+
+Каждая конфигурация — отдельная смена TwinMEdu (medu_twin.run_shift),
+конфигурации считаются параллельно в пуле процессов (по умолчанию —
+все ядра). Параметры задания:
+
+- belt_speed — скорость ленты для medu_conveyor_set_speed_motors (0..100);
+- velocity / acceleration — коэффициенты для medu_move_to_coordinates;
+- debounce_count / poll_s — сколько подряд срабатываний датчика
+  расстояния считать деталью и как часто его опрашивать.
+
+Параметры двойника (частота деталей, шум датчика, порог срыва детали)
+общие для всех конфигураций — twin_options.
+
+Итог — таблица: детали в час, распределение времени цикла (интервал
+между укладками), доли отказов (пустой захват, уроненные детали,
+деталь не поместилась на ленту). Каждая конфигурация повторяется с
+repeats разными seed; производительность — среднее и разброс.
+
+    configs = grid(belt_speed=[30, 60, 90], velocity=[0.3, 0.6], debounce_count=[1, 3])
+    rows = run_study(configs, hours=2.0, repeats=3, twin_options={"sensor_noise": 0.02})
+    print(format_table(rows))
+
+    python medu_study.py --grid --hours 1 --repeats 2 --csv study.csv
+    python medu_study.py --random 40 --seed 7
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from medu_stats import percentile
+from medu_twin import PartSource, TwinMEdu, pick_and_place, run_shift
+
+DEFAULT_JOB = {
+    "belt_speed": 40,
+    "velocity": 0.5,
+    "acceleration": 0.5,
+    "debounce_count": 1,
+    "poll_s": 0.05,
+}
+
+DEFAULT_GRID = {
+    "belt_speed": [30, 60, 90],
+    "velocity": [0.3, 0.6, 1.0],
+    "acceleration": [0.3, 0.6, 1.0],
+    "debounce_count": [1, 2, 4],
+}
+
+DEFAULT_RANGES = {
+    "belt_speed": (20, 100),
+    "velocity": (0.1, 1.0),
+    "acceleration": (0.1, 1.0),
+    "debounce_count": [1, 2, 3, 4, 5],
+    "poll_s": (0.02, 0.2),
+}
+
+DEFAULT_TWIN = {
+    "interval_s": 4.0,
+    "sensor_noise": 0.02,
+    "slip_acceleration": 0.3,
+}
+
+COLUMNS = [
+    "belt_speed",
+    "velocity",
+    "acceleration",
+    "debounce_count",
+    "poll_s",
+    "parts_per_hour",
+    "pph_min",
+    "pph_max",
+    "interval_p50_s",
+    "interval_p90_s",
+    "missed_rate",
+    "dropped_rate",
+    "blocked_rate",
+]
+
+
+# ---------------------------------------------------------------------------
+# 1. Конфигурации
+# ---------------------------------------------------------------------------
+
+
+def grid(**axes):
+    """Полный перебор: grid(velocity=[0.3, 0.6], belt_speed=[40, 80]) -> 4 конфигурации."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[n] for n in names))]
+
+
+def random_samples(count, seed=None, **ranges):
+    """
+    Случайные конфигурации: (lo, hi) — равномерно (int, если оба int),
+    список — случайный выбор из него.
+    """
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(int(count)):
+        config = {}
+        for name, spec in ranges.items():
+            if isinstance(spec, list):
+                config[name] = rng.choice(spec)
+            elif isinstance(spec[0], int) and isinstance(spec[1], int):
+                config[name] = rng.randint(spec[0], spec[1])
+            else:
+                config[name] = round(rng.uniform(spec[0], spec[1]), 3)
+        configs.append(config)
+    return configs
+
+
+# ---------------------------------------------------------------------------
+# 2. Задание и одна смена (выполняется в процессе пула)
+# ---------------------------------------------------------------------------
+
+
+def study_job(manipulator, deadline, belt_speed=40, velocity=0.5, acceleration=0.5, debounce_count=1, poll_s=0.05,
+              failure_backoff_s=5.0):
+    """
+    example_job из medu_twin с антидребезгом: деталь считается пришедшей
+    после debounce_count подряд срабатываний датчика расстояния.
+    """
+    from medu_wrappers import medu_conveyor_get_sensors_data, medu_conveyor_set_speed_motors
+
+    medu_conveyor_set_speed_motors(manipulator, int(belt_speed))
+    hits = 0
+    while time.monotonic() < deadline:
+        data = medu_conveyor_get_sensors_data(manipulator, as_json=True)
+        hits = hits + 1 if data is not None and data["DistanceSensor"] <= 100 else 0
+        if hits < debounce_count:
+            time.sleep(poll_s)
+            continue
+        hits = 0
+        if not pick_and_place(manipulator, velocity, acceleration):
+            time.sleep(failure_backoff_s)
+
+
+def run_config(task):
+    """
+    Одна смена: task = (config, seed, hours, twin_options).
+    Возвращает словарь с метриками (только простые типы — уходит через pickle).
+    """
+    config, seed, hours, twin_options = task
+    options = dict(twin_options)
+    source = PartSource(interval_s=options.pop("interval_s", 8.0), jitter=options.pop("jitter", 0.5))
+    twin = TwinMEdu(seed=seed, source=source, **options)
+
+    job = partial(study_job, **{**DEFAULT_JOB, **config})
+    report = run_shift(twin, job, hours=hours, modules=[sys.modules[__name__]])
+
+    attempts = report["picked"] + report["missed"]
+    return {
+        "config": config,
+        "seed": seed,
+        "placed": report["placed"],
+        "parts_per_hour": report["parts_per_hour"],
+        "intervals": [b - a for a, b in zip(twin.placed_at, twin.placed_at[1:])],
+        "missed_rate": report["missed"] / attempts if attempts else 0.0,
+        "dropped_rate": report["dropped"] / report["picked"] if report["picked"] else 0.0,
+        "blocked_rate": report["blocked"] / report["spawned"] if report["spawned"] else 0.0,
+        "speedup": report["speedup"],
+    }
+
+
+# ---------------------------------------------------------------------------
+# 3. Прогон и сводка
+# ---------------------------------------------------------------------------
+
+
+def run_study(configs, hours=1.0, repeats=1, twin_options=None, workers=None, seed=0):
+    """
+    Все конфигурации x repeats seed'ов в пуле процессов.
+    Возвращает строки таблицы (по одной на конфигурацию),
+    отсортированные по убыванию parts_per_hour.
+    """
+    twin_options = dict(DEFAULT_TWIN if twin_options is None else twin_options)
+    tasks = [
+        (config, seed + r, hours, twin_options)
+        for config in configs
+        for r in range(int(repeats))
+    ]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run_config, tasks, chunksize=chunksize))
+
+    rows = []
+    for i, config in enumerate(configs):
+        runs = results[i * repeats:(i + 1) * repeats]
+        pph = [r["parts_per_hour"] for r in runs]
+        intervals = list(itertools.chain.from_iterable(r["intervals"] for r in runs))
+        row = {**DEFAULT_JOB, **config}
+        row.update(
+            parts_per_hour=sum(pph) / len(pph),
+            pph_min=min(pph),
+            pph_max=max(pph),
+            interval_p50_s=percentile(intervals, 0.5),
+            interval_p90_s=percentile(intervals, 0.9),
+            interval_max_s=percentile(intervals, 1.0),
+            missed_rate=sum(r["missed_rate"] for r in runs) / len(runs),
+            dropped_rate=sum(r["dropped_rate"] for r in runs) / len(runs),
+            blocked_rate=sum(r["blocked_rate"] for r in runs) / len(runs),
+            speedup=min(r["speedup"] for r in runs),
+        )
+        rows.append(row)
+    rows.sort(key=lambda row: -row["parts_per_hour"])
+    return rows
+
+
+def format_table(rows, columns=None):
+    columns = columns or COLUMNS
+
+    def cell(value):
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:.3f}" if abs(value) < 10 else f"{value:.1f}"
+        return str(value)
+
+    cells = [[cell(row.get(c)) for c in columns] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in cells]) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    lines += ["  ".join(v.rjust(w) for v, w in zip(r, widths)) for r in cells]
+    return "\n".join(lines)
+
+
+def save_csv(rows, path):
+    columns = list(rows[0]) if rows else COLUMNS
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Перебор параметров задания на цифровом двойнике MEdu")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--grid", action="store_true", help="полный перебор DEFAULT_GRID (по умолчанию)")
+    mode.add_argument("--random", type=int, metavar="N", help="N случайных конфигураций из DEFAULT_RANGES")
+    parser.add_argument("--hours", type=float, default=1.0, help="длина смены, ч виртуального времени")
+    parser.add_argument("--repeats", type=int, default=1, help="повторов с разными seed")
+    parser.add_argument("--workers", type=int, help="процессов (по умолчанию — все ядра)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--interval", type=float, default=DEFAULT_TWIN["interval_s"], help="средний интервал деталей, с")
+    parser.add_argument("--noise", type=float, default=DEFAULT_TWIN["sensor_noise"], help="вероятность ложного показания датчика")
+    parser.add_argument("--top", type=int, default=20, help="сколько строк показать")
+    parser.add_argument("--csv", help="сохранить все строки в CSV")
+    args = parser.parse_args()
+
+    if args.random:
+        configs = random_samples(args.random, args.seed, **DEFAULT_RANGES)
+    else:
+        configs = grid(**DEFAULT_GRID)
+    twin_options = {**DEFAULT_TWIN, "interval_s": args.interval, "sensor_noise": args.noise}
+
+    t0 = time.perf_counter()
+    rows = run_study(configs, args.hours, args.repeats, twin_options, args.workers, args.seed)
+    wall = time.perf_counter() - t0
+
+    print(format_table(rows[: args.top]))
+    shifts = len(configs) * args.repeats
+    print(f"\n{shifts} смен по {args.hours} ч за {wall:.1f} с ({args.workers or os.cpu_count()} процессов)")
+    if args.csv:
+        save_csv(rows, args.csv)
+        print(f"Сохранено: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
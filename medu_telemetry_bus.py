@@ -0,0 +1,362 @@
+"""
+medu_telemetry_bus.py — одна сессия телеметрии на всех локальных читателей.
+
+HMI, логгер, зрение и монитор безопасности раньше каждый открывали свою
+сессию и сами опрашивали medu_get_joint_state / medu_conveyor_get_sensors_data.
+Теперь опрашивает один процесс-публикатор, а последнее состояние лежит в
+блоке multiprocessing.shared_memory:
+
+    [seq: u64][magic: u64][поля: float64 x N_FIELDS]
+
+Запись защищена seqlock: публикатор делает seq нечётным, пишет поля
+одним копированием из заранее подготовленного array, делает seq чётным.
+Читатель берёт seq, копирует поля, сверяет seq — если совпал и чётный,
+снимок целостный, иначе повторяет. Читатель ничего не блокирует и
+публикатора не тормозит; N читателей = один поток запросов к роботу.
+
+- TelemetryPublisher(manipulator) — создаёт блок, опрашивает робота
+  с частотой rate_hz (датчики ленты — каждые sensor_every циклов);
+- TelemetryReader() — подключается к блоку по имени:
+  read() — целостный снимок (dict в формате ответов SDK),
+  get(field) — одно поле прямо из памяти (8 байт читаются атомарно),
+  wait_newer(seq) — ждать следующей публикации,
+  age() — сколько секунд назад была последняя публикация.
+
+    python medu_telemetry_bus.py --host 10.5.0.2 --rate 50
+
+    reader = TelemetryReader()
+    snapshot = reader.read()
+    print(snapshot["joints"], snapshot["sensors"]["DistanceSensor"])
+
+Ограничения: писатель один. Порядок записей в памяти обеспечивается
+x86 (и GIL внутри процесса публикатора); на слабо упорядоченных CPU
+(ARM) защиту даёт только повторная проверка seq — снимок с seq,
+изменившимся во время чтения, всё равно отбрасывается.
+"""
+
+import argparse
+import os
+import time
+from array import array
+from collections import deque
+from multiprocessing import shared_memory
+
+from medu_stats import percentile
+from medu_wait import joint_values
+from medu_wrappers import medu_conveyor_get_sensors_data, medu_get_joint_state
+
+DEFAULT_NAME = "medu_telemetry"
+MAGIC = 0x4D45445554454C31  # "MEDUTEL1"
+
+MAX_JOINT_VALUES = 12
+
+# Поля (float64) по порядку
+FIELDS = (
+    ["time", "joint_time", "sensor_time", "joint_count"]
+    + [f"joint{i}" for i in range(MAX_JOINT_VALUES)]
+    + ["distance", "color_r", "color_g", "color_b", "color_prox", "prox", "published", "errors"]
+)
+N_FIELDS = len(FIELDS)
+INDEX = {name: i for i, name in enumerate(FIELDS)}
+HEADER_BYTES = 16
+BLOCK_BYTES = HEADER_BYTES + 8 * N_FIELDS
+
+_OWNED = set()  # блоки, созданные публикатором в этом процессе
+
+
+def _attach(name):
+    """
+    Подключиться к существующему блоку без учёта в resource_tracker:
+    иначе при выходе читателя (Python < 3.13) блок удаляется вместе
+    с данными публикатора.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if name in _OWNED:
+            return shm  # публикатор в этом же процессе — его учёт не трогаем
+        try:
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+class _Block:
+    """Разметка блока: seq/magic — u64, поля — float64 (представления без копий)."""
+
+    def __init__(self, shm):
+        self.shm = shm
+        self.header = shm.buf[:HEADER_BYTES].cast("Q")
+        self.fields = shm.buf[HEADER_BYTES:BLOCK_BYTES].cast("d")
+
+    def release(self):
+        self.header.release()
+        self.fields.release()
+
+
+# ---------------------------------------------------------------------------
+# 1. Публикатор
+# ---------------------------------------------------------------------------
+
+
+class TelemetryPublisher:
+    """Единственный писатель блока: опрос робота и публикация снимков."""
+
+    def __init__(self, manipulator, name=DEFAULT_NAME, rate_hz=50.0, sensor_every=5):
+        self.manipulator = manipulator
+        self.name = name
+        self.period = 1.0 / float(rate_hz)
+        self.sensor_every = max(1, int(sensor_every))
+
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=BLOCK_BYTES)
+        except FileExistsError:
+            # остался от упавшего публикатора — переиспользуем
+            shm = shared_memory.SharedMemory(name=name)
+        _OWNED.add(name)
+        self._block = _Block(shm)
+        self._block.header[0] = 0
+        self._block.header[1] = MAGIC
+        self._values = array("d", [0.0] * N_FIELDS)  # готовим снимок здесь, публикуем одним копированием
+        self._running = False
+        self.cycles = 0
+        self.errors = 0
+        self.publish_us = deque(maxlen=1000)  # последние публикации
+
+    # --- запись --------------------------------------------------------------
+
+    def publish(self):
+        """Скопировать _values в блок под seqlock."""
+        t0 = time.perf_counter()
+        header = self._block.header
+        seq = header[0]
+        header[0] = seq + 1  # нечётный: идёт запись
+        self._block.fields[:] = self._values
+        header[0] = seq + 2
+        self.publish_us.append((time.perf_counter() - t0) * 1e6)
+
+    def update_joints(self, state):
+        values = joint_values(state)
+        if not values:
+            self.errors += 1
+            return False
+        v = self._values
+        count = min(len(values), MAX_JOINT_VALUES)
+        base = INDEX["joint0"]
+        for i in range(count):
+            v[base + i] = values[i]
+        v[INDEX["joint_count"]] = count
+        v[INDEX["joint_time"]] = time.time()
+        return True
+
+    def update_sensors(self, data):
+        if not isinstance(data, dict):
+            self.errors += 1
+            return False
+        v = self._values
+        color = data.get("ColorSensor") or {}
+        v[INDEX["distance"]] = float(data.get("DistanceSensor", 0.0))
+        v[INDEX["color_r"]] = float(color.get("R", 0.0))
+        v[INDEX["color_g"]] = float(color.get("G", 0.0))
+        v[INDEX["color_b"]] = float(color.get("B", 0.0))
+        v[INDEX["color_prox"]] = float(color.get("Prox", 0.0))
+        v[INDEX["prox"]] = float(data.get("Prox", 0.0))
+        v[INDEX["sensor_time"]] = time.time()
+        return True
+
+    def poll_once(self):
+        """Один цикл: суставы (+ датчики каждые sensor_every) -> публикация."""
+        self.update_joints(medu_get_joint_state(self.manipulator))
+        if self.cycles % self.sensor_every == 0:
+            self.update_sensors(medu_conveyor_get_sensors_data(self.manipulator, as_json=True))
+        self.cycles += 1
+        v = self._values
+        v[INDEX["time"]] = time.time()
+        v[INDEX["published"]] = self.cycles
+        v[INDEX["errors"]] = self.errors
+        self.publish()
+
+    # --- цикл ----------------------------------------------------------------
+
+    def run(self, duration_s=None):
+        """Публиковать с частотой rate_hz до stop() или duration_s."""
+        self._running = True
+        next_time = time.monotonic()
+        end = None if duration_s is None else next_time + duration_s
+        while self._running and (end is None or next_time < end):
+            self.poll_once()
+            next_time += self.period
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.monotonic()  # не догоняем пропущенные циклы
+
+    def stop(self):
+        self._running = False
+
+    def close(self, unlink=True):
+        self._block.release()
+        self._block.shm.close()
+        if unlink:
+            try:
+                self._block.shm.unlink()
+            except FileNotFoundError:
+                pass
+            _OWNED.discard(self.name)
+
+    def report(self):
+        return {
+            "cycles": self.cycles,
+            "errors": self.errors,
+            "publish_p50_us": percentile(self.publish_us, 0.5),
+            "publish_max_us": percentile(self.publish_us, 1.0),
+        }
+
+
+# ---------------------------------------------------------------------------
+# 2. Читатель
+# ---------------------------------------------------------------------------
+
+
+class TelemetryReader:
+    """Читатель блока; создавать можно в любом числе процессов."""
+
+    def __init__(self, name=DEFAULT_NAME, max_retries=1000):
+        self._block = _Block(_attach(name))
+        if self._block.header[1] != MAGIC:
+            self.close()
+            raise ValueError(f"блок {name!r} — не телеметрия MEdu")
+        self.max_retries = int(max_retries)
+        self.retries = 0
+
+    @property
+    def seq(self):
+        return self._block.header[0]
+
+    def get(self, field):
+        """Одно поле прямо из общей памяти (без seqlock: 8 байт читаются целиком)."""
+        return self._block.fields[INDEX[field]]
+
+    def read_raw(self):
+        """(seq, список полей) — целостный снимок или None, если публикатор не отпускает."""
+        header = self._block.header
+        fields = self._block.fields
+        for _ in range(self.max_retries):
+            seq = header[0]
+            if seq & 1:
+                self.retries += 1
+                continue
+            values = fields.tolist()
+            if header[0] == seq:
+                return seq, values
+            self.retries += 1
+        return None
+
+    def read(self):
+        """Снимок в формате ответов SDK или None (нет публикаций / не удалось)."""
+        raw = self.read_raw()
+        if raw is None or raw[0] == 0:
+            return None
+        seq, v = raw
+        count = int(v[INDEX["joint_count"]])
+        base = INDEX["joint0"]
+        return {
+            "seq": seq,
+            "time": v[INDEX["time"]],
+            "joint_time": v[INDEX["joint_time"]],
+            "sensor_time": v[INDEX["sensor_time"]],
+            "joints": v[base:base + count],
+            "sensors": {
+                "DistanceSensor": v[INDEX["distance"]],
+                "ColorSensor": {
+                    "R": v[INDEX["color_r"]],
+                    "G": v[INDEX["color_g"]],
+                    "B": v[INDEX["color_b"]],
+                    "Prox": v[INDEX["color_prox"]],
+                },
+                "Prox": v[INDEX["prox"]],
+            },
+            "published": int(v[INDEX["published"]]),
+            "errors": int(v[INDEX["errors"]]),
+        }
+
+    def age(self):
+        """Секунд с последней публикации (inf, если их не было)."""
+        published = self.get("time")
+        return time.time() - published if published else float("inf")
+
+    def wait_newer(self, seq, timeout=1.0, interval=0.001):
+        """Ждать публикации новее seq; снимок или None по таймауту."""
+        deadline = time.monotonic() + timeout
+        while self.seq <= seq:
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(interval)
+        return self.read()
+
+    def close(self):
+        self._block.release()
+        self._block.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# 3. Процесс-публикатор
+# ---------------------------------------------------------------------------
+
+
+def connect_readonly(host, client_id, login, password):
+    """
+    Сессия только для чтения: connect без get_control, чтобы публикатор
+    не отбирал управление у рабочего скрипта. SDK напрямую — medu_connect
+    всегда захватывает управление.
+    """
+    try:
+        from sdk.manipulators.medu import MEdu
+
+        manipulator = MEdu(host, client_id, login, password)
+        manipulator.connect()
+        return manipulator
+    except Exception as e:
+        print(f"[connect_readonly] Ошибка подключения: {e}")
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Публикатор телеметрии MEdu в общую память")
+    parser.add_argument("--host", default=os.environ.get("MEDU_HOST", ""))
+    parser.add_argument("--client-id", default=os.environ.get("MEDU_CLIENT_ID", "medu-telemetry"))
+    parser.add_argument("--login", default=os.environ.get("MEDU_LOGIN", ""))
+    parser.add_argument("--password", default=os.environ.get("MEDU_PASSWORD", ""))
+    parser.add_argument("--name", default=DEFAULT_NAME, help="имя блока shared_memory")
+    parser.add_argument("--rate", type=float, default=50.0, help="частота опроса суставов, Гц")
+    parser.add_argument("--sensor-every", type=int, default=5, help="датчики ленты — раз в N циклов")
+    args = parser.parse_args()
+
+    manipulator = connect_readonly(args.host, args.client_id, args.login, args.password)
+    if manipulator is None:
+        return
+    publisher = TelemetryPublisher(manipulator, args.name, args.rate, args.sensor_every)
+    print(f"Публикация в {args.name!r} ({BLOCK_BYTES} байт), {args.rate} Гц. Ctrl+C — выход.")
+    try:
+        publisher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(publisher.report())
+        publisher.close()
+        manipulator.disconnect()
+
+
+if __name__ == "__main__":
+    main()
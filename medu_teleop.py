@@ -0,0 +1,297 @@
+"""
+medu_teleop.py — ручное управление (jog/teleop) скоростями через UDP на localhost.
+
+Протокол: один UDP-пакет = один JSON-объект со скоростями (м/с, рад/с):
+
+    {"x": 0.02, "y": 0.0, "z": 0.0, "rx": 0.0, "ry": 0.0, "rz": 0.1, "t": 1700000000.123}
+
+"t" (time.time() отправителя) необязателен — по нему считается полная
+задержка от ввода до команды. Отсутствующие оси считаются нулём.
+Геймпад или UI отправляет пакеты, например, через send_velocity().
+
+Сервер:
+- ограничивает скорости (max_linear / max_angular);
+- сглаживает их (экспоненциальное среднее) и ограничивает изменение
+  за такт (max_linear_accel / max_angular_accel);
+- стримит через ServoController (TWIST) с фиксированной частотой rate_hz;
+- если ввода нет дольше deadman_timeout — отправляет нулевую скорость,
+  затем medu_stop_movement, и ждёт нового ввода;
+- замеряет задержку ввод -> команда (latency_report()).
+"""
+
+import json
+import math
+import socket
+import threading
+import time
+from collections import deque
+
+from medu_servo import ServoController
+from medu_stats import percentile
+from medu_wrappers import medu_connect, medu_stop_movement
+
+LINEAR_AXES = ("x", "y", "z")
+ANGULAR_AXES = ("rx", "ry", "rz")
+LATENCY_WINDOW = 1000
+
+
+def send_velocity(x=0.0, y=0.0, z=0.0, rx=0.0, ry=0.0, rz=0.0, host="127.0.0.1", port=5005, sock=None):
+    """Отправить одну команду скорости серверу (для UI/геймпада и проверки)."""
+    payload = json.dumps(
+        {"x": x, "y": y, "z": z, "rx": rx, "ry": ry, "rz": rz, "t": time.time()}
+    ).encode("utf-8")
+    own = sock is None
+    if own:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.sendto(payload, (host, port))
+    finally:
+        if own:
+            sock.close()
+
+
+class TeleopServer:
+    """
+    UDP-приёмник команд скорости + цикл стриминга с фиксированной частотой.
+    start() запускает два потока, stop() их останавливает и тормозит робота.
+    """
+
+    def __init__(
+        self,
+        manipulator,
+        host="127.0.0.1",
+        port=5005,
+        rate_hz=50.0,
+        max_linear=0.05,
+        max_angular=0.3,
+        max_linear_accel=0.2,
+        max_angular_accel=1.0,
+        smoothing=0.5,
+        deadman_timeout=0.3,
+    ):
+        if not 0.0 < smoothing <= 1.0:
+            raise ValueError("smoothing должен быть в диапазоне (0.0, 1.0]")
+        if rate_hz <= 0:
+            raise ValueError("rate_hz должен быть > 0")
+
+        self.manipulator = manipulator
+        self.servo = ServoController(manipulator)
+        self.host = host
+        self.port = port
+        self.period = 1.0 / float(rate_hz)
+        self.max_linear = float(max_linear)
+        self.max_angular = float(max_angular)
+        self.max_linear_accel = float(max_linear_accel)
+        self.max_angular_accel = float(max_angular_accel)
+        self.smoothing = float(smoothing)
+        self.deadman_timeout = float(deadman_timeout)
+
+        self._lock = threading.Lock()
+        self._target = dict.fromkeys(LINEAR_AXES + ANGULAR_AXES, 0.0)
+        self._command = dict.fromkeys(LINEAR_AXES + ANGULAR_AXES, 0.0)
+        self._last_input = None     # monotonic времени последнего пакета
+        self._input_seq = 0
+        self._pending = None        # (seq, recv_monotonic, sender_time) ещё не отправленного ввода
+        self._stopped = True        # робот остановлен по dead-man
+        self._running = False
+        self._sock = None
+        self._threads = []
+
+        # Замеры задержки, мс (последние LATENCY_WINDOW)
+        self.recv_to_send_ms = deque(maxlen=LATENCY_WINDOW)
+        self.input_to_send_ms = deque(maxlen=LATENCY_WINDOW)
+        self.late_ticks = 0
+        self.deadman_trips = 0
+
+    # --- запуск / остановка -----------------------------------------------
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((self.host, self.port))
+        self._sock.settimeout(0.1)
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._receive_loop, name="teleop-recv", daemon=True),
+            threading.Thread(target=self._stream_loop, name="teleop-stream", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._running = False
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if not self._stopped:
+            self._halt()
+
+    # --- приём ввода -------------------------------------------------------
+
+    def _receive_loop(self):
+        while self._running:
+            try:
+                data, _ = self._sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            recv_time = time.monotonic()
+            try:
+                message = json.loads(data.decode("utf-8"))
+                target = {}
+                for axis in LINEAR_AXES:
+                    target[axis] = self._clamp(self._finite(message.get(axis, 0.0), axis), self.max_linear)
+                for axis in ANGULAR_AXES:
+                    target[axis] = self._clamp(self._finite(message.get(axis, 0.0), axis), self.max_angular)
+                sender_time = message.get("t")
+            except (ValueError, TypeError, AttributeError) as e:
+                print(f"[TeleopServer] Некорректный пакет: {e}")
+                continue
+
+            with self._lock:
+                self._target = target
+                self._last_input = recv_time
+                self._input_seq += 1
+                if self._pending is None:
+                    self._pending = (self._input_seq, recv_time, sender_time)
+
+    @staticmethod
+    def _finite(value, axis):
+        # NaN / Infinity из JSON после _clamp стали бы полной скоростью
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError(f"{axis} = {value}")
+        return value
+
+    @staticmethod
+    def _clamp(value, limit):
+        return max(-limit, min(limit, value))
+
+    # --- цикл стриминга ----------------------------------------------------
+
+    def _stream_loop(self):
+        next_tick = time.monotonic()
+        while self._running:
+            now = time.monotonic()
+            with self._lock:
+                last_input = self._last_input
+                target = dict(self._target)
+                pending = self._pending
+                self._pending = None
+
+            alive = last_input is not None and now - last_input <= self.deadman_timeout
+
+            if not alive:
+                if not self._stopped:
+                    self.deadman_trips += 1
+                    self._halt()
+            else:
+                if self._stopped:
+                    # После stop_movement серво-режим мог сброситься
+                    self.servo.invalidate()
+                    self._stopped = False
+                self._update_command(target)
+                self.servo.stream_twist(
+                    {axis: self._command[axis] for axis in LINEAR_AXES},
+                    {axis: self._command[axis] for axis in ANGULAR_AXES},
+                )
+                if pending is not None:
+                    self.recv_to_send_ms.append((time.monotonic() - pending[1]) * 1000.0)
+                    if isinstance(pending[2], (int, float)) and math.isfinite(pending[2]):
+                        self.input_to_send_ms.append((time.time() - pending[2]) * 1000.0)
+
+            next_tick += self.period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Не успели в такт — не пытаемся "догонять" пачкой команд
+                self.late_ticks += 1
+                next_tick = time.monotonic()
+
+    def _update_command(self, target):
+        """Сглаживание + ограничение изменения скорости за один такт."""
+        for axes, max_accel in (
+            (LINEAR_AXES, self.max_linear_accel),
+            (ANGULAR_AXES, self.max_angular_accel),
+        ):
+            max_step = max_accel * self.period
+            for axis in axes:
+                current = self._command[axis]
+                wanted = current + self.smoothing * (target[axis] - current)
+                # Экспонента никогда не доходит до цели — добиваем остаток
+                if abs(target[axis] - wanted) < 1e-4:
+                    wanted = target[axis]
+                self._command[axis] = current + self._clamp(wanted - current, max_step)
+
+    def _halt(self):
+        """Нулевая скорость, затем остановка движения."""
+        for axis in self._command:
+            self._command[axis] = 0.0
+        self.servo.stream_twist(
+            {axis: 0.0 for axis in LINEAR_AXES},
+            {axis: 0.0 for axis in ANGULAR_AXES},
+        )
+        medu_stop_movement(self.manipulator)
+        self._stopped = True
+
+    # --- отчёт -------------------------------------------------------------
+
+    def latency_report(self):
+        """
+        Задержки в мс по последним LATENCY_WINDOW командам: recv_to_send —
+        от приёма пакета до отправки команды, input_to_send — от отметки
+        "t" отправителя до отправки команды.
+        """
+        report = {
+            "late_ticks": self.late_ticks,
+            "deadman_trips": self.deadman_trips,
+        }
+        for name, values in (
+            ("recv_to_send", self.recv_to_send_ms),
+            ("input_to_send", self.input_to_send_ms),
+        ):
+            values = list(values)  # снимок: поток стрима дописывает дальше
+            report[name] = {
+                "count": len(values),
+                "p50_ms": percentile(values, 0.5),
+                "p95_ms": percentile(values, 0.95),
+                "max_ms": max(values) if values else None,
+            }
+        return report
+
+
+# ------------ пример запуска ------------
+
+HOST = "192.168.0.183"
+CLIENT_ID = "teleop"
+LOGIN = "13"
+PASSWORD = "14"
+
+
+def main() -> None:
+    manipulator = medu_connect(HOST, CLIENT_ID, LOGIN, PASSWORD)
+    if manipulator is None:
+        print("❌ Не удалось подключиться к MEdu")
+        return
+
+    server = TeleopServer(manipulator)
+    server.start()
+    print(f"✅ Teleop слушает udp://{server.host}:{server.port}, Ctrl+C — выход")
+    try:
+        while True:
+            time.sleep(5.0)
+            print("latency:", server.latency_report())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print("итог:", server.latency_report())
+        manipulator.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+medu_tool.py — насадка и гриппер с запоминанием состояния.
+
+ToolController помнит питание насадки, поворот и уровень захвата:
+- повторная команда с тем же значением не отправляется;
+- вместо фиксированных time.sleep ждёт "время установки" каждого
+  действия (power / rotation / grip), причём только оставшуюся часть:
+  если с момента команды уже прошло время (рука ехала), ждать не нужно;
+- время установки уточняется по факту (скользящее среднее, EWMA), если
+  задана функция подтверждения confirm (датчик вакуума, GPIO, камера)
+  или результат передан в observe();
+- approach() с overlap=True запускает гриппер ДО окончания подхода: за
+  время установки до расчётного конца движения (по MotionTimeModel), так
+  что к приезду гриппер уже готов. Для этого manage_gripper уходит из
+  второго потока, пока move_to_* блокирует первый, — одновременные
+  вызовы одной сессии, а потокобезопасность SDK не документирована.
+  Поэтому по умолчанию (overlap=False) команда гриппера уходит сразу
+  после движения; overlap=True — только если SDK это проверенно
+  допускает.
+
+    tool = ToolController(manipulator)
+    tool.set(rotation=20, grip=0)            # питание включится само
+    tool.approach(model, {"type": "coordinates", "position": [0.3, 0.0, 0.12]}, grip=0)
+    tool.set(grip=10)                        # захват
+"""
+
+import threading
+import time
+
+from medu_motion_time import execute_step
+from medu_wait import wait_until
+from medu_wrappers import medu_manage_gripper, medu_nozzle_power
+
+# Стартовые оценки времени установки, с (как паузы в test_manage_gripper)
+DEFAULT_SETTLE = {"power": 0.5, "rotation": 1.0, "grip": 1.0}
+
+
+class ToolController:
+    """Состояние насадки одного manipulator."""
+
+    def __init__(self, manipulator, settle=None, confirm=None, alpha=0.3, auto_power=True, overlap=False):
+        """
+        settle  — стартовые времена установки {"power"/"rotation"/"grip": с};
+        confirm — {вид: функция без аргументов -> bool}, признак, что
+                  действие завершено (тогда время установки измеряется);
+        alpha   — вес нового измерения в EWMA;
+        overlap — approach() шлёт гриппер во время движения (см. выше).
+        """
+        self.manipulator = manipulator
+        self.settle = dict(DEFAULT_SETTLE)
+        self.settle.update(settle or {})
+        self.confirm = dict(confirm or {})
+        self.alpha = alpha
+        self.auto_power = auto_power
+        self.overlap = overlap
+
+        self.power_on = None  # None — неизвестно
+        self.rotation = None
+        self.grip = None
+        self.sent = 0
+        self.skipped = 0
+
+        self._ready_at = {}  # вид -> когда действие должно завершиться
+        self._started_at = {}
+        self._lock = threading.RLock()
+
+    def invalidate(self):
+        """Забыть состояние (после перезапуска насадки, ручного вмешательства)."""
+        with self._lock:
+            self.power_on = None
+            self.rotation = None
+            self.grip = None
+
+    # --- время установки ---------------------------------------------------
+
+    def observe(self, kind, seconds):
+        """Учесть измеренное время установки действия kind."""
+        with self._lock:
+            self.settle[kind] = (1.0 - self.alpha) * self.settle[kind] + self.alpha * float(seconds)
+
+    def _started(self, kind):
+        now = time.monotonic()
+        with self._lock:
+            self._started_at[kind] = now
+            self._ready_at[kind] = now + self.settle[kind]
+
+    def wait(self, kinds=None, timeout_factor=3.0):
+        """
+        Дождаться завершения отправленных действий. Ждётся только остаток
+        времени установки; с confirm — до подтверждения (и время
+        установки уточняется). Возвращает False, если подтверждение
+        не пришло за timeout_factor * оценку.
+        """
+        ok = True
+        with self._lock:
+            kinds = list(kinds or self._ready_at)
+        for kind in kinds:
+            # забираем под блокировкой, ждём без неё
+            with self._lock:
+                ready_at = self._ready_at.pop(kind, None)
+                if ready_at is None:
+                    continue
+                started = self._started_at.pop(kind)
+                limit = timeout_factor * self.settle[kind]
+            check = self.confirm.get(kind)
+            if check is None:
+                delay = ready_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                continue
+            timeout = limit - (time.monotonic() - started)
+            if wait_until(check, timeout=max(timeout, 0.0), interval=0.01):
+                self.observe(kind, time.monotonic() - started)
+            else:
+                print(f"[ToolController] Нет подтверждения '{kind}'")
+                ok = False
+        return ok
+
+    # --- команды -----------------------------------------------------------
+
+    def power(self, on, wait=True):
+        """Включить/выключить питание насадки (без повторной отправки)."""
+        with self._lock:
+            if self.power_on == on:
+                self.skipped += 1
+                return True
+            if medu_nozzle_power(self.manipulator, bool(on)) is None:
+                self.power_on = None
+                return False
+            self.power_on = bool(on)
+            self.sent += 1
+            self._started("power")
+        if wait:
+            self.wait(["power"])
+        return True
+
+    def set(self, rotation=None, grip=None, wait=True):
+        """
+        Задать поворот и/или захват. Не изменившиеся значения не
+        отправляются; если отправлять нечего — команды нет вовсе.
+        """
+        with self._lock:
+            if rotation is not None and rotation == self.rotation:
+                rotation = None
+            if grip is not None and grip == self.grip:
+                grip = None
+            if rotation is None and grip is None:
+                self.skipped += 1
+                return True
+
+            if self.auto_power and not self.power_on:
+                if not self.power(True, wait=False):
+                    return False
+                self.wait(["power"])  # гриппер без питания команду не выполнит
+
+            if medu_manage_gripper(self.manipulator, rotation=rotation, gripper=grip) is None:
+                self.rotation = None
+                self.grip = None
+                return False
+            self.sent += 1
+            kinds = []
+            if rotation is not None:
+                self.rotation = rotation
+                self._started("rotation")
+                kinds.append("rotation")
+            if grip is not None:
+                self.grip = grip
+                self._started("grip")
+                kinds.append("grip")
+        if wait:
+            self.wait(kinds)
+        return True
+
+    # --- действие во время подхода -----------------------------------------
+
+    def lead_time(self, rotation=None, grip=None):
+        """За сколько секунд до конца движения начинать действие."""
+        with self._lock:
+            return self._lead_time(rotation, grip)
+
+    def _lead_time(self, rotation, grip):
+        kinds = []
+        if rotation is not None and rotation != self.rotation:
+            kinds.append("rotation")
+        if grip is not None and grip != self.grip:
+            kinds.append("grip")
+        if kinds and self.auto_power and not self.power_on:
+            return self.settle["power"] + max(self.settle[k] for k in kinds)
+        return max((self.settle[k] for k in kinds), default=0.0)
+
+    def approach(self, model, step, rotation=None, grip=None, joints=None, position=None):
+        """
+        Выполнить шаг движения (формат medu_motion_time) и отправить
+        rotation/grip так, чтобы они завершились к концу движения.
+        Время движения — model.predict_step (joints/position — состояние
+        перед шагом, если известно). Без overlap команда уходит после
+        движения — вызовы сессии идут по одному. Возвращает результат
+        движения.
+        """
+        if not self.overlap:
+            result = execute_step(self.manipulator, step)
+            if result is not None:
+                self.set(rotation=rotation, grip=grip)
+            return result
+
+        predicted_s = model.predict_step(step, joints, position)[0] / 1000.0
+        fire_after = max(0.0, predicted_s - self.lead_time(rotation, grip))
+        motion_done = threading.Event()
+        cancelled = threading.Event()
+
+        def fire():
+            # по расписанию или сразу, если движение закончилось раньше прогноза
+            motion_done.wait(fire_after)
+            if not cancelled.is_set():
+                self.set(rotation=rotation, grip=grip, wait=False)
+
+        actuator = threading.Thread(target=fire, name="tool-approach", daemon=True)
+        actuator.start()
+        try:
+            result = execute_step(self.manipulator, step)
+        except Exception:
+            result = None
+            raise
+        finally:
+            if result is None:
+                cancelled.set()  # движение не удалось — гриппер не трогаем
+            motion_done.set()
+            actuator.join()
+        if result is not None:
+            self.wait()
+        return result
@@ -0,0 +1,792 @@
+"""
+medu_twin.py — цифровой двойник MEdu + конвейера MGbot на виртуальных часах.
+
+TwinMEdu повторяет методы MEdu, которые вызывают обёртки medu_*
+(move_to_angles, move_to_coordinates, arc_motion, nozzle_power,
+manage_gripper, stream_*, get_*, write_gpio / get_gpio_value,
+play_audio, mgbot_conveyer.*), поэтому скрипт задания работает
+без изменений — просто вместо medu_connect передаётся двойник.
+
+Модель (приближённая, но с теми же параметрами, что и у обёрток):
+- время движений — MotionTimeModel (трапеция с коэффициентами
+  скорости/ускорения); блокирующий вызов продвигает часы на это время;
+- кинематика — поворот основания + двухзвенная рука (L1, L2),
+  прямая и обратная задачи аналитически;
+- лента — скорость set_speed_motors(0..100) * belt_max_speed, детали
+  появляются на входе (PartSource), едут до упора в конце ленты;
+  датчик расстояния и датчик цвета срабатывают, когда деталь под ними;
+- насадка — вакуум: nozzle_power(True) рядом с деталью на упоре —
+  деталь захвачена; выключение над зоной укладки — деталь уложена,
+  иначе уронена; при слишком большом ускорении деталь может слететь;
+- датчик расстояния может давать ложные показания (sensor_noise);
+- GPIO — значения пинов; interlocks — пины, которые должны иметь
+  заданное значение, иначе движение отклоняется (как аппаратная ошибка).
+
+Часы дискретно-событийные: время не "тикает", а перескакивает к следующему
+событию или к концу движения, поэтому смена идёт в сотни раз быстрее
+реального времени. time.sleep / time.monotonic в модулях задания
+подменяются на виртуальные (VirtualTime.install).
+
+Если SDK не установлен, на время run_shift в sys.modules ставятся
+заменители sdk.* (StandInSDK): классы параметров и перечисления, которые
+импортируют обёртки. Самого MEdu среди них нет — только двойник.
+
+    twin = TwinMEdu(seed=1)
+    stats = run_shift(twin, my_job, hours=1.0)
+    print(stats["parts_per_hour"], stats["speedup"])
+"""
+
+import enum
+import heapq
+import importlib.util
+import itertools
+import json
+import math
+import random
+import sys
+import time
+import types
+
+from medu_motion_time import MotionTimeModel, _dist3, _factor
+from medu_stats import percentile
+
+# Настоящий модуль time: имя time в модулях задания (и в этом) подменяется
+_REAL_TIME = time
+
+
+# ---------------------------------------------------------------------------
+# 1. Виртуальные часы
+# ---------------------------------------------------------------------------
+
+
+class VirtualClock:
+    """Время в секундах от начала смены и очередь событий."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._events = []
+        self._seq = itertools.count()
+
+    def schedule(self, at, callback):
+        heapq.heappush(self._events, (float(at), next(self._seq), callback))
+
+    def advance(self, dt):
+        """Продвинуть часы на dt, выполняя события по дороге."""
+        self.advance_to(self.now + max(0.0, float(dt)))
+
+    def advance_to(self, t):
+        while self._events and self._events[0][0] <= t:
+            at, _, callback = heapq.heappop(self._events)
+            self.now = max(self.now, at)
+            callback()
+        self.now = max(self.now, t)
+
+
+class VirtualTime:
+    """
+    Замена модуля time для скриптов задания: sleep продвигает часы
+    двойника, monotonic/time/perf_counter возвращают виртуальное время.
+    Остальные атрибуты берутся из настоящего time.
+    """
+
+    def __init__(self, clock, epoch=None):
+        self._clock = clock
+        self._epoch = _REAL_TIME.time() if epoch is None else epoch
+        self._patched = []
+
+    def sleep(self, seconds):
+        self._clock.advance(seconds)
+
+    def monotonic(self):
+        return self._clock.now
+
+    perf_counter = monotonic
+
+    def time(self):
+        return self._epoch + self._clock.now
+
+    def __getattr__(self, name):
+        return getattr(_REAL_TIME, name)
+
+    def install(self, modules):
+        """Подменить time в модулях (объекты модулей или имена)."""
+        for module in modules:
+            if isinstance(module, str):
+                module = sys.modules[module]
+            if getattr(module, "time", None) is _REAL_TIME:
+                module.time = self
+                self._patched.append(module)
+
+    def uninstall(self):
+        for module in self._patched:
+            module.time = _REAL_TIME
+        self._patched = []
+
+
+# ---------------------------------------------------------------------------
+# 2. Кинематика
+# ---------------------------------------------------------------------------
+
+
+class ArmKinematics:
+    """
+    Поворот основания q0 + плечо q1 и стрела q2 (от вертикали, q2 — относительно
+    плеча). Размеры — приблизительные для MEdu, м.
+    """
+
+    def __init__(self, base_height=0.12, upper=0.15, fore=0.16):
+        self.base_height = base_height
+        self.upper = upper
+        self.fore = fore
+
+    def forward(self, joints):
+        q0, q1, q2 = joints[:3]
+        r = self.upper * math.sin(q1) + self.fore * math.sin(q1 + q2)
+        z = self.base_height + self.upper * math.cos(q1) + self.fore * math.cos(q1 + q2)
+        return [r * math.cos(q0), r * math.sin(q0), z]
+
+    def inverse(self, position):
+        """Углы для точки или ValueError, если точка недостижима."""
+        x, y, z = position
+        q0 = math.atan2(y, x)
+        r = math.hypot(x, y)
+        h = z - self.base_height
+        d2 = r * r + h * h
+        cos_q2 = (d2 - self.upper ** 2 - self.fore ** 2) / (2.0 * self.upper * self.fore)
+        if not -1.0 <= cos_q2 <= 1.0:
+            raise ValueError(f"точка {list(position)} вне рабочей зоны")
+        q2 = math.acos(cos_q2)  # "локоть вверх"
+        q1 = math.atan2(r, h) - math.atan2(self.fore * math.sin(q2), self.upper + self.fore * math.cos(q2))
+        return [q0, q1, q2]
+
+
+# ---------------------------------------------------------------------------
+# 3. Лента, детали, датчики
+# ---------------------------------------------------------------------------
+
+
+class PartSource:
+    """Детали на входе ленты: средний интервал interval_s ± jitter, цвета по весам."""
+
+    def __init__(self, interval_s=8.0, jitter=0.5, colors=None):
+        self.interval_s = float(interval_s)
+        self.jitter = float(jitter)
+        self.colors = colors or {"red": ((200, 30, 30), 1.0), "green": ((30, 200, 30), 1.0), "blue": ((30, 30, 200), 1.0)}
+
+    def next_interval(self, rng):
+        return max(0.1, self.interval_s * (1.0 + self.jitter * (2.0 * rng.random() - 1.0)))
+
+    def next_color(self, rng):
+        names = list(self.colors)
+        weights = [self.colors[n][1] for n in names]
+        name = rng.choices(names, weights)[0]
+        return name, self.colors[name][0]
+
+
+class TwinConveyor:
+    """mgbot_conveyer двойника. Координата детали — путь по ленте от входа, м."""
+
+    def __init__(self, twin, length=0.6, max_speed=0.08, distance_at=0.59, color_at=0.45, part_size=0.03,
+                 sensor_noise=0.0):
+        """sensor_noise — вероятность ложного показания датчика расстояния за опрос."""
+        self._twin = twin
+        self.length = length
+        self.max_speed = max_speed
+        self.distance_at = distance_at
+        self.color_at = color_at
+        self.part_size = part_size
+        self.sensor_noise = float(sensor_noise)
+        self.speed_percent = 0
+        self.servo_angle = 0.0
+        self.led = (0, 0, 0)
+        self.text = ""
+        self.buzz = 0
+        self.parts = []  # dict: id, color, rgb, pos, t (pos на момент t)
+
+    # --- положение деталей -------------------------------------------------
+
+    def _speed(self):
+        return self.max_speed * self.speed_percent / 100.0
+
+    def _advance_parts(self):
+        """Пересчитать позиции на текущий момент (детали упираются друг в друга)."""
+        now = self._twin.clock.now
+        limit = self.length
+        for part in sorted(self.parts, key=lambda p: -p["pos"]):
+            pos = part["pos"] + self._speed() * (now - part["t"])
+            pos = min(pos, limit)
+            part["pos"], part["t"] = pos, now
+            limit = pos - self.part_size
+
+    def add_part(self, part):
+        """Положить деталь на вход ленты; False — вход занят (лента забита)."""
+        self._advance_parts()
+        if any(p["pos"] < self.part_size for p in self.parts):
+            return False
+        part.update(pos=0.0, t=self._twin.clock.now)
+        self.parts.append(part)
+        return True
+
+    def part_at_end(self):
+        self._advance_parts()
+        for part in self.parts:
+            if part["pos"] >= self.length - 1e-9:
+                return part
+        return None
+
+    def remove(self, part):
+        self.parts.remove(part)
+
+    def _under(self, at):
+        self._advance_parts()
+        for part in self.parts:
+            if abs(part["pos"] - at) <= self.part_size / 2.0:
+                return part
+        return None
+
+    # --- методы SDK --------------------------------------------------------
+
+    def set_speed_motors(self, speed):
+        self._advance_parts()
+        self.speed_percent = int(speed)
+        return True
+
+    def set_servo_angle(self, angle):
+        self.servo_angle = float(angle)
+        return True
+
+    def set_led_color(self, r, g, b):
+        self.led = (r, g, b)
+        return True
+
+    def display_text(self, text):
+        self.text = text
+        return True
+
+    def set_buzz_tone(self, level):
+        self.buzz = level
+        return True
+
+    def get_sensors_data(self, as_json=True):
+        self._twin._call("get_sensors_data")
+        near = self._under(self.distance_at) is not None
+        if self.sensor_noise and self._twin.rng.random() < self.sensor_noise:
+            near = not near
+        colored = self._under(self.color_at)
+        r, g, b = colored["rgb"] if colored else (10, 10, 10)
+        data = {
+            "DistanceSensor": 30 if near else 300,  # мм
+            "ColorSensor": {"R": r, "G": g, "B": b, "Prox": 200 if colored else 5},
+            "Prox": 200 if near else 5,
+        }
+        return data if as_json else json.dumps(data)
+
+
+# ---------------------------------------------------------------------------
+# 4. Двойник MEdu
+# ---------------------------------------------------------------------------
+
+
+class TwinMEdu:
+    """Те же методы, что у sdk.manipulators.medu.MEdu, на виртуальных часах."""
+
+    def __init__(
+        self,
+        model=None,
+        kinematics=None,
+        source=None,
+        seed=None,
+        pick_position=(0.25, -0.10, 0.05),
+        place_position=(0.20, 0.15, 0.05),
+        zone_radius=0.02,
+        interlocks=None,
+        call_latency_s=0.005,
+        sensor_noise=0.0,
+        slip_acceleration=None,
+    ):
+        """
+        pick_position — где в системе робота стоит деталь на упоре ленты;
+        place_position — центр зоны укладки; zone_radius — допуск TCP.
+        interlocks — {имя пина: нужное значение} для разрешения движения.
+        call_latency_s — задержка вызова SDK (сеть/MQTT); у движений
+        накладная задержка уже входит в MotionTimeModel.
+        sensor_noise — вероятность ложного показания датчика расстояния.
+        slip_acceleration — декартово ускорение (м/с^2), выше которого
+        присоска может уронить деталь (None — не роняет).
+        """
+        self.clock = VirtualClock()
+        self.model = model if model is not None else MotionTimeModel()
+        self.kinematics = kinematics if kinematics is not None else ArmKinematics()
+        self.source = source if source is not None else PartSource()
+        self.rng = random.Random(seed)
+        self.pick_position = list(pick_position)
+        self.place_position = list(place_position)
+        self.zone_radius = zone_radius
+        self.interlocks = dict(interlocks or {})
+        self.call_latency_s = call_latency_s
+        self.slip_acceleration = slip_acceleration
+
+        self.home = [0.0, 0.6, 1.0]
+        self.joints = list(self.home)
+        self.position = self.kinematics.forward(self.joints)
+        self.orientation = [0.0, 0.0, 0.0, 1.0]
+        self.servo_type = None
+        self.nozzle = False
+        self.gripper = None
+        self.rotation = None
+        self.held = None
+        self.gpio = {}
+        self.audio = []
+        self.connected = False
+        self._error_callback = None
+
+        self.stats = {"spawned": 0, "picked": 0, "placed": 0, "dropped": 0, "missed": 0, "blocked": 0, "motions": 0, "rejected": 0, "calls": 0}
+        self.cycle_times = []  # с: от захвата до укладки
+        self.placed_at = []  # с: моменты укладки
+        self._picked_at = None
+
+        self.mgbot_conveyer = TwinConveyor(self, sensor_noise=sensor_noise)
+        self.clock.schedule(self.source.next_interval(self.rng), self._spawn)
+
+    # --- события -----------------------------------------------------------
+
+    def _spawn(self):
+        name, rgb = self.source.next_color(self.rng)
+        self.stats["spawned"] += 1
+        if not self.mgbot_conveyer.add_part({"id": self.stats["spawned"], "color": name, "rgb": rgb}):
+            self.stats["blocked"] += 1
+        self.clock.schedule(self.clock.now + self.source.next_interval(self.rng), self._spawn)
+
+    def _call(self, name):
+        self.stats["calls"] += 1
+        self.clock.advance(self.call_latency_s)
+
+    def _fail(self, message, throw_error=True):
+        self.stats["rejected"] += 1
+        self.clock.advance(self.call_latency_s)  # отказ тоже приходит по сети
+        if self._error_callback is not None:
+            self._error_callback({"type": 1, "message": message})
+        if throw_error:
+            raise RuntimeError(message)
+        return None
+
+    def _check_interlocks(self):
+        for pin, value in self.interlocks.items():
+            if self.gpio.get(pin, 0) != value:
+                return f"блокировка: {pin} = {self.gpio.get(pin, 0)}, нужно {value}"
+        return None
+
+    def _move(self, joints, position, duration_s, throw_error, acceleration=0.0):
+        problem = self._check_interlocks()
+        if problem:
+            return self._fail(problem, throw_error)
+        if self.held is not None and self.slip_acceleration and acceleration > self.slip_acceleration:
+            # присоска не держит: вероятность сброса растёт с превышением
+            excess = (acceleration - self.slip_acceleration) / self.slip_acceleration
+            if self.rng.random() < min(1.0, excess):
+                self.held = None
+                self.stats["dropped"] += 1
+        self.clock.advance(duration_s)
+        self.joints = list(joints)
+        self.position = list(position)
+        self.stats["motions"] += 1
+        return True
+
+    # --- подключение -------------------------------------------------------
+
+    def connect(self, *args, **kwargs):
+        self.connected = True
+        return True
+
+    def get_control(self, *args, **kwargs):
+        return True
+
+    def disconnect(self, *args, **kwargs):
+        self.connected = False
+        return True
+
+    # --- движение ----------------------------------------------------------
+
+    def move_to_angles(self, q0, q1, q2, v0=0.0, v1=0.0, v2=0.0, velocity_factor=0.1, acceleration_factor=0.1,
+                       timeout_seconds=60.0, throw_error=True):
+        self.stats["calls"] += 1
+        goal = [q0, q1, q2]
+        duration = self.model.joint_move_ms(self.joints, goal, velocity_factor, acceleration_factor) / 1000.0
+        if duration > timeout_seconds:
+            return self._fail("таймаут движения", throw_error)
+        return self._move(goal, self.kinematics.forward(goal), duration, throw_error)
+
+    def move_to_coordinates(self, position, orientation, velocity_scaling_factor=0.1, acceleration_scaling_factor=0.1,
+                            planner_type=None, timeout_seconds=30.0, throw_error=True):
+        self.stats["calls"] += 1
+        goal = [position.x, position.y, position.z]
+        try:
+            joints = self.kinematics.inverse(goal)
+        except ValueError as e:
+            return self._fail(str(e), throw_error)
+        duration = self.model.cartesian_move_ms(
+            self.position, goal, velocity_scaling_factor, acceleration_scaling_factor
+        ) / 1000.0
+        if duration > timeout_seconds:
+            return self._fail("таймаут движения", throw_error)
+        self.orientation = [orientation.x, orientation.y, orientation.z, orientation.w]
+        acceleration = self.model.cart_a_max * _factor(acceleration_scaling_factor)
+        return self._move(joints, goal, duration, throw_error, acceleration)
+
+    def arc_motion(self, target, center_arc, step=0.05, count_point_arc=50, max_velocity_scaling_factor=0.5,
+                   max_acceleration_scaling_factor=0.5, timeout_seconds=60.0, throw_error=True):
+        self.stats["calls"] += 1
+        goal = [target.position.x, target.position.y, target.position.z]
+        center = [center_arc.position.x, center_arc.position.y, center_arc.position.z]
+        try:
+            joints = self.kinematics.inverse(goal)
+        except ValueError as e:
+            return self._fail(str(e), throw_error)
+        duration = self.model.arc_move_ms(
+            self.position, goal, center, max_velocity_scaling_factor, max_acceleration_scaling_factor
+        ) / 1000.0
+        if duration > timeout_seconds:
+            return self._fail("таймаут движения", throw_error)
+        acceleration = self.model.cart_a_max * _factor(max_acceleration_scaling_factor)
+        return self._move(joints, goal, duration, throw_error, acceleration)
+
+    def stop_movement(self, timeout_seconds=5.0):
+        self._call("stop_movement")
+        return True
+
+    def stop_movement_no_wait(self):
+        return True
+
+    # --- стриминг (уставка применяется сразу, шаг — период стрима) -----------
+
+    def set_servo_control_type(self, servo_type):
+        self._call("set_servo_control_type")
+        self.servo_type = servo_type
+        return True
+
+    def set_servo_twist_mode(self):
+        return self.set_servo_control_type("TWIST")
+
+    def set_servo_pose_mode(self):
+        return self.set_servo_control_type("POSE")
+
+    def set_servo_joint_jog_mode(self):
+        return self.set_servo_control_type("JOINT_JOG")
+
+    def stream_cartesian_velocities(self, linear_vel, angular_vel):
+        # скорость действует до следующей уставки; здесь — один период 20 мс
+        dt = 0.02
+        goal = [
+            self.position[0] + float(linear_vel.get("x", 0.0)) * dt,
+            self.position[1] + float(linear_vel.get("y", 0.0)) * dt,
+            self.position[2] + float(linear_vel.get("z", 0.0)) * dt,
+        ]
+        return self._stream_to(goal)
+
+    def stream_coordinates(self, position, orientation):
+        self.orientation = [orientation.x, orientation.y, orientation.z, orientation.w]
+        return self._stream_to([position.x, position.y, position.z])
+
+    def _stream_to(self, goal):
+        try:
+            self.joints = self.kinematics.inverse(goal)
+        except ValueError as e:
+            return self._fail(str(e), throw_error=False)
+        self.position = goal
+        return True
+
+    def stream_joint_angles(self, q0, q1, q2, v0=0.0, v1=0.0, v2=0.0):
+        self.joints = [q0, q1, q2]
+        self.position = self.kinematics.forward(self.joints)
+        return True
+
+    # --- насадка -----------------------------------------------------------
+
+    def _near(self, point):
+        return _dist3(self.position, point) <= self.zone_radius
+
+    def nozzle_power(self, state):
+        self._call("nozzle_power")
+        self.nozzle = bool(state)
+        conveyor = self.mgbot_conveyer
+        if self.nozzle and self.held is None and self._near(self.pick_position):
+            part = conveyor.part_at_end()
+            if part is not None:
+                conveyor.remove(part)
+                self.held = part
+                self.stats["picked"] += 1
+                self._picked_at = self.clock.now
+            else:
+                self.stats["missed"] += 1  # насадка включена, а детали нет
+        elif not self.nozzle and self.held is not None:
+            if self._near(self.place_position):
+                self.stats["placed"] += 1
+                self.cycle_times.append(self.clock.now - self._picked_at)
+                self.placed_at.append(self.clock.now)
+            else:
+                self.stats["dropped"] += 1
+            self.held = None
+        return True
+
+    def manage_gripper(self, rotation=None, gripper=None):
+        self._call("manage_gripper")
+        if rotation is not None:
+            self.rotation = rotation
+        if gripper is not None:
+            self.gripper = gripper
+        return True
+
+    # --- программы, состояние, GPIO, аудио, ошибки -------------------------
+
+    def run_program(self, name):
+        self._call("run_program")
+        return True
+
+    def run_program_json(self, name, program_json):
+        self._call("run_program_json")
+        return True
+
+    def run_python_program(self, code):
+        self._call("run_python_program")
+        return True
+
+    def get_joint_state(self):
+        self._call("get_joint_state")
+        return {"position": list(self.joints), "velocity": [0.0, 0.0, 0.0]}
+
+    def get_home_position(self):
+        self._call("get_home_position")
+        return list(self.home)
+
+    def get_cartesian_coordinates(self):
+        self._call("get_cartesian_coordinates")
+        x, y, z = self.position
+        ox, oy, oz, ow = self.orientation
+        return {"position": {"x": x, "y": y, "z": z}, "orientation": {"x": ox, "y": oy, "z": oz, "w": ow}}
+
+    def write_gpio(self, name, value, timeout_seconds=0.5, throw_error=False):
+        self._call("write_gpio")
+        self.gpio[name] = int(value)
+        return True
+
+    def get_gpio_value(self, name, timeout_seconds=0.5, throw_error=True):
+        self._call("get_gpio_value")
+        return self.gpio.get(name, 0)
+
+    def set_input(self, name, value, at=None):
+        """Внешний сигнал на пин (дверь, кнопка) — сейчас или в момент at."""
+        if at is None:
+            self.gpio[name] = int(value)
+        else:
+            self.clock.schedule(at, lambda: self.gpio.__setitem__(name, int(value)))
+
+    def play_audio(self, file_name, timeout_seconds=60.0, throw_error=True):
+        self._call("play_audio")
+        self.audio.append((self.clock.now, file_name))
+        return True
+
+    def play_audio_no_wait(self, file_name):
+        self.audio.append((self.clock.now, file_name))
+
+    def subscribe_hardware_error(self, callback):
+        self._error_callback = callback
+        return True
+
+    def unsubscribe_hardware_error(self):
+        self._error_callback = None
+        return True
+
+    # --- итоги -------------------------------------------------------------
+
+    def report(self):
+        hours = self.clock.now / 3600.0
+        return {
+            **self.stats,
+            "sim_seconds": self.clock.now,
+            "parts_per_hour": self.stats["placed"] / hours if hours > 0 else 0.0,
+            "waiting_on_belt": len(self.mgbot_conveyer.parts),
+            "cycle_p50_s": percentile(self.cycle_times, 0.5),
+            "cycle_max_s": percentile(self.cycle_times, 1.0),
+        }
+
+
+# ---------------------------------------------------------------------------
+# 5. Заменитель SDK
+# ---------------------------------------------------------------------------
+
+
+class _Position:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+
+class _Orientation:
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        self.x, self.y, self.z, self.w = x, y, z, w
+
+
+class _Pose:
+    def __init__(self, position, orientation):
+        self.position, self.orientation = position, orientation
+
+
+class _ServoControlType(enum.Enum):
+    TWIST = "TWIST"
+    POSE = "POSE"
+    JOINT_JOG = "JOINT_JOG"
+
+
+class _PlannerType(enum.Enum):
+    LIN = "LIN"
+
+
+class StandInSDK:
+    """
+    Модули sdk.* для двойника без SDK (только то, что импортируют обёртки:
+    параметры move_to_coordinates / arc_motion и перечисления).
+    install() ничего не делает, если настоящий SDK есть.
+    """
+
+    def __init__(self):
+        self.installed = []
+
+    def install(self):
+        if "sdk" in sys.modules or importlib.util.find_spec("sdk") is not None:
+            return False
+        contents = {
+            "sdk": {},
+            "sdk.commands": {},
+            "sdk.commands.move_coordinates_command": {
+                "MoveCoordinatesParamsPosition": _Position,
+                "MoveCoordinatesParamsOrientation": _Orientation,
+            },
+            "sdk.commands.arc_motion": {"Pose": _Pose, "Position": _Position, "Orientation": _Orientation},
+            "sdk.utils": {},
+            "sdk.utils.enums": {"ServoControlType": _ServoControlType, "PlannerType": _PlannerType},
+        }
+        for name, attributes in contents.items():
+            module = types.ModuleType(name, "заменитель SDK для medu_twin")
+            module.__dict__.update(attributes)
+            sys.modules[name] = module
+            if "." in name:
+                parent, _, child = name.rpartition(".")
+                setattr(sys.modules[parent], child, module)
+            self.installed.append(name)
+        return True
+
+    def uninstall(self):
+        for name in self.installed:
+            sys.modules.pop(name, None)
+        self.installed = []
+
+
+# ---------------------------------------------------------------------------
+# 6. Прогон смены
+# ---------------------------------------------------------------------------
+
+
+class ShiftOver(BaseException):
+    """
+    Смена закончилась (бросается из часов). BaseException — чтобы её не
+    перехватывали except Exception в обёртках.
+    """
+
+
+def run_shift(twin, job, hours=1.0, modules=None):
+    """
+    Выполнять job(twin, deadline) до конца смены (hours виртуальных часов).
+    job — обычный скрипт на обёртках medu_*: крутится в цикле, пока
+    time.monotonic() < deadline. В modules (и в модуле job) time
+    подменяется на виртуальное; без SDK ставится StandInSDK.
+    Возвращает twin.report() + speedup.
+    """
+    deadline = twin.clock.now + hours * 3600.0
+    vtime = VirtualTime(twin.clock)
+    targets = list(modules or [])
+    job_module = sys.modules.get(getattr(job, "__module__", ""), None)
+    if job_module is not None:
+        targets.append(job_module)
+    targets.extend(m for m in ("medu_wait",) if m in sys.modules)
+
+    original_advance = twin.clock.advance_to
+
+    def bounded_advance(t):
+        original_advance(min(t, deadline))
+        if t >= deadline:
+            raise ShiftOver()
+
+    twin.clock.advance_to = bounded_advance
+    standin = StandInSDK()
+    standin.install()
+    vtime.install(targets)
+    wall = _REAL_TIME.perf_counter()
+    try:
+        while twin.clock.now < deadline:
+            job(twin, deadline)
+            if twin.clock.now < deadline:
+                twin.clock.advance(0.1)  # защита от задания, которое не тратит время
+    except ShiftOver:
+        pass
+    finally:
+        vtime.uninstall()
+        standin.uninstall()
+        twin.clock.advance_to = original_advance
+    wall = _REAL_TIME.perf_counter() - wall
+
+    report = twin.report()
+    report["wall_seconds"] = wall
+    report["speedup"] = twin.clock.now / wall if wall > 0 else None
+    return report
+
+
+def pick_and_place(manipulator, velocity=0.5, acceleration=0.5, lift=0.05):
+    """
+    Один цикл на обёртках: над деталью -> вниз -> вакуум -> вверх -> укладка.
+    Возвращает True или False на первой ошибке обёртки (вакуум выключается).
+    """
+    from medu_wrappers import medu_move_to_coordinates, medu_nozzle_power
+
+    px, py, pz = manipulator.pick_position
+    qx, qy, qz = manipulator.place_position
+    steps = [
+        lambda: medu_move_to_coordinates(manipulator, px, py, pz + lift, 0.0, 0.0, 0.0, 1.0, velocity, acceleration),
+        lambda: medu_move_to_coordinates(manipulator, px, py, pz, 0.0, 0.0, 0.0, 1.0, velocity, acceleration),
+        lambda: medu_nozzle_power(manipulator, True),
+        lambda: medu_move_to_coordinates(manipulator, px, py, pz + lift, 0.0, 0.0, 0.0, 1.0, velocity, acceleration),
+        lambda: medu_move_to_coordinates(manipulator, qx, qy, qz, 0.0, 0.0, 0.0, 1.0, velocity, acceleration),
+        lambda: medu_nozzle_power(manipulator, False),
+    ]
+    for step in steps:
+        if step() is None:
+            medu_nozzle_power(manipulator, False)
+            return False
+    return True
+
+
+def example_job(manipulator, deadline, belt_speed=40, velocity=0.5, acceleration=0.5, failure_backoff_s=5.0):
+    """
+    Пример задания на обёртках: ждём деталь на упоре (датчик расстояния),
+    затем pick -> place. После неудачного цикла — пауза failure_backoff_s,
+    а не новая попытка сразу (деталь остаётся под датчиком).
+    """
+    from medu_wrappers import medu_conveyor_get_sensors_data, medu_conveyor_set_speed_motors
+
+    medu_conveyor_set_speed_motors(manipulator, belt_speed)
+    while time.monotonic() < deadline:
+        data = medu_conveyor_get_sensors_data(manipulator, as_json=True)
+        if data is None or data["DistanceSensor"] > 100:
+            time.sleep(0.05)
+            continue
+        if not pick_and_place(manipulator, velocity, acceleration):
+            time.sleep(failure_backoff_s)
+
+
+def main() -> None:
+    twin = TwinMEdu(seed=1)
+    report = run_shift(twin, example_job, hours=1.0)
+    for key, value in report.items():
+        print(f"{key:<20} {value}")
+
+
+if __name__ == "__main__":
+    main()
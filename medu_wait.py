@@ -0,0 +1,106 @@
+"""
+medu_wait.py — ожидание по состоянию робота вместо фиксированных time.sleep.
+
+wait_until(predicate)         — опрос условия с интервалом до таймаута;
+wait_motion_settled(m)        — ждать, пока углы суставов перестанут меняться;
+wait_sensor(m, predicate)     — ждать нужных показаний датчиков конвейера.
+
+Все функции возвращают True, если условие выполнено, и False по таймауту
+(исключений не бросают — как и обёртки).
+"""
+
+import time
+
+from medu_wrappers import medu_get_joint_state, medu_conveyor_get_sensors_data
+
+
+def wait_until(predicate, timeout=5.0, interval=0.02):
+    """Опрашивать predicate() до True или до таймаута."""
+    deadline = time.monotonic() + float(timeout)
+    while True:
+        try:
+            if predicate():
+                return True
+        except Exception as e:
+            print(f"[wait_until] Ошибка условия: {e}")
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+
+
+# Где в ответе get_joint_state лежат углы (формат зависит от версии SDK)
+POSITION_KEYS = ("position", "positions", "joint_positions", "angles", "joints")
+
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _position_field(state):
+    """Значение первого известного поля с углами (ключ dict или атрибут)."""
+    for key in POSITION_KEYS:
+        if isinstance(state, dict):
+            if key in state:
+                return state[key]
+        elif hasattr(state, key):
+            return getattr(state, key)
+    return None
+
+
+def joint_values(state):
+    """
+    Углы суставов из ответа get_joint_state: список чисел, поле с углами
+    (position / positions / joint_positions / angles / joints — в dict или
+    объекте, как у JointState) или список суставов, у каждого такое поле.
+    Скорости, усилия и метки времени не берутся. Список float или None,
+    если формат не распознан.
+    """
+    if state is None or isinstance(state, (str, bytes)):
+        return None
+    if isinstance(state, (list, tuple)):
+        if state and all(_number(v) for v in state):
+            return [float(v) for v in state]
+        # список суставов: [{"name": ..., "position": ...}, ...]
+        values = [_position_field(item) for item in state]
+        if state and all(_number(v) for v in values):
+            return [float(v) for v in values]
+        return None
+    field = _position_field(state)
+    if field is None or _number(field):
+        return None
+    return joint_values(field)
+
+
+def wait_motion_settled(manipulator, tolerance=0.002, stable_reads=3, timeout=10.0, interval=0.05):
+    """
+    Ждать, пока stable_reads подряд чтений суставов отличаются
+    не больше чем на tolerance (рад).
+    """
+    previous = [None]
+    stable = [0]
+
+    def settled():
+        current = joint_values(medu_get_joint_state(manipulator))
+        if not current:
+            return False
+        last = previous[0]
+        previous[0] = current
+        if last is None or len(last) != len(current):
+            stable[0] = 0
+            return False
+        if max(abs(a - b) for a, b in zip(last, current)) <= tolerance:
+            stable[0] += 1
+        else:
+            stable[0] = 0
+        return stable[0] >= stable_reads
+
+    return wait_until(settled, timeout=timeout, interval=interval)
+
+
+def wait_sensor(manipulator, predicate, timeout=5.0, interval=0.05):
+    """Ждать, пока predicate(sensor_data) станет True (данные — dict из SDK)."""
+    def check():
+        data = medu_conveyor_get_sensors_data(manipulator, as_json=True)
+        return data is not None and predicate(data)
+
+    return wait_until(check, timeout=timeout, interval=interval)
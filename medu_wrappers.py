@@ -7,19 +7,18 @@ medu_wrappers.py — простые обёртки для MEdu SDK (только
 - Каждая функция сама проверяет свои параметры (тип + диапазон).
 - Вызовы SDK всегда внутри try/except.
 - В except пишем лог в консоль и возвращаем None.
+- Команды-действия без документированного ответа (насадка, гриппер,
+  write_gpio, конвейер) при успехе возвращают ответ SDK, а если он
+  None — True: None от обёртки всегда означает ошибку.
+- SDK импортируется лениво — внутри функций, которым он нужен.
+  Импорт модуля не тянет SDK, поэтому утилиты планирования и проверки
+  работают и без установленного SDK. Повторный импорт внутри функции —
+  это просто поиск в sys.modules.
 
 Числовые диапазоны здесь заданы "разумными по умолчанию".
 При необходимости подправь их под свои реальные ограничения робота.
 """
 
-from sdk.manipulators.medu import MEdu
-from sdk.commands.move_coordinates_command import (
-    MoveCoordinatesParamsPosition,
-    MoveCoordinatesParamsOrientation,
-)
-from sdk.commands.arc_motion import Pose, Position, Orientation
-from sdk.utils.enums import ServoControlType  # PlannerType в новой версии SDK нет
-
 # ---------------------------------------------------------------------------
 # 1. Подключение и получение управления
 # ---------------------------------------------------------------------------
@@ -40,6 +39,8 @@ def medu_connect(host: str, client_id: str, login: str, password: str):
         if not isinstance(password, str) or not password.strip():
             raise ValueError("password должен быть непустой строкой")
 
+        from sdk.manipulators.medu import MEdu
+
         manipulator = MEdu(host, client_id, login, password)
 
         # Подключение + захват управления — тоже в try
@@ -182,12 +183,14 @@ def medu_move_to_coordinates(
             if not coord_min <= float(value) <= coord_max:
                 raise ValueError(f"{name} вне диапазона [{coord_min}, {coord_max}]")
 
-        # Кватернион (ox, oy, oz, ow) — просто числа; диапазон [-1..1]
+        # Кватернион (ox, oy, oz, ow) — числа; нормируем до единичного
         for name, value in [("ox", ox), ("oy", oy), ("oz", oz), ("ow", ow)]:
             if not isinstance(value, (int, float)):
                 raise TypeError(f"{name} должен быть числом")
-            if not -1.0 <= float(value) <= 1.0:
-                raise ValueError(f"{name} вне диапазона [-1.0, 1.0]")
+        norm = (float(ox) ** 2 + float(oy) ** 2 + float(oz) ** 2 + float(ow) ** 2) ** 0.5
+        if norm < 1e-6:
+            raise ValueError("кватернион (ox, oy, oz, ow) нулевой")
+        ox, oy, oz, ow = ox / norm, oy / norm, oz / norm, ow / norm
 
         # velocity/acceleration [0..1]
         if not isinstance(velocity_scaling_factor, (int, float)):
@@ -204,8 +207,13 @@ def medu_move_to_coordinates(
                 "acceleration_scaling_factor должен быть в диапазоне [0.0, 1.0]"
             )
 
-        if not isinstance(planner_type, PlannerType):
-            raise TypeError("planner_type должен быть экземпляром PlannerType")
+        if planner_type is not None:
+            try:
+                from sdk.utils.enums import PlannerType
+            except ImportError:
+                PlannerType = None  # в новой версии SDK нет — не проверяем
+            if PlannerType is not None and not isinstance(planner_type, PlannerType):
+                raise TypeError("planner_type должен быть экземпляром PlannerType")
 
         if not isinstance(timeout_seconds, (int, float)):
             raise TypeError("timeout_seconds должен быть числом")
@@ -215,6 +223,11 @@ def medu_move_to_coordinates(
         if not isinstance(throw_error, bool):
             raise TypeError("throw_error должен быть bool")
 
+        from sdk.commands.move_coordinates_command import (
+            MoveCoordinatesParamsPosition,
+            MoveCoordinatesParamsOrientation,
+        )
+
         position = MoveCoordinatesParamsPosition(float(x), float(y), float(z))
         orientation = MoveCoordinatesParamsOrientation(
             float(ox),
@@ -256,9 +269,15 @@ def medu_arc_motion(
     max_acceleration_scaling_factor=0.5,
     timeout_seconds=60.0,
     throw_error=True,
+    ox=0.0,
+    oy=0.0,
+    oz=0.0,
+    ow=1.0,
 ):
     """
     Обёртка для manipulator.arc_motion(...) с проверкой параметров.
+    (ox, oy, oz, ow) — ориентация инструмента на дуге (кватернион,
+    нормируется); по умолчанию — как Orientation() SDK.
     """
 
     try:
@@ -308,13 +327,22 @@ def medu_arc_motion(
         if not isinstance(throw_error, bool):
             raise TypeError("throw_error должен быть bool")
 
+        for name, value in [("ox", ox), ("oy", oy), ("oz", oz), ("ow", ow)]:
+            if not isinstance(value, (int, float)):
+                raise TypeError(f"{name} должен быть числом")
+        norm = (float(ox) ** 2 + float(oy) ** 2 + float(oz) ** 2 + float(ow) ** 2) ** 0.5
+        if norm < 1e-6:
+            raise ValueError("кватернион (ox, oy, oz, ow) нулевой")
+
+        from sdk.commands.arc_motion import Pose, Position, Orientation
+
         target = Pose(
             position=Position(float(target_x), float(target_y), float(target_z)),
-            orientation=Orientation(),
+            orientation=Orientation(ox / norm, oy / norm, oz / norm, ow / norm),
         )
         center_arc = Pose(
             position=Position(float(center_x), float(center_y), float(center_z)),
-            orientation=Orientation(),
+            orientation=Orientation(ox / norm, oy / norm, oz / norm, ow / norm),
         )
 
         return manipulator.arc_motion(
@@ -347,7 +375,8 @@ def medu_nozzle_power(manipulator, state: bool):
         if not isinstance(state, bool):
             raise TypeError("state должен быть bool")
 
-        return manipulator.nozzle_power(state)
+        result = manipulator.nozzle_power(state)
+        return True if result is None else result
 
     except Exception as e:
         print(f"[medu_nozzle_power] Ошибка: {e}")
@@ -368,7 +397,8 @@ def medu_manage_gripper(manipulator, rotation=None, gripper=None):
         if gripper is not None and not isinstance(gripper, (int, float)):
             raise TypeError("gripper должен быть числом или None")
 
-        return manipulator.manage_gripper(rotation, gripper)
+        result = manipulator.manage_gripper(rotation, gripper)
+        return True if result is None else result
 
     except Exception as e:
         print(f"[medu_manage_gripper] Ошибка: {e}")
@@ -384,6 +414,8 @@ def medu_set_servo_control_type(manipulator, servo_type):
         if manipulator is None:
             raise ValueError("manipulator == None")
 
+        from sdk.utils.enums import ServoControlType  # PlannerType в новой версии SDK нет
+
         if not isinstance(servo_type, ServoControlType):
             raise TypeError("servo_type должен быть экземпляром ServoControlType")
 
@@ -461,6 +493,17 @@ def medu_stream_coordinates(manipulator, x, y, z, ox, oy, oz, ow):
             if not isinstance(value, (int, float)):
                 raise TypeError(f"{name} должен быть числом")
 
+        # Кватернион нормируем до единичного
+        norm = (float(ox) ** 2 + float(oy) ** 2 + float(oz) ** 2 + float(ow) ** 2) ** 0.5
+        if norm < 1e-6:
+            raise ValueError("кватернион (ox, oy, oz, ow) нулевой")
+        ox, oy, oz, ow = ox / norm, oy / norm, oz / norm, ow / norm
+
+        from sdk.commands.move_coordinates_command import (
+            MoveCoordinatesParamsPosition,
+            MoveCoordinatesParamsOrientation,
+        )
+
         position = MoveCoordinatesParamsPosition(float(x), float(y), float(z))
         orientation = MoveCoordinatesParamsOrientation(
             float(ox),
@@ -656,12 +699,13 @@ def medu_write_gpio(
         if not isinstance(throw_error, bool):
             raise TypeError("throw_error должен быть bool")
 
-        return manipulator.write_gpio(
+        result = manipulator.write_gpio(
             name,
             value,
             timeout_seconds=float(timeout_seconds),
             throw_error=throw_error,
         )
+        return True if result is None else result
 
     except Exception as e:
         print(f"[medu_write_gpio] Ошибка: {e}")
@@ -716,7 +760,8 @@ def medu_conveyor_set_speed_motors(manipulator, speed: int):
         if not 0 <= speed <= 100:
             raise ValueError("speed должен быть в диапазоне [0, 100]")
 
-        return manipulator.mgbot_conveyer.set_speed_motors(speed)
+        result = manipulator.mgbot_conveyer.set_speed_motors(speed)
+        return True if result is None else result
 
     except Exception as e:
         print(f"[medu_conveyor_set_speed_motors] Ошибка: {e}")
@@ -730,7 +775,8 @@ def medu_conveyor_set_servo_angle(manipulator, angle):
         if not isinstance(angle, (int, float)):
             raise TypeError("angle должен быть числом")
 
-        return manipulator.mgbot_conveyer.set_servo_angle(float(angle))
+        result = manipulator.mgbot_conveyer.set_servo_angle(float(angle))
+        return True if result is None else result
 
     except Exception as e:
         print(f"[medu_conveyor_set_servo_angle] Ошибка: {e}")
@@ -748,7 +794,8 @@ def medu_conveyor_set_led_color(manipulator, r: int, g: int, b: int):
             if not 0 <= value <= 255:
                 raise ValueError(f"{name} должен быть в диапазоне [0, 255]")
 
-        return manipulator.mgbot_conveyer.set_led_color(r, g, b)
+        result = manipulator.mgbot_conveyer.set_led_color(r, g, b)
+        return True if result is None else result
 
     except Exception as e:
         print(f"[medu_conveyor_set_led_color] Ошибка: {e}")
@@ -762,7 +809,8 @@ def medu_conveyor_display_text(manipulator, text: str):
         if not isinstance(text, str) or not text.strip():
             raise ValueError("text должен быть непустой строкой")
 
-        return manipulator.mgbot_conveyer.display_text(text)
+        result = manipulator.mgbot_conveyer.display_text(text)
+        return True if result is None else result
 
     except Exception as e:
         print(f"[medu_conveyor_display_text] Ошибка: {e}")
@@ -780,7 +828,8 @@ def medu_conveyor_set_buzz_tone(manipulator, level: int):
         if not 1 <= level <= 15:
             raise ValueError("level должен быть в диапазоне [1, 15]")
 
-        return manipulator.mgbot_conveyer.set_buzz_tone(level)
+        result = manipulator.mgbot_conveyer.set_buzz_tone(level)
+        return True if result is None else result
 
     except Exception as e:
         print(f"[medu_conveyor_set_buzz_tone] Ошибка: {e}")
@@ -835,3 +884,64 @@ def medu_play_audio(
     except Exception as e:
         print(f"[medu_play_audio] Ошибка: {e}")
         return None
+
+
+def medu_play_audio_no_wait(manipulator, file_name: str):
+    """
+    Запустить воспроизведение и сразу вернуться (play_audio_no_wait).
+    Ответа SDK нет, поэтому возвращает True, если команда отправлена.
+    Ошибки на стороне робота (нет файла) сюда не приходят.
+    """
+    try:
+        if manipulator is None:
+            raise ValueError("manipulator == None")
+
+        if not isinstance(file_name, str) or not file_name.strip():
+            raise ValueError("file_name должен быть непустой строкой")
+
+        manipulator.play_audio_no_wait(file_name)
+        return True
+
+    except Exception as e:
+        print(f"[medu_play_audio_no_wait] Ошибка: {e}")
+        return None
+
+
+# ---------------------------------------------------------------------------
+# 12. Подписка на аппаратные ошибки
+# ---------------------------------------------------------------------------
+
+def medu_subscribe_hardware_error(manipulator, callback):
+    """
+    Подписаться на аппаратные ошибки: callback(data) вызывается
+    из потока SDK, data — dict вида {"type": int, "message": "...", ...}.
+    Ответа SDK нет, поэтому возвращает True, если подписка оформлена.
+    """
+    try:
+        if manipulator is None:
+            raise ValueError("manipulator == None")
+        if not callable(callback):
+            raise TypeError("callback должен быть вызываемым объектом")
+
+        manipulator.subscribe_hardware_error(callback)
+        return True
+
+    except Exception as e:
+        print(f"[medu_subscribe_hardware_error] Ошибка: {e}")
+        return None
+
+
+def medu_unsubscribe_hardware_error(manipulator):
+    """
+    Снять подписку на аппаратные ошибки (callback больше не вызывается).
+    Возвращает True, если команда выполнена.
+    """
+    try:
+        if manipulator is None:
+            raise ValueError("manipulator == None")
+
+        manipulator.unsubscribe_hardware_error()
+        return True
+    except Exception as e:
+        print(f"[medu_unsubscribe_hardware_error] Ошибка: {e}")
+        return None